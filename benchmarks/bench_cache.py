@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_cache
+    ----------------------
+
+    Measure the time needed to get an offer package from the package cache
+    when it has to be generated (miss) and when the same offers were already
+    packaged (hit).
+
+    Usage::
+
+        python benchmarks/bench_cache.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import tempfile
+import time
+
+from cdiscountapi.packages.cache import PackageCache
+
+from bench_packages import make_offers
+
+
+def main(numbers):
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PackageCache(directory)
+        for number in numbers:
+            data = {"OfferCollection": make_offers(number)}
+
+            start = time.perf_counter()
+            miss = cache.build("offer", data)
+            miss_duration = time.perf_counter() - start
+
+            start = time.perf_counter()
+            hit = cache.build("offer", data)
+            hit_duration = time.perf_counter() - start
+            assert hit.hit and not miss.hit
+
+            print(
+                "{:>7} offers  miss {:8.3f} s  hit {:8.3f} s  ({:.1f}x)".format(
+                    number, miss_duration, hit_duration, miss_duration / hit_duration
+                )
+            )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_columnar
+    -------------------------
+
+    Measure the time needed to write Offers.xml from a dictionary per offer
+    (streaming writer) and from a table of offers (lists, and numpy arrays
+    when numpy is installed).
+
+    Usage::
+
+        python benchmarks/bench_columnar.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import io
+import sys
+import time
+
+from cdiscountapi.packages.columnar import write_offer_table_xml
+from cdiscountapi.packages.writer import write_offers_xml
+
+
+def make_table(number):
+    return {
+        "ProductEan": ["{:013d}".format(3600000000000 + i) for i in range(number)],
+        "SellerProductId": ["SKU{}".format(i) for i in range(number)],
+        "Price": [10 + (i % 1000) / 100 for i in range(number)],
+        "Stock": [i % 20 for i in range(number)],
+        "Vat": [20.0] * number,
+        "ShippingCharges.Standard": [2.5] * number,
+        "AdditionalShippingCharges.Standard": [1.0] * number,
+    }
+
+
+def make_offers(table):
+    """
+    Explode the table into a dictionary per offer
+    """
+    number = len(table["ProductEan"])
+    for i in range(number):
+        yield {
+            "Offer": {
+                "ProductEan": table["ProductEan"][i],
+                "SellerProductId": table["SellerProductId"][i],
+                "Price": table["Price"][i],
+                "Stock": table["Stock"][i],
+                "Vat": table["Vat"][i],
+                "ShippingInformationList": {
+                    "ShippingInformation": [{
+                        "ShippingCharges": table["ShippingCharges.Standard"][i],
+                        "AdditionalShippingCharges": (
+                            table["AdditionalShippingCharges.Standard"][i]
+                        ),
+                        "DeliveryMode": "Standard",
+                    }]
+                },
+            }
+        }
+
+
+def measure(write, *args):
+    start = time.perf_counter()
+    write(io.BytesIO(), *args)
+    return time.perf_counter() - start
+
+
+def main(numbers):
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    for number in numbers:
+        table = make_table(number)
+        results = [
+            ("rows", measure(write_offers_xml, {"OfferCollection": make_offers(table)})),
+            ("table (lists)", measure(write_offer_table_xml, table)),
+        ]
+        if numpy is not None:
+            arrays = {
+                name: numpy.asarray(values) if not isinstance(values[0], str) else values
+                for name, values in table.items()
+            }
+            results.append(("table (numpy)", measure(write_offer_table_xml, arrays)))
+        print("{:>7} offers  {}".format(
+            number,
+            "  ".join("{} {:.3f} s".format(label, duration) for label, duration in results),
+        ))
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10000, 100000, 300000])
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_connection
+    ---------------------------
+
+    Measure the time and the memory needed to create several connections.
+
+    The HTTP responses are replayed from the VCR cassettes of the tests so the
+    network doesn't interfere with the results.
+
+    Usage::
+
+        python benchmarks/bench_connection.py [number_of_connections]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import vcr
+
+from cdiscountapi import Connection
+from cdiscountapi.schema import registry
+
+
+CASSETTE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "cassettes"
+    / "test_connection"
+    / "test_initialization.yaml"
+)
+
+HEADER_MESSAGE = {
+    "Context": {"SiteID": 100, "CatalogID": 1},
+    "Localization": {"Country": "Fr", "Currency": "Eur"},
+    "Security": {"UserName": ""},
+    "Version": "1.0",
+}
+
+
+def connect(**kwargs):
+    return Connection("login", "password", header_message=dict(HEADER_MESSAGE), **kwargs)
+
+
+def measure(number, **kwargs):
+    """
+    Return the duration and the memory allocated to create `number` connections
+    """
+    registry.clear()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    connections = [connect(**kwargs) for _ in range(number)]
+    duration = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del connections
+    return duration, current
+
+
+def main(number):
+    with vcr.use_cassette(str(CASSETTE), record_mode="none", allow_playback_repeats=True):
+        # Warm up the imports and the cassette
+        connect(shared_schema=False)
+
+        print("{} connections".format(number))
+        for shared_schema in (False, True):
+            duration, memory = measure(number, shared_schema=shared_schema)
+            print(
+                "shared_schema={!s:5}  {:8.3f} s  {:8.1f} MB".format(
+                    shared_schema, duration, memory / 1024 ** 2
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_dedup
+    ----------------------
+
+    Measure the time needed to add offers to an OfferPackage (validation and
+    deduplication) compared with the deduplication in a list.
+
+    Usage::
+
+        python benchmarks/bench_dedup.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import time
+
+from cdiscountapi.packages import OfferPackage
+
+
+# The deduplication in a list is quadratic: it's only measured up to this size
+MAX_LIST_SIZE = 10000
+
+
+def make_offers(number, duplicates=0.1):
+    """
+    Return number offers, the last ones are duplicates of the first ones
+    """
+    unique = int(number * (1 - duplicates))
+    return [
+        {
+            "Offer": {
+                "ProductEan": "{:013d}".format(3600000000000 + i % unique),
+                "SellerProductId": "SKU{}".format(i % unique),
+                "Price": 10 + i % 100,
+                "Stock": i % 20,
+            }
+        }
+        for i in range(number)
+    ]
+
+
+def add_to_list(package, offers):
+    # The deduplication of OfferPackage.add before the index
+    data = []
+    for offer in offers:
+        valid_offer = package.validate(**offer)
+        if valid_offer not in data:
+            data.append(valid_offer)
+    return data
+
+
+def main(numbers):
+    for number in numbers:
+        offers = make_offers(number)
+        start = time.perf_counter()
+        package = OfferPackage({"OfferCollection": offers})
+        indexed = time.perf_counter() - start
+
+        if number <= MAX_LIST_SIZE:
+            start = time.perf_counter()
+            add_to_list(package, offers)
+            in_list = "{:8.3f} s".format(time.perf_counter() - start)
+        else:
+            in_list = "{:>10}".format("-")
+
+        print(
+            "{:>7} offers  {:>7} kept  index {:8.3f} s  list {}".format(
+                number, len(package.data), indexed, in_list
+            )
+        )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_delta
+    ----------------------
+
+    Measure the time needed to compare a catalogue with the offers submitted
+    last when 1% of the offers changed, and the size of the StockAndPrice
+    package of the delta compared with the package of the whole catalogue.
+
+    Usage::
+
+        python benchmarks/bench_delta.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from cdiscountapi.packages.delta import OfferStateStore
+from cdiscountapi.packages.writer import PackageWriter
+
+from bench_packages import make_offers
+
+
+def main(numbers):
+    for number in numbers:
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            store = OfferStateStore(directory / "offers.db")
+            offers = make_offers(number)
+
+            start = time.perf_counter()
+            delta = store.diff(offers)
+            store.mark_submitted(delta)
+            first_duration = time.perf_counter() - start
+
+            for offer in offers[::100]:
+                offer["Offer"]["Stock"] += 1
+
+            start = time.perf_counter()
+            delta = store.diff(offers)
+            diff_duration = time.perf_counter() - start
+
+            with PackageWriter(
+                directory / "full", {"PackageType": "StockAndPrice"},
+                max_records=number,
+            ) as writer:
+                writer.extend(offers)
+            full_size = writer.packages[0].compressed_size
+            delta_size = delta.write_packages(directory / "delta")[0].compressed_size
+
+            print(
+                "{:>7} offers  first {:6.3f} s  diff {:6.3f} s  {:>5} changed"
+                "  package {:>9} -> {:>7} bytes".format(
+                    number, first_duration, diff_duration, len(delta),
+                    full_size, delta_size,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
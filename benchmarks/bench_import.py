@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_import
+    -----------------------
+
+    Measure the time needed to import cdiscountapi and the heavy modules it
+    loads, each in a new interpreter.
+
+    Usage::
+
+        python benchmarks/bench_import.py [number_of_runs]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import json
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ("zeep", "requests", "lxml", "yaml", "jinja2")
+
+STATEMENTS = (
+    "import cdiscountapi",
+    "from cdiscountapi.helpers import XmlGenerator",
+    "from cdiscountapi.packages.validator import OfferValidator",
+    "from cdiscountapi import Connection",
+)
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+duration = time.perf_counter() - start
+print(json.dumps([duration, [m for m in {modules!r} if m in sys.modules]]))
+"""
+
+
+def measure(statement):
+    """
+    Return the duration of the statement in a new interpreter and the heavy
+    modules it imported
+    """
+    script = SCRIPT.format(statement=statement, modules=HEAVY_MODULES)
+    output = subprocess.check_output([sys.executable, "-c", script])
+    duration, modules = json.loads(output.decode("utf8"))
+    return duration, modules
+
+
+def main(runs):
+    for statement in STATEMENTS:
+        results = [measure(statement) for _ in range(runs)]
+        duration = statistics.median(duration for duration, _ in results)
+        modules = results[-1][1]
+        print(
+            "{:<60} {:8.1f} ms  {}".format(
+                statement, duration * 1000, ", ".join(modules) or "-"
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
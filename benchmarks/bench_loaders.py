@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_loaders
+    ------------------------
+
+    Measure the time and the peak of the memory allocated by Python to build
+    the offer packages of a CSV file with the loader and the package writer.
+    The peak should not depend on the number of offers.
+
+    Usage::
+
+        python benchmarks/bench_loaders.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from cdiscountapi.packages.loaders import read_offers_csv
+from cdiscountapi.packages.writer import PackageWriter
+
+
+COLUMNS = (
+    "ProductEan,SellerProductId,ProductCondition,Price,EcoPart,Vat,DeaTax,Stock,"
+    "PreparationTime,ShippingCharges.Standard,AdditionalShippingCharges.Standard\n"
+)
+
+
+def write_csv(path, number):
+    with open(path, "w") as f:
+        f.write(COLUMNS)
+        for i in range(number):
+            f.write(
+                "{:013d},SKU{},6,{},0,20,0,{},1,2,1\n".format(
+                    3600000000000 + i, i, 10 + i % 100, i % 20
+                )
+            )
+
+
+def build_packages(directory):
+    errors = []
+    with PackageWriter(directory / "offers") as writer:
+        writer.extend(read_offers_csv(directory / "offers.csv", on_error=errors.append))
+    assert not errors
+    return writer.packages
+
+
+def main(numbers):
+    for number in numbers:
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            write_csv(directory / "offers.csv", number)
+
+            start = time.perf_counter()
+            packages = build_packages(directory)
+            duration = time.perf_counter() - start
+
+            # tracemalloc slows the allocations down: the peak is measured
+            # by another run
+            tracemalloc.start()
+            build_packages(directory)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(
+                "{:>7} offers  {:7.3f} s  {:>7.0f} offers/s  {} packages"
+                "  peak {:6.1f} MiB".format(
+                    number, duration, number / duration, len(packages),
+                    peak / 1024 ** 2,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_packages
+    -------------------------
+
+    Measure the time and the peak memory needed to generate an offer package,
+    with the template and with the streaming writer. Each measure runs in a
+    new process so that the maximum resident set size is its own.
+
+    Usage::
+
+        python benchmarks/bench_packages.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from cdiscountapi.helpers import generate_package
+
+
+def iter_offers(number):
+    return (
+        {
+            "Offer": {
+                "ProductEan": "{:013d}".format(3600000000000 + i),
+                "SellerProductId": "SKU{}".format(i),
+                "ProductCondition": 6,
+                "Price": 10 + i % 100,
+                "EcoPart": 0,
+                "Vat": 20,
+                "DeaTax": 0,
+                "Stock": i % 20,
+                "PreparationTime": 1,
+                "ShippingInformationList": {
+                    "ShippingInformation": [
+                        {
+                            "ShippingCharges": 2,
+                            "AdditionalShippingCharges": 1,
+                            "DeliveryMode": "Standard",
+                        }
+                    ]
+                },
+            }
+        }
+        for i in range(number)
+    )
+
+
+def make_offers(number):
+    return list(iter_offers(number))
+
+
+def measure(number, streaming=False):
+    """
+    Return the duration, the peak of memory allocated by Python and the
+    maximum resident set size to generate a package with `number` offers
+
+    The template needs the list of the offers, the streaming writer consumes
+    a generator.
+    """
+    offers = iter_offers(number) if streaming else make_offers(number)
+    with tempfile.TemporaryDirectory() as directory:
+        package_path = Path(directory) / "offers"
+        tracemalloc.start()
+        start = time.perf_counter()
+        generate_package(
+            "offer", package_path, {"OfferCollection": offers}, streaming=streaming
+        )
+        duration = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return duration, peak, max_rss
+
+
+def measure_in_new_process(number, streaming):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(measure, (number, streaming))
+
+
+def main(numbers):
+    for streaming in (False, True):
+        for number in numbers:
+            duration, peak, max_rss = measure_in_new_process(number, streaming)
+            print(
+                "{:<9} {:>7} offers  {:8.3f} s  peak {:8.1f} MB  max RSS {:8.1f} MB".format(
+                    "streaming" if streaming else "template",
+                    number,
+                    duration,
+                    peak / 1024 ** 2,
+                    max_rss / 1024 ** 2,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000])
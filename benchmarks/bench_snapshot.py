@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_snapshot
+    -------------------------
+
+    Compare the time needed to parse the WSDL with the time needed to load
+    its bundled snapshot.
+
+    The WSDL and the XSD documents are loaded from an in-memory cache filled
+    from the VCR cassettes of the tests so only the parsing is measured.
+
+    Usage::
+
+        python benchmarks/bench_snapshot.py [repeat]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import vcr
+from zeep import Client
+from zeep.cache import InMemoryCache
+from zeep.transports import Transport
+from zeep.wsdl import Document
+
+from cdiscountapi import snapshot
+
+
+CASSETTE = (
+    Path(__file__).parent.parent
+    / "tests"
+    / "cassettes"
+    / "test_connection"
+    / "test_initialization.yaml"
+)
+WSDL = snapshot.WSDL_URL.format("cdiscount.com")
+
+
+def best_of(repeat, func):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main(repeat):
+    transport = Transport(cache=InMemoryCache(timeout=None))
+    with vcr.use_cassette(str(CASSETTE), record_mode="none"):
+        content = transport.load(WSDL)
+        Document(io.BytesIO(content), transport, base=WSDL)
+
+    digest = snapshot.digest_of(content)
+
+    def parse():
+        Client(Document(io.BytesIO(content), transport, base=WSDL), transport=transport)
+
+    def load():
+        Client(snapshot.load_snapshot("cdiscount.com", digest, transport), transport=transport)
+
+    if snapshot.load_snapshot("cdiscount.com", digest, transport) is None:
+        sys.exit("The bundled snapshot doesn't match the WSDL of the cassette.")
+
+    print("Client from the parsed WSDL:  {:.3f} s".format(best_of(repeat, parse)))
+    print("Client from the snapshot:     {:.3f} s".format(best_of(repeat, load)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_splitter
+    -------------------------
+
+    Measure the time needed to split offers into packages of 10000 offers
+    with different numbers of processes.
+
+    Usage::
+
+        python benchmarks/bench_splitter.py [number_of_offers]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_packages import iter_offers
+
+from cdiscountapi.packages.splitter import split_package
+
+
+def main(number):
+    cpu_count = os.cpu_count() or 1
+    for max_workers in sorted({0, 1, 2, cpu_count}):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            manifest = split_package(
+                "offer",
+                Path(directory) / "offers",
+                {"OfferCollection": iter_offers(number)},
+                max_workers=max_workers,
+            )
+            duration = time.perf_counter() - start
+        print(
+            "{:>7} offers  {:>2} processes  {:>3} packages  {:8.3f} s".format(
+                number, max_workers, len(manifest), duration
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_stock
+    ----------------------
+
+    Measure the time needed to build a StockAndPrice package from rows
+    (ProductEan, SellerProductId, Price, Stock) with the dedicated writer and
+    from the same offers with the streaming writer of the offers.
+
+    Usage::
+
+        python benchmarks/bench_stock.py [number_of_rows ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import io
+import sys
+import time
+
+from cdiscountapi.packages.stock import write_stock_and_price_package
+from cdiscountapi.packages.writer import write_offer_package
+
+
+def make_rows(number):
+    return [
+        ("{:013d}".format(3600000000000 + i), "SKU{}".format(i), 10 + i % 100 / 4, i % 20)
+        for i in range(number)
+    ]
+
+
+def main(numbers):
+    for number in numbers:
+        rows = make_rows(number)
+        offers = [
+            {
+                "Offer": {
+                    "ProductEan": ean,
+                    "SellerProductId": sku,
+                    "Price": price,
+                    "Stock": stock,
+                }
+            }
+            for ean, sku, price, stock in rows
+        ]
+
+        start = time.perf_counter()
+        write_stock_and_price_package(io.BytesIO(), rows)
+        rows_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        write_offer_package(
+            io.BytesIO(), {"PackageType": "StockAndPrice", "OfferCollection": offers}
+        )
+        offers_duration = time.perf_counter() - start
+
+        print(
+            "{:>7} rows  stock and price {:7.3f} s  offers {:7.3f} s  ({:.1f}x)".format(
+                number, rows_duration, offers_duration, offers_duration / rows_duration
+            )
+        )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_templates
+    --------------------------
+
+    Measure the overhead of the template for each offer package: a new Jinja
+    environment per package, the shared environment compiling the template
+    once and the shared environment with the precompiled templates.
+
+    Usage::
+
+        python benchmarks/bench_templates.py [number_of_packages]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import time
+
+from cdiscountapi.packages import templates
+
+
+def render(environment):
+    # A package with one offer, as rendered by OfferPackage.generate
+    return environment.get_template("Offers.xml").render(
+        offers=[{
+            "attributes": 'ProductEan="3600000000000" SellerProductId="SKU1" Price="10"',
+            "shipping_information_list": [],
+        }],
+        offer_publication_list=[],
+        purge_and_replace=False,
+        package_type="StockAndPrice",
+        name="A package",
+    )
+
+
+def measure(number, get_environment):
+    start = time.perf_counter()
+    for _ in range(number):
+        render(get_environment())
+    return (time.perf_counter() - start) / number
+
+
+def main(number):
+    shared = templates.create_environment(precompiled=False)
+    precompiled = templates.create_environment()
+    cases = (
+        ("new environment", lambda: templates.create_environment(precompiled=False)),
+        ("shared environment", lambda: shared),
+        ("precompiled", lambda: precompiled),
+    )
+    print("precompiled templates valid: {}".format(
+        templates.compiled_templates_are_valid()
+    ))
+    for label, get_environment in cases:
+        print("{:<20} {:10.1f} µs/package".format(
+            label, measure(number, get_environment) * 1e6
+        ))
+
+    # First package of a process: compile or import the template
+    for label, precompiled in (("first (compile)", False), ("first (precompiled)", True)):
+        start = time.perf_counter()
+        templates.create_environment(precompiled).get_template("Offers.xml")
+        print("{:<20} {:10.1f} µs".format(label, (time.perf_counter() - start) * 1e6))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
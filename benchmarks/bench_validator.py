@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_validator
+    --------------------------
+
+    Measure the time needed to validate a collection of offers with
+    OfferValidator.validate_many (one pass, every error reported, the types
+    and the nested lists checked too) compared with:
+
+    - OfferValidator.validate called on each offer (only the attributes
+      checked, stopped by the first error)
+    - the same checks as validate_many made one offer at a time
+
+    The best time of several runs is reported.
+
+    Usage::
+
+        python benchmarks/bench_validator.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import time
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.validator import OfferValidator
+
+
+def make_offers(number, invalid=0.01):
+    """
+    Return number offers with shipping information, some of them are
+    invalid
+    """
+    step = int(1 / invalid) if invalid else number + 1
+    offers = []
+    for i in range(number):
+        offer = {
+            "ProductEan": "{:013d}".format(3600000000000 + i),
+            "SellerProductId": "SKU{}".format(i),
+            "ProductCondition": 6,
+            "Price": 10.5 + i % 100,
+            "Stock": i % 20,
+            "Vat": 20.0,
+            "DeaTax": 0,
+            "EcoPart": 0,
+            "PreparationTime": 1,
+            "ShippingInformationList": {
+                "ShippingInformation": [
+                    {
+                        "DeliveryMode": "Standard",
+                        "ShippingCharges": 2.5,
+                        "AdditionalShippingCharges": 1,
+                    }
+                ]
+            },
+        }
+        if i % step == step - 1:
+            offer["Stock"] = "many"
+        offers.append({"Offer": offer})
+    return offers
+
+
+def validate_each(offers):
+    # What a caller needed before validate_many: one try by offer
+    errors = 0
+    for offer in offers:
+        try:
+            OfferValidator.validate(offer["Offer"])
+        except ValidationError:
+            errors += 1
+    return errors
+
+
+def check_each(offers):
+    # The checks of validate_many made one offer at a time
+    errors_of = OfferValidator.compile().errors_of
+    return sum(1 for offer in offers if errors_of(offer["Offer"]))
+
+
+def best_time(function, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main(numbers):
+    for number in numbers:
+        offers = make_offers(number)
+        each, _ = best_time(lambda: validate_each(offers))
+        checks, _ = best_time(lambda: check_each(offers))
+        batch, report = best_time(
+            lambda: OfferValidator.validate_many(offers, key="Offer")
+        )
+
+        print(
+            "{:>7} offers  {:>5} errors  validate {:8.3f} s  one at a time {:8.3f} s"
+            "  validate_many {:8.3f} s  ({:.0f} offers/s)".format(
+                number, len(report), each, checks, batch, number / batch
+            )
+        )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+    benchmarks.bench_xsd
+    --------------------
+
+    Measure the time needed to build an offer package with and without the
+    validation of Offers.xml against the bundled schema, with the template
+    and with the streaming writer.
+
+    Usage::
+
+        python benchmarks/bench_xsd.py [number_of_offers ...]
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sys
+import time
+
+from cdiscountapi.helpers import build_package
+from cdiscountapi.packages.xsd import get_schema
+
+from bench_packages import make_offers
+
+
+def measure(offers, streaming, validate):
+    start = time.perf_counter()
+    build_package(
+        "offer", {"OfferCollection": offers}, streaming=streaming, validate=validate
+    )
+    return time.perf_counter() - start
+
+
+def main(numbers):
+    start = time.perf_counter()
+    get_schema("offer")
+    print("Schema compiled in {:.1f} ms".format((time.perf_counter() - start) * 1000))
+
+    for number in numbers:
+        offers = make_offers(number)
+        for streaming in (False, True):
+            without = min(measure(offers, streaming, False) for _ in range(3))
+            with_validation = min(measure(offers, streaming, True) for _ in range(3))
+            print(
+                "{:>7} offers  {:<9}  {:8.3f} s  validated {:8.3f} s  (+{:.0f}%)".format(
+                    number,
+                    "streaming" if streaming else "template",
+                    without,
+                    with_validation,
+                    (with_validation / without - 1) * 100,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 10000, 100000])
@@ -4,4 +4,32 @@ cdiscountapi is a wrapper around the Cdiscount Marketplace API
 
 __version__ = "0.2.2"
 
-from cdiscountapi.cdiscountapi import Connection
+import importlib
+import sys
+
+# The connections (and so zeep, lxml, requests and yaml) are only imported
+# when they are used: generating packages doesn't need them
+_LAZY_ATTRIBUTES = {
+    "Connection": "cdiscountapi.cdiscountapi",
+    "AsyncConnection": "cdiscountapi.aio",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+# Python 3.6 doesn't support the __getattr__ of the modules
+if sys.version_info < (3, 7):
+    from cdiscountapi.cdiscountapi import Connection  # noqa: F401
+    from cdiscountapi.aio import AsyncConnection  # noqa: F401
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.aio
+    ----------------
+
+    An asyncio version of the Connection.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import asyncio
+import time
+from functools import partial
+
+import lxml
+from zeep import AsyncClient
+from zeep.helpers import serialize_object
+from zeep.transports import AsyncTransport
+
+from cdiscountapi.batch import run_batch_async
+from cdiscountapi.cdiscountapi import Connection
+from cdiscountapi.exceptions import CdiscountApiConnectionError
+from cdiscountapi.tokens import Token
+
+
+class AsyncConnection(Connection):
+    """
+    A Connection whose section methods return coroutines
+
+    The WSDL and the first token are loaded when the connection is created
+    (the creation is blocking), then the operations and the refresh of the
+    token are sent with httpx. The sections and their return values are the
+    same as those of :py:class:`cdiscountapi.Connection`.
+
+    It requires httpx::
+
+        $ pip install cdiscountapi[async]
+
+    :param transport: A zeep.transports.AsyncTransport
+                      (default value: an AsyncTransport with the cache)
+
+    The other parameters are those of :py:class:`cdiscountapi.Connection`
+    (except ``offline``).
+
+    Usage::
+
+        async with AsyncConnection(login, password, config=config) as api:
+            orders, offers = await asyncio.gather(
+                api.orders.get_order_list(),
+                api.offers.get_offer_list_paginated(PageNumber=1),
+            )
+    """
+
+    client_class = AsyncClient
+    is_async = True
+
+    def __init__(self, login, password, *args, **kwargs):
+        self._async_token_lock = None
+        super().__init__(login, password, *args, **kwargs)
+
+    def create_transport(self, cache, offline):
+        if offline:
+            raise CdiscountApiConnectionError(
+                "The offline mode is not available with AsyncConnection."
+            )
+        try:
+            return AsyncTransport(cache=cache)
+        except RuntimeError:
+            raise CdiscountApiConnectionError(
+                "AsyncConnection requires httpx (pip install cdiscountapi[async])."
+            )
+
+    async def call(self, operation, **kwargs):
+        """
+        Send the operation with the header message and return the response
+        as a dictionary
+
+        Usage::
+
+            response = await api.call("GetOrderList", orderFilter=order_filter)
+        """
+        response = await getattr(self.client.service, operation)(
+            headerMessage=self.header, **kwargs
+        )
+        return serialize_object(response, dict)
+
+    async def batch(self, calls, max_workers=None):
+        """
+        The asynchronous version of :py:meth:`Connection.batch`: at most
+        max_workers calls are in flight at the same time
+
+        Usage::
+
+            results = await api.batch([
+                partial(api.orders.get_order_list, OrderReferenceList=[reference])
+                for reference in references
+            ], max_workers=100)
+        """
+        await self.ensure_token_async()
+        return await run_batch_async(calls, max_workers=max_workers or self.max_workers)
+
+    async def map(self, func, items, max_workers=None):
+        """
+        The asynchronous version of :py:meth:`Connection.map`
+        """
+        return await self.batch([partial(func, item) for item in items], max_workers)
+
+    def get_token(self):
+        response = self.transport.wsdl_client.get(
+            self.auth_url, auth=(self.login, self.password)
+        )
+        return lxml.etree.XML(response.text).text
+
+    async def get_token_async(self):
+        response = await self.transport.client.get(
+            self.auth_url, auth=(self.login, self.password)
+        )
+        return lxml.etree.XML(response.text).text
+
+    @property
+    def async_token_lock(self):
+        # The lock is created in the event loop that uses it
+        if self._async_token_lock is None:
+            self._async_token_lock = asyncio.Lock()
+        return self._async_token_lock
+
+    async def _fetch_token_async(self, rejected=None):
+        # The lock of the store is not held: it would block the event loop
+        token = self.token_store.get(self.token_key)
+        if self._must_refresh(token, rejected):
+            token = Token(await self.get_token_async(), time.time() + self.token_lifetime)
+            self.token_store.set(self.token_key, token)
+        return token
+
+    async def ensure_token_async(self):
+        """
+        The asynchronous version of :py:meth:`Connection.ensure_token`
+        """
+        if self._must_refresh(self.current_token):
+            async with self.async_token_lock:
+                if self._must_refresh(self.current_token):
+                    self._set_token(await self._fetch_token_async())
+        return self.token
+
+    async def refresh_token_async(self, rejected=None):
+        """
+        The asynchronous version of :py:meth:`Connection.refresh_token`: the
+        coroutines sharing the connection wait for a single refresh
+        """
+        async with self.async_token_lock:
+            rejected = rejected or self.token
+            if self.token == rejected:
+                token = await self._fetch_token_async(rejected)
+            else:
+                token = self.current_token
+            self._set_token(token)
+            return self.token
+
+    async def aclose(self):
+        """
+        Close the connections of the transport
+        """
+        await self.transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
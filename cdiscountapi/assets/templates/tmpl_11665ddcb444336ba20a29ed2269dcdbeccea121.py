@@ -0,0 +1,59 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'Products.xml'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_name = resolve('name')
+    l_0_capacity = resolve('capacity')
+    l_0_products = resolve('products')
+    pass
+    yield '<ProductPackage Name="'
+    yield str((undefined(name='name') if l_0_name is missing else l_0_name))
+    yield '" xmlns="clr-namespace:Cdiscount.Service.ProductIntegration.Pivot;assembly=Cdiscount.Service.ProductIntegration" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">\n  <ProductPackage.Products>\n      <ProductCollection Capacity="'
+    yield str((undefined(name='capacity') if l_0_capacity is missing else l_0_capacity))
+    yield '">\n'
+    for l_1_product in (undefined(name='products') if l_0_products is missing else l_0_products):
+        _loop_vars = {}
+        pass
+        yield '      <Product '
+        yield str(environment.getitem(l_1_product, 'attributes'))
+        yield ' >\n        <Product.EanList>\n'
+        for l_2_product_ean in environment.getitem(l_1_product, 'EanList'):
+            _loop_vars = {}
+            pass
+            yield '            <ProductEan Ean="'
+            yield str(l_2_product_ean)
+            yield '"/>\n'
+        l_2_product_ean = missing
+        yield '        </Product.EanList>\n        <Product.ModelProperties>\n'
+        for l_2_model_property in environment.getitem(l_1_product, 'ModelProperties'):
+            _loop_vars = {}
+            pass
+            for (l_3_key, l_3_value) in context.call(environment.getattr(l_2_model_property, 'items'), _loop_vars=_loop_vars):
+                _loop_vars = {}
+                pass
+                yield '          <x:String x:Key="'
+                yield str(l_3_key)
+                yield '">'
+                yield str(l_3_value)
+                yield '</x:String>\n'
+            l_3_key = l_3_value = missing
+        l_2_model_property = missing
+        yield '        </Product.ModelProperties>\n        <Product.Pictures>\n'
+        for l_2_product_image in environment.getitem(l_1_product, 'Pictures'):
+            _loop_vars = {}
+            pass
+            yield '          <ProductImage Uri="'
+            yield str(l_2_product_image)
+            yield '"/>\n'
+        l_2_product_image = missing
+        yield '        </Product.Pictures>\n      </Product>\n'
+    l_1_product = missing
+    yield '    </ProductCollection>\n  </ProductPackage.Products>\n</ProductPackage>\n'
+
+blocks = {}
+debug_info = '1=15&3=17&4=19&5=23&7=25&8=29&12=33&13=36&14=40&19=47&20=51'
\ No newline at end of file
@@ -0,0 +1,87 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'Offers.xml'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_name = resolve('name')
+    l_0_package_type = resolve('package_type')
+    l_0_purge_and_replace = resolve('purge_and_replace')
+    l_0_offers = resolve('offers')
+    l_0_offer_publication_list = resolve('offer_publication_list')
+    try:
+        t_1 = environment.filters['length']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'length' found.")
+    pass
+    yield '<OfferPackage Name="'
+    yield str((undefined(name='name') if l_0_name is missing else l_0_name))
+    yield '" PackageType="'
+    yield str((undefined(name='package_type') if l_0_package_type is missing else l_0_package_type))
+    yield '" PurgeAndReplace="'
+    yield str((undefined(name='purge_and_replace') if l_0_purge_and_replace is missing else l_0_purge_and_replace))
+    yield '" xmlns="clr-namespace:Cdiscount.Service.OfferIntegration.Pivot;assembly=Cdiscount.Service.OfferIntegration" xmlns:x="http://schemas.microsoft.com/winfx/2006/xaml">\n  <OfferPackage.Offers>\n    <OfferCollection Capacity="1">\n'
+    for l_1_offer in (undefined(name='offers') if l_0_offers is missing else l_0_offers):
+        _loop_vars = {}
+        pass
+        yield '        <Offer '
+        yield str(environment.getitem(l_1_offer, 'attributes'))
+        yield '>\n        <Offer.ShippingInformationList>\n            <ShippingInformationList Capacity="'
+        yield str(t_1(environment.getitem(l_1_offer, 'shipping_information_list')))
+        yield '">\n'
+        for l_2_shipping_info in environment.getitem(l_1_offer, 'shipping_information_list'):
+            _loop_vars = {}
+            pass
+            yield '            <ShippingInformation AdditionalShippingCharges="'
+            yield str(environment.getitem(l_2_shipping_info, 'AdditionalShippingCharges'))
+            yield '" DeliveryMode="'
+            yield str(environment.getitem(l_2_shipping_info, 'DeliveryMode'))
+            yield '" ShippingCharges="'
+            yield str(environment.getitem(l_2_shipping_info, 'ShippingCharges'))
+            yield '" />\n'
+        l_2_shipping_info = missing
+        yield '          </ShippingInformationList>\n        </Offer.ShippingInformationList>\n'
+        if ('discount_list' in l_1_offer):
+            pass
+            yield '        <Offer.PriceAndDiscountList>\n            <DiscountComponentList Capacity="'
+            yield str(t_1(environment.getitem(l_1_offer, 'discount_list')))
+            yield '">\n'
+            for l_2_discount_component in environment.getitem(l_1_offer, 'discount_list'):
+                _loop_vars = {}
+                pass
+                yield '            <DiscountComponent DiscountUnit="1" DiscountValue="'
+                yield str(environment.getitem(l_2_discount_component, 'DiscountValue'))
+                yield '" EndDate="'
+                yield str(environment.getitem(l_2_discount_component, 'EndDate'))
+                yield '" StartDate="'
+                yield str(environment.getitem(l_2_discount_component, 'StartDate'))
+                yield '" Type="'
+                yield str(environment.getitem(l_2_discount_component, 'Type'))
+                yield '" />\n'
+            l_2_discount_component = missing
+            yield '          </DiscountComponentList>\n        </Offer.PriceAndDiscountList>\n'
+        yield '      </Offer>\n'
+    l_1_offer = missing
+    yield '    </OfferCollection>\n    </OfferPackage.Offers>\n'
+    if (undefined(name='offer_publication_list') if l_0_offer_publication_list is missing else l_0_offer_publication_list):
+        pass
+        yield '  <OfferPackage.OfferPublicationList>\n      <OfferPublicationList Capacity="'
+        yield str(t_1((undefined(name='offer_publication_list') if l_0_offer_publication_list is missing else l_0_offer_publication_list)))
+        yield '">\n'
+        for l_1_publication_pool in (undefined(name='offer_publication_list') if l_0_offer_publication_list is missing else l_0_offer_publication_list):
+            _loop_vars = {}
+            pass
+            yield '          <PublicationPool Id="'
+            yield str(environment.getitem(l_1_publication_pool, 'Id'))
+            yield '" />\n'
+        l_1_publication_pool = missing
+        yield '      </OfferPublicationList>\n  </OfferPackage.OfferPublicationList>\n'
+    yield '</OfferPackage>'
+
+blocks = {}
+debug_info = '1=23&4=29&5=33&7=35&8=37&9=41&13=49&15=52&16=54&17=58&26=71&28=74&29=76&30=80'
\ No newline at end of file
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.batch
+    ------------------
+
+    Send many calls to the API on a bounded pool of threads.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from cdiscountapi.transport import DEFAULT_POOL_SIZE
+
+
+class BatchResult(namedtuple("BatchResult", ["value", "error"])):
+    """
+    The result of a call in a batch: the returned value or the raised exception
+    """
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _run(call):
+    try:
+        return BatchResult(call(), None)
+    except Exception as e:
+        return BatchResult(None, e)
+
+
+def run_batch(calls, max_workers=DEFAULT_POOL_SIZE):
+    """
+    Run the calls on at most max_workers threads
+
+    :param calls: An iterable of functions without arguments
+    :param int max_workers: The maximum number of calls running at the same time
+    :returns: The list of the BatchResult in the order of the calls
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+
+    max_workers = max(1, min(max_workers, len(calls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_run, calls))
+
+
+async def run_batch_async(calls, max_workers=DEFAULT_POOL_SIZE):
+    """
+    Await the coroutines returned by the calls with at most max_workers
+    coroutines running at the same time
+
+    :param calls: An iterable of functions without arguments returning a
+                  coroutine
+    :param int max_workers: The maximum number of calls running at the same time
+    :returns: The list of the BatchResult in the order of the calls
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(call):
+        async with semaphore:
+            try:
+                return BatchResult(await call(), None)
+            except Exception as e:
+                return BatchResult(None, e)
+
+    return list(await asyncio.gather(*(run(call) for call in calls)))
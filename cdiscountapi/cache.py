@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.cache
+    ------------------
+
+    Persistent caches for the WSDL and XSD documents of the API.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from zeep.cache import Base
+
+
+# CONSTANTS
+# The WSDL of the Marketplace API rarely changes: one day is a sensible default
+DEFAULT_TIMEOUT = 24 * 3600
+
+
+CacheEntry = namedtuple("CacheEntry", ["created", "digest", "content"])
+
+
+def digest_of(content):
+    """
+    Return the SHA-256 hexdigest of the content
+    """
+    if isinstance(content, str):
+        content = content.encode("utf8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class SchemaCache(Base):
+    """
+    Base class for the caches of the WSDL and XSD documents
+
+    Each document is stored with its creation time and the hash of its
+    content:
+
+    - an entry older than ``timeout`` seconds is not returned so the
+      document is downloaded again. When the new content has the same hash,
+      only the creation time of the entry is updated.
+    - an entry whose content doesn't match its hash is considered as missing.
+
+    :param int timeout: The number of seconds an entry is valid
+                        (``None`` means the entries never expire)
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+
+    def _read(self, url):
+        """
+        Return the CacheEntry for the url or None
+        """
+        raise NotImplementedError
+
+    def _write(self, url, entry):
+        raise NotImplementedError
+
+    def _touch(self, url, created):
+        """
+        Update the creation time of an existing entry
+        """
+        raise NotImplementedError
+
+    def is_expired(self, entry):
+        if self.timeout is None:
+            return False
+        return time.time() - entry.created > self.timeout
+
+    def get(self, url, expired=False):
+        """
+        Return the content cached for the url or None
+
+        :param str url: The url of the document
+        :param bool expired: Whether an expired entry can be returned
+                             (used in offline mode)
+        """
+        entry = self._read(url)
+        if entry is None or digest_of(entry.content) != entry.digest:
+            return None
+
+        if not expired and self.is_expired(entry):
+            return None
+        return entry.content
+
+    def add(self, url, content):
+        if isinstance(content, str):
+            content = content.encode("utf8")
+
+        now = time.time()
+        digest = digest_of(content)
+        entry = self._read(url)
+        if entry is not None and entry.digest == digest:
+            # The document didn't change since it was cached
+            self._touch(url, now)
+        else:
+            self._write(url, CacheEntry(now, digest, content))
+
+
+class FileCache(SchemaCache):
+    """
+    Cache the WSDL and XSD documents in a directory
+
+    Usage::
+
+        cache = FileCache("/var/cache/cdiscountapi", timeout=3600)
+        api = Connection(login, password, header_message=header_message, cache=cache)
+
+    :param str path: The directory in which the documents are stored
+    :param int timeout: The number of seconds an entry is valid
+    """
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha1(url.encode("utf8")).hexdigest()
+        return self.path / (name + ".xml"), self.path / (name + ".json")
+
+    def _replace(self, path, content):
+        """
+        Write the content in a temporary file then move it to path so that
+        the other processes never read a partial file
+        """
+        fd, tmp = tempfile.mkstemp(dir=str(self.path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp, str(path))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _read_metadata(self, url):
+        _, metadata_path = self._paths(url)
+        try:
+            return json.loads(metadata_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_metadata(self, url, created, digest):
+        _, metadata_path = self._paths(url)
+        metadata = {"url": url, "created": created, "digest": digest}
+        self._replace(metadata_path, json.dumps(metadata).encode("utf8"))
+
+    def _read(self, url):
+        content_path, _ = self._paths(url)
+        metadata = self._read_metadata(url)
+        if metadata is None:
+            return None
+
+        try:
+            content = content_path.read_bytes()
+        except OSError:
+            return None
+        return CacheEntry(metadata["created"], metadata["digest"], content)
+
+    def _write(self, url, entry):
+        content_path, _ = self._paths(url)
+        self._replace(content_path, entry.content)
+        self._write_metadata(url, entry.created, entry.digest)
+
+    def _touch(self, url, created):
+        metadata = self._read_metadata(url)
+        if metadata is not None:
+            self._write_metadata(url, created, metadata["digest"])
+
+
+class SqliteCache(SchemaCache):
+    """
+    Cache the WSDL and XSD documents in a SQLite database
+
+    Usage::
+
+        cache = SqliteCache("/var/cache/cdiscountapi.db", timeout=3600)
+        api = Connection(login, password, header_message=header_message, cache=cache)
+
+    :param str path: The path to the database
+    :param int timeout: The number of seconds an entry is valid
+    """
+
+    def __init__(self, path, timeout=DEFAULT_TIMEOUT):
+        super().__init__(timeout=timeout)
+        if str(path) == ":memory:":
+            raise ValueError("SqliteCache needs a file to be shared between connections.")
+
+        self.path = str(path)
+        self._lock = threading.RLock()
+        with self.db_connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents "
+                "(url TEXT PRIMARY KEY, created REAL, digest TEXT, content BLOB)"
+            )
+
+    @contextmanager
+    def db_connection(self):
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def _read(self, url):
+        with self.db_connection() as conn:
+            row = conn.execute(
+                "SELECT created, digest, content FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return CacheEntry(row[0], row[1], bytes(row[2]))
+
+    def _write(self, url, entry):
+        with self.db_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (url, created, digest, content) "
+                "VALUES (?, ?, ?, ?)",
+                (url, entry.created, entry.digest, entry.content),
+            )
+
+    def _touch(self, url, created):
+        with self.db_connection() as conn:
+            conn.execute("UPDATE documents SET created = ? WHERE url = ?", (created, url))
+
+
+def get_cache(cache):
+    """
+    Return the cache to use for the documents
+
+    :param cache: None, a SchemaCache or the path to a directory or to a SQLite
+                  database (with the suffix .db, .sqlite or .sqlite3)
+    """
+    if cache is None or isinstance(cache, Base):
+        return cache
+
+    path = Path(cache)
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        return SqliteCache(path)
+    return FileCache(path)
@@ -7,13 +7,27 @@
 """
 
 
+import threading
+import time
+from functools import partial
+
 import lxml
-import requests
 from zeep import Client
 from zeep.plugins import HistoryPlugin
 from zeep.helpers import serialize_object
 
+from cdiscountapi.batch import run_batch
+from cdiscountapi.cache import get_cache
 from cdiscountapi.exceptions import CdiscountApiConnectionError
+from cdiscountapi.schema import registry
+from cdiscountapi.tokens import (
+    DEFAULT_REFRESH_MARGIN,
+    DEFAULT_TOKEN_LIFETIME,
+    Token,
+    get_token_store,
+    token_key,
+)
+from cdiscountapi.transport import DEFAULT_POOL_SIZE, Transport
 
 from cdiscountapi.sections import (
     Seller,
@@ -46,19 +60,72 @@ class Connection(object):
                          (default value: False)
     :param dict header_message: The header message
     :param str config: The path to a YAML config file
+    :param cache: The cache of the WSDL and XSD documents: a
+                  :py:class:`cdiscountapi.cache.FileCache`, a
+                  :py:class:`cdiscountapi.cache.SqliteCache` or the path to a
+                  directory or a SQLite database (.db, .sqlite or .sqlite3)
+                  (default value: None)
+    :param bool offline: Whether the WSDL and XSD documents are loaded from the
+                         cache only (default value: False)
+    :param bool shared_schema: Whether the parsed WSDL is shared with the other
+                               connections of the process (default value: True)
+    :param transport: The :py:class:`cdiscountapi.transport.Transport` used for
+                      the token and the SOAP requests. It can't be used with
+                      cache or offline (they are parameters of the transport).
+                      (default value: a Transport with a pool of 10 connections)
+    :param token_store: The store of the tokens: a
+                        :py:class:`cdiscountapi.tokens.TokenStore` or the path
+                        to a directory shared by several processes
+                        (default value: the store shared by the connections of
+                        the process)
+    :param int token_lifetime: The number of seconds a token is valid
+                               (default value: 48 hours)
+    :param int refresh_margin: The token is refreshed when it expires in less
+                               than refresh_margin seconds
+                               (default value: 1 hour)
 
     Usage::
 
         api = Connection(login, password, preprod, header_message=header_message, config=config)
 
+        # Load the WSDL from the cache without network I/O
+        api = Connection(login, password, config=config, cache="/var/cache/cdiscountapi",
+                         offline=True)
+
+        # Tune the pool of connections and the timeouts
+        transport = Transport(pool_size=32, timeout=10, operation_timeout=60)
+        api = Connection(login, password, config=config, transport=transport)
+
+        # Share the tokens between the processes
+        api = Connection(login, password, config=config,
+                         token_store="/var/cache/cdiscountapi/tokens")
+
     """
 
-    def __init__(self, login, password, preprod=False, header_message={}, config=""):
+    client_class = Client
+    is_async = False
+
+    def __init__(
+        self,
+        login,
+        password,
+        preprod=False,
+        header_message={},
+        config="",
+        cache=None,
+        offline=False,
+        shared_schema=True,
+        transport=None,
+        token_store=None,
+        token_lifetime=DEFAULT_TOKEN_LIFETIME,
+        refresh_margin=DEFAULT_REFRESH_MARGIN,
+    ):
         self.preprod = preprod
         if self.preprod:
-            domain = "preprod-cdiscount.com"
+            self.domain = "preprod-cdiscount.com"
         else:
-            domain = "cdiscount.com"
+            self.domain = "cdiscount.com"
+        domain = self.domain
 
         self.wsdl = "https://wsvc.{0}/MarketplaceAPIService.svc?wsdl".format(domain)
         self.auth_url = (
@@ -69,13 +136,34 @@ class Connection(object):
         self.login = login
         self.password = password
         self.history = HistoryPlugin()
-        self.client = Client(self.wsdl, plugins=[self.history])
+        if transport is None:
+            self.transport = self.create_transport(cache=get_cache(cache), offline=offline)
+        elif cache is not None or offline:
+            raise CdiscountApiConnectionError(
+                "You should provide transport or cache/offline. Not both."
+            )
+        else:
+            self.transport = transport
+        if shared_schema:
+            wsdl = registry.get_document(self.domain, self.wsdl, self.transport)
+        else:
+            wsdl = self.wsdl
+        self.client = self.client_class(
+            wsdl, transport=self.transport, plugins=[self.history]
+        )
         self.factory = self.client.type_factory("http://www.cdiscount.com")
 
         if self.login is None or self.password is None:
             raise CdiscountApiConnectionError("Please provide valid login and password")
 
-        self.token = self.get_token()
+        self.token_store = get_token_store(token_store)
+        self.token_key = token_key(self.login, self.domain, self.password)
+        self.token_lifetime = token_lifetime
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.token_expires = 0
+        self._token_lock = threading.RLock()
+        self.ensure_token()
 
         if header_message != {} and config != "":
             raise CdiscountApiConnectionError(
@@ -108,10 +196,159 @@ class Connection(object):
         self.discussions = Discussions(self)
         self.webmail = WebMail(self)
 
+    def create_transport(self, cache, offline):
+        return Transport(cache=cache, offline=offline)
+
+    def call(self, operation, **kwargs):
+        """
+        Send the operation with the header message and return the response
+        as a dictionary
+
+        Usage::
+
+            response = api.call("GetOrderList", orderFilter=order_filter)
+        """
+        response = getattr(self.client.service, operation)(
+            headerMessage=self.header, **kwargs
+        )
+        return serialize_object(response, dict)
+
+    @property
+    def max_workers(self):
+        # More threads than connections in the pool would open connections
+        # that are closed after each request
+        return getattr(self.transport, "pool_size", DEFAULT_POOL_SIZE)
+
+    def batch(self, calls, max_workers=None):
+        """
+        Run several calls to the sections concurrently
+
+        The threads share the session and the token of the connection. An
+        exception raised by a call is returned in its result instead of
+        stopping the other calls.
+
+        :param calls: An iterable of functions without arguments
+                      (use functools.partial to give the arguments)
+        :param int max_workers: The maximum number of calls running at the
+                                same time (default value: the size of the
+                                pool of connections of the transport)
+        :returns: The list of :py:class:`cdiscountapi.batch.BatchResult`
+                  (value, error) in the order of the calls
+
+        Usage::
+
+            from functools import partial
+
+            results = api.batch([
+                partial(api.orders.get_order_list, OrderReferenceList=["X1"]),
+                partial(api.discussions.close_discussion_list, [1, 2, 3]),
+            ])
+            for result in results:
+                if not result.ok:
+                    print(result.error)
+        """
+        # All the calls start with a valid token
+        self.ensure_token()
+        return run_batch(calls, max_workers=max_workers or self.max_workers)
+
+    def map(self, func, items, max_workers=None):
+        """
+        Call func for each item concurrently
+
+        :param func: A function taking one item (a method of a section for
+                     example)
+        :param items: The items
+        :param int max_workers: The maximum number of calls running at the
+                                same time (default value: the size of the
+                                pool of connections of the transport)
+        :returns: The list of :py:class:`cdiscountapi.batch.BatchResult` in
+                  the order of the items
+
+        Usage::
+
+            results = api.map(api.discussions.close_discussion_list,
+                              [[1, 2], [3, 4]], max_workers=8)
+            closed = [result.value for result in results if result.ok]
+        """
+        return self.batch([partial(func, item) for item in items], max_workers)
+
     def get_token(self):
-        response = requests.get(self.auth_url, auth=(self.login, self.password))
+        response = self.transport.session.get(
+            self.auth_url,
+            auth=(self.login, self.password),
+            timeout=self.transport.load_timeout,
+        )
         return lxml.etree.XML(response.text).text
 
+    @property
+    def current_token(self):
+        if self.token is None:
+            return None
+        return Token(self.token, self.token_expires)
+
+    def _set_token(self, token):
+        self.token = token.value
+        self.token_expires = token.expires
+        if hasattr(self, "header"):
+            self.header["Security"]["TokenId"] = token.value
+
+    def _must_refresh(self, token, rejected=None):
+        return (
+            token is None
+            or not token.is_valid(self.refresh_margin)
+            or token.value == rejected
+        )
+
+    def _fetch_token(self, rejected=None):
+        """
+        Return the token of the store or a new token if it's missing, about
+        to expire or rejected by the API
+        """
+        with self.token_store.lock(self.token_key):
+            token = self.token_store.get(self.token_key)
+            if self._must_refresh(token, rejected):
+                token = Token(self.get_token(), time.time() + self.token_lifetime)
+                self.token_store.set(self.token_key, token)
+            return token
+
+    def ensure_token(self):
+        """
+        Return a token valid for at least refresh_margin seconds
+
+        The token is only fetched from the store (or the API) when the
+        current token is about to expire so the requests never fail because
+        of an expired token.
+        """
+        if self._must_refresh(self.current_token):
+            with self._token_lock:
+                # Another thread may have refreshed the token in the meantime
+                if self._must_refresh(self.current_token):
+                    self._set_token(self._fetch_token())
+        return self.token
+
+    def refresh_token(self, rejected=None):
+        """
+        Replace the token rejected by the API
+
+        The refresh is single-flight: when several threads sharing the
+        connection see the same token rejected, only the first one fetches
+        a new token, the others wait for it and reuse it. The token of the
+        store is used if another connection already replaced the rejected
+        token.
+
+        :param str rejected: The token rejected by the API
+                             (default value: the current token)
+        """
+        with self._token_lock:
+            rejected = rejected or self.token
+            if self.token == rejected:
+                token = self._fetch_token(rejected)
+            else:
+                # Already refreshed by another thread
+                token = self.current_token
+            self._set_token(token)
+            return self.token
+
     def _analyze_history(self, attr, error_msg):
         if len(self.history._buffer) == 0:
             return error_msg
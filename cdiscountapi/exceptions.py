@@ -37,3 +37,9 @@ class ValidationError(Exception):
     """
     Raised when the parameters to create the Offers.xml or Products.xml are not valid
     """
+
+
+class ConflictError(ValidationError):
+    """
+    Raised when two different offers (or products) of a package have the same key
+    """
@@ -9,17 +9,16 @@
 """
 
 
+import inspect
+import io
 import json
 import os
+import uuid
+import warnings
 import zipfile
-from functools import wraps
+from functools import partial, wraps
 from pathlib import Path
-from shutil import (
-    copytree,
-    rmtree,
-)
-
-import zeep
+from shutil import rmtree
 
 from cdiscountapi.packages import (
     OfferPackage,
@@ -41,14 +40,19 @@ def check_package_type(package_type):
         raise ValueError('package_type must be either "offer" or "product".')
 
 
-# TODO Check the necessary files are present before adding them to the archive
 def make_package(package_type, path):
     """
     Insert the files necessary for the offer/product in a zip file
+
+    .. deprecated:: Use :py:func:`build_package`: it writes the zip file
+                    without the directory of the files
     """
-    current_path = path.cwd()
+    warnings.warn(
+        "make_package is deprecated, use build_package instead.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     check_package_type(package_type)
-    os.chdir(path)
     files = (
         "Content/{}s.xml".format(package_type.capitalize()),
         "_rels/.rels",
@@ -56,13 +60,126 @@ def make_package(package_type, path):
     )
     with zipfile.ZipFile(path.parent / (path.name + ".zip"), "w") as zf:
         for f in files:
-            zf.write(f, compress_type=zipfile.ZIP_DEFLATED)
-    os.chdir(current_path)
+            zf.write(path / f, f, compress_type=zipfile.ZIP_DEFLATED)
+
+
+def write_file(path, write):
+    """
+    Write a file in a temporary file renamed once it's complete: an incomplete
+    file is never visible
+
+    :param path: The path of the file
+    :param write: The function writing the content in the binary file object
+                  it receives
+    :returns: The path of the file (Path)
+    """
+    path = Path(path)
+    tmp_path = path.with_name(".{}.{}.tmp".format(path.name, uuid.uuid4().hex))
+    fd = os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(str(tmp_path), str(path))
+    except BaseException:
+        tmp_path.unlink()
+        raise
+    return path
+
+
+def _validated(write, package_type):
+    """
+    Return a function writing the XML like write after validating it
+    """
+    from cdiscountapi.packages.xsd import ValidatingWriter
+
+    def write_validated(output):
+        validating_output = ValidatingWriter(output, package_type)
+        result = write(validating_output)
+        validating_output.close()
+        return result
+
+    return write_validated
+
+
+def build_package(package_type, data, output=None, streaming=False, validate=False):
+    """
+    Build a zip package for the offers or the products without any temporary
+    file or directory
+
+    The current directory is not changed, so several packages can be built
+    at the same time by different threads.
+
+    Usage::
+
+        # Get the content of the package
+        content = build_package('offer', {'OfferCollection': offers})
+
+        # Write the package in a file
+        path = build_package('product', {'Products': products}, '/tmp/products.zip')
+
+    :param str package_type: 'offer' or 'product'
+    :param dict data: The data of :py:func:`generate_package`. The offers can
+    also be given as a table (a dictionary of columns, a pandas DataFrame or a
+    pyarrow Table) with the key OfferTable (cf
+    :py:func:`cdiscountapi.packages.columnar.write_offer_table_xml`) and the
+    offers of a StockAndPrice package as rows (ProductEan, SellerProductId,
+    Price, Stock) with the key StockAndPriceRows (cf
+    :py:func:`cdiscountapi.packages.stock.write_stock_and_price_xml`)
+    :param output: None to get the content of the package, the path of the
+    package or a writable binary file object
+    :param bool streaming: Write the offers one at a time in the package (cf
+    :py:func:`generate_package`)
+    :param bool validate: Check the XML against the schema of the package
+    type (cf :py:mod:`cdiscountapi.packages.xsd`) while it's written
+    :returns: The content of the package (bytes) when output is None, the
+    path of the package (Path) or the file object otherwise
+    :raises ValidationError: When validate is True and the XML is not valid
+    """
+    check_package_type(package_type)
+    package_type = package_type.lower()
+
+    # lxml is only needed to write the packages
+    from cdiscountapi.packages.writer import write_offers_xml, write_package
+
+    if package_type == "offer" and "OfferTable" in data:
+        from cdiscountapi.packages.columnar import write_offer_table_xml
+
+        content = partial(write_offer_table_xml, table=data["OfferTable"], data=data)
+    elif package_type == "offer" and "StockAndPriceRows" in data:
+        from cdiscountapi.packages.stock import write_stock_and_price_xml
+
+        content = partial(
+            write_stock_and_price_xml, rows=data["StockAndPriceRows"], data=data
+        )
+    elif streaming and package_type == "offer":
+        content = partial(write_offers_xml, data=data)
+    else:
+        content = XmlGenerator(data).generate().encode("utf8")
+
+    if validate and callable(content):
+        content = _validated(content, package_type)
+    elif validate:
+        from cdiscountapi.packages.xsd import validate_xml
+
+        validate_xml(content, package_type)
+
+    if output is None:
+        buffer = io.BytesIO()
+        write_package(buffer, package_type, content)
+        return buffer.getvalue()
+
+    if isinstance(output, (str, os.PathLike)):
+        return write_file(
+            output, partial(write_package, package_type=package_type, content=content)
+        )
+
+    write_package(output, package_type, content)
+    return output
 
 
-# TODO Print the name of the package after its creation
 # TODO Remove package_type. Determine package_type from the keys in data
-def generate_package(package_type, package_path, data, overwrite=True):
+def generate_package(package_type, package_path, data, overwrite=True, streaming=False,
+                     validate=False, cache=None):
     """
     Generate a zip package for the offers or the products
 
@@ -77,7 +194,7 @@ def generate_package(package_type, package_path, data, overwrite=True):
                                                'OfferPublicationList': offer_publications,
                                                'PurgeAndReplace': purge_and_replace})
 
-        # Generate Product package:
+        # Generate Product package:
         generate_package('product', package_path, {'Products': products})
 
     :param str package_type: 'offer' or 'product'
@@ -85,6 +202,18 @@ def generate_package(package_type, package_path, data, overwrite=True):
     :param dict data: offers or products as you can see on
     tests/samples/products/products_to_submit.json or
     tests/samples/offers/offers_to_submit.json
+    :param bool overwrite: Replace the package if it already exists and
+    remove the directory package_path
+    :param bool streaming: Write the offers one at a time in the zip file.
+    The memory used doesn't depend on the number of offers and OfferCollection
+    can be a generator but the duplicated offers are not removed
+    (only for the offer packages)
+    :param bool validate: Check the XML against the schema of the package
+    type before the package is created
+    :param cache: A :py:class:`cdiscountapi.packages.cache.PackageCache`: the
+    package is only generated if the same package is not in the cache
+    (streaming is ignored)
+    :returns: The path of the package
     """
     check_package_type(package_type)
     package_path = Path(package_path)
@@ -96,35 +225,25 @@ def generate_package(package_type, package_path, data, overwrite=True):
             "The directory {} does not exist.".format(package_path.parent)
         )
 
+    # package_path is the working directory of the previous versions
     if overwrite:
-        if package.exists():
-            package.unlink()
-        if package_path.exists():
+        if package_path.is_dir():
             rmtree(package_path)
     else:
         if package.exists():
             raise FileExistsError("The package {} already exists.".format(package))
         if package_path.exists():
-            raise FileExistsError("The package_path {} already exists.".format(package_path))
-
-    # Copy tree package.
-    package_template = os.path.join(
-        os.path.dirname(__file__),
-        "packages",
-        f"{package_type}_package"
-    )
-    copytree(package_template, package_path)
-    xml_filename = package_type.capitalize() + "s.xml"
-
-    # TODO Fix offer_dict
-    # Add Products.xml from product_dict.
-    with open(f"{package_path}/Content/{xml_filename}", "wb") as f:
-        xml_generator = XmlGenerator(data)
-        f.write(xml_generator.generate().encode("utf8"))
+            raise FileExistsError(
+                "The package_path {} already exists.".format(package_path)
+            )
 
-    make_package(package_type, package_path)
-    rmtree(package_path)
-    print("Successfully created {}.zip".format(package_path))
+    if cache is not None:
+        cached = cache.build(package_type, data, validate=validate)
+        cache.copy(cached.key, package)
+    else:
+        build_package(package_type, data, package, streaming=streaming, validate=validate)
+    print("Successfully created {}".format(package))
+    return package
 
 
 def check_element(element_name, dynamic_type):
@@ -167,21 +286,70 @@ def get_motive_id(label):
     return label_to_motive_id[label]
 
 
-# TODO Make sure the exceptions is well chosen for an outdated token
+# The faultcode returned by the API when the token is invalid or expired
+TOKEN_FAULT_CODE = "RequestTokenValidationError"
+
+
+def is_token_fault(fault):
+    """
+    Return True if the zeep.exceptions.Fault was raised because the token was
+    rejected by the API
+    """
+    code = fault.code or ""
+    return code.rpartition(":")[2] == TOKEN_FAULT_CODE
+
+
+async def _result_of(response):
+    # A section method may return without sending any request
+    if inspect.isawaitable(response):
+        return await response
+    return response
+
+
+async def _call_with_token_async(func, *args, **kwargs):
+    """
+    The version of auto_refresh_token for the sections of an AsyncConnection
+    """
+    from zeep.exceptions import Fault
+
+    self = args[0]
+    await self.api.ensure_token_async()
+    rejected = self.api.header["Security"]["TokenId"]
+    try:
+        return await _result_of(func(*args, **kwargs))
+    except Fault as fault:
+        if not is_token_fault(fault):
+            raise
+        await self.api.refresh_token_async(rejected)
+        return await _result_of(func(*args, **kwargs))
+
+
 def auto_refresh_token(func):
     """
-    Refresh the token when it's outdated and resend the request
+    Refresh the token before it expires, or when it's rejected, and resend
+    the request
+
+    The other faults are raised as is. With an AsyncConnection, the method
+    returns a coroutine.
     """
+    # zeep is imported with the sections, not with the helpers
+    from zeep.exceptions import Fault
 
     @wraps(func)
     def wrapper(*args, **kwargs):
         self = args[0]
+        if self.api.is_async:
+            return _call_with_token_async(func, *args, **kwargs)
+
+        self.api.ensure_token()
+        rejected = self.api.header["Security"]["TokenId"]
         try:
             return func(*args, **kwargs)
-        except zeep.exceptions.Fault:
+        except Fault as fault:
+            if not is_token_fault(fault):
+                raise
             print("Refreshing token...")
-            self.api.token = self.api.get_token()
-            self.api.header["Security"]["TokenId"] = self.api.token
+            self.api.refresh_token(rejected)
             print("Resending request...")
             return func(*args, **kwargs)
 
@@ -192,6 +360,12 @@ class XmlGenerator(object):
     """
     Generate offers or products to upload
 
+    :param dict data: The offers (key OfferCollection) or the products (key
+    Products) and the attributes of the package
+    :param str conflict: What to do with two different offers with the same
+    SellerProductId and ProductEan (or products with the same SellerProductId):
+    keep the "first", the "last" (default) or raise an "error"
+
     Usage::
 
         xml_generator = XmlGenerator(data, preprod=preprod)
@@ -255,11 +429,11 @@ class XmlGenerator(object):
 
     """
 
-    def __init__(self, data, preprod=False):
+    def __init__(self, data, preprod=False, conflict="last"):
         if OfferPackage.has_required_keys(data):
-            self.package = OfferPackage(data, preprod)
+            self.package = OfferPackage(data, preprod, conflict=conflict)
         elif ProductPackage.has_required_keys(data):
-            self.package = ProductPackage(data, preprod)
+            self.package = ProductPackage(data, preprod, conflict=conflict)
         else:
             msg = (
                 "The data should be a dictionary with the keys {offers} for "
@@ -9,14 +9,7 @@
 """
 
 
-# Python imports
-from copy import deepcopy
-import os
-
-# Third-party imports
-import zeep
-from jinja2 import Environment, FileSystemLoader
-
+from cdiscountapi.exceptions import ConflictError
 from cdiscountapi.packages.validator import (
     OfferValidator,
     ProductValidator,
@@ -27,20 +20,112 @@ from cdiscountapi.packages.validator import (
 )
 
 
+# The policies applied when two different records have the same key
+KEEP_FIRST = "first"
+KEEP_LAST = "last"
+RAISE = "error"
+CONFLICT_POLICIES = (KEEP_FIRST, KEEP_LAST, RAISE)
+
+
+class PackageData(object):
+    """
+    The records of a package in the order they were added, indexed by their
+    key
+
+    A record whose key is already in the package is ignored when it's equal
+    to the stored record. Otherwise the conflict is resolved by the policy:
+
+    - "first": keep the stored record
+    - "last": replace the stored record by the new one (at the same position)
+    - "error": raise a ConflictError
+
+    :param key: The function returning the key of a record
+    :param str conflict: The conflict policy (default: "last")
+
+    Usage::
+
+        data = PackageData(lambda offer: offer["SellerProductId"])
+        data.add(offer)
+        offer = data[0]
+    """
+
+    def __init__(self, key, conflict=KEEP_LAST):
+        if conflict not in CONFLICT_POLICIES:
+            raise ValueError(
+                "conflict must be one of {}.".format(", ".join(CONFLICT_POLICIES))
+            )
+        self.key = key
+        self.conflict = conflict
+        self._records = []
+        self._positions = {}
+
+    def add(self, record):
+        """
+        Add the record and return True if it's stored
+        """
+        key = self.key(record)
+        position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = len(self._records)
+            self._records.append(record)
+            return True
+
+        if self._records[position] == record or self.conflict == KEEP_FIRST:
+            return False
+        if self.conflict == RAISE:
+            raise ConflictError(
+                "Two different records have the same key: {}.".format(key)
+            )
+        self._records[position] = record
+        return True
+
+    def get(self, key, default=None):
+        """
+        Return the record with the key
+        """
+        position = self._positions.get(key)
+        return default if position is None else self._records[position]
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __repr__(self):
+        return "PackageData({!r})".format(self._records)
+
+
 class BasePackage(object):
+    """
+    Base class for the content of the packages
+
+    The content is generated locally: no request is sent to the API.
+
+    :param bool preprod: Kept for compatibility. The content of the packages is
+                         the same for the preprod and the production.
+    :param str conflict: What to do with two different records with the same
+                         key: "first", "last" (default) or "error"
+    """
+
     required_keys = []
 
-    def __init__(self, preprod=False):
+    def __init__(self, preprod=False, conflict=KEEP_LAST):
         self.preprod = preprod
-        if self.preprod:
-            domain = "preprod-cdiscount.com"
-        else:
-            domain = "cdiscount.com"
+        self.data = PackageData(self.key, conflict)
 
-        self.wsdl = "https://wsvc.{0}/MarketplaceAPIService.svc?wsdl".format(domain)
-        self.client = zeep.Client(self.wsdl)
-        self.factory = self.client.type_factory("http://www.cdiscount.com")
-        self.data = []
+    @staticmethod
+    def key(record):
+        """
+        Return the key identifying a record in the package
+        """
+        raise NotImplementedError
 
     def validate(self, **kwargs):
         raise NotImplementedError
@@ -48,6 +133,31 @@ class BasePackage(object):
     def generate(self):
         raise NotImplementedError
 
+    @staticmethod
+    def extract_from(record, attr1, attr2):
+        """
+        Return the elements of a list in the record without modifying it
+
+        (ex: the ShippingInformation elements in ShippingInformationList,
+        the DiscountComponent elements in DiscountList...)
+        """
+        sub_record = record.get(attr1)
+        if sub_record:
+            return sub_record[attr2]
+        return []
+
+    @staticmethod
+    def attributes(record, excluded):
+        """
+        Return the attributes of the XML element of the record: the key:value
+        pairs whose values are not None (except the excluded keys)
+        """
+        return " ".join(
+            '{}="{}"'.format(k, v)
+            for k, v in record.items()
+            if v is not None and k not in excluded
+        )
+
     @classmethod
     def has_required_keys(cls, data):
         """
@@ -62,8 +172,8 @@ class BasePackage(object):
 class OfferPackage(BasePackage):
     required_keys = ["OfferCollection"]
 
-    def __init__(self, data, preprod=False):
-        super().__init__(preprod=preprod)
+    def __init__(self, data, preprod=False, conflict=KEEP_LAST):
+        super().__init__(preprod=preprod, conflict=conflict)
         self.check_offer_publication_list(data.get("OfferPublicationList"))
         self.purge_and_replace = data.get("PurgeAndReplace", False)
         self.name = data.get("Name", "A package")
@@ -93,29 +203,13 @@ class OfferPackage(BasePackage):
 
         self.offer_publication_list = [{"Id": _id} for _id in ids]
 
+    @staticmethod
+    def key(offer):
+        return (offer["SellerProductId"], offer["ProductEan"])
+
     def add(self, offers):
         for offer in offers:
-            valid_offer = self.validate(**offer)
-            if valid_offer not in self.data:
-                self.data.append(valid_offer)
-
-    def extract_from(self, offer, attr1, attr2):
-        """
-        Extract the elements of a list from Offer
-
-        (ex: the ShippingInformation elements in ShippingInformationList,
-        the DiscountComponent elements in DiscountList...)
-        """
-        if attr1 in offer:
-            sub_record = offer.get(attr1, None)
-            if sub_record:
-                datum = sub_record[attr2]
-                del offer[attr1]
-                return datum
-            else:
-                return []
-        else:
-            return []
+            self.data.add(self.validate(**offer))
 
     def validate(self, **kwargs):
         """
@@ -149,41 +243,35 @@ class OfferPackage(BasePackage):
 
         return OfferValidator.validate(new_kwargs["Offer"])
 
-    def generate(self):
-        loader = FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "..", "templates")
+    # The lists of an offer rendered as child elements
+    extraction_mapping = {
+        "shipping_information_list": ("ShippingInformationList", "ShippingInformation"),
+        "discount_list": ("DiscountList", "DiscountComponent"),
+    }
+
+    def render_offer(self, offer):
+        """
+        Return the context of the template for an offer (the offer is not
+        modified)
+        """
+        offers_datum = {}
+        for key, (attr1, attr2) in self.extraction_mapping.items():
+            # Only add  if the user provided the attribute
+            if attr1 in offer:
+                offers_datum[key] = self.extract_from(offer, attr1, attr2)
+
+        offers_datum["attributes"] = self.attributes(
+            offer, excluded=("ShippingInformationList", "DiscountList")
         )
-        env = Environment(loader=loader, trim_blocks=True, lstrip_blocks=True)
-        template = env.get_template("Offers.xml")
-        offers = deepcopy(self.data)
-        extraction_mapping = {
-            "shipping_information_list": (
-                "ShippingInformationList",
-                "ShippingInformation",
-            ),
-            "discount_list": ("DiscountList", "DiscountComponent"),
-        }
+        return offers_datum
 
-        offers_data = []
-        for offer in offers:
-            offers_datum = {}
-            for key, (attr1, attr2) in extraction_mapping.items():
-                # Only add  if the user provided the attribute
-                if attr1 in offer:
-                    if key not in offers_datum and attr1 in offer:
-                        offers_datum[key] = []
-                    offers_datum[key].extend(self.extract_from(offer, attr1, attr2))
-
-            if "attributes" not in offers_datum:
-                offers_datum["attributes"] = ""
-
-            # We keep only key:value pairs whose values are not None
-            offers_datum["attributes"] += " ".join(
-                '{}="{}"'.format(k, v) for k, v in offer.items() if v is not None
-            )
-            offers_data.append(offers_datum)
+    def generate(self):
+        # jinja2 is only needed to render the packages
+        from cdiscountapi.packages.templates import get_template
+
+        template = get_template("Offers.xml")
         return template.render(
-            offers=offers_data,
+            offers=(self.render_offer(offer) for offer in self.data),
             offer_publication_list=self.offer_publication_list,
             purge_and_replace=self.purge_and_replace,
             package_type=self.package_type,
@@ -194,34 +282,18 @@ class OfferPackage(BasePackage):
 class ProductPackage(BasePackage):
     required_keys = ["Products"]
 
-    def __init__(self, data, preprod=False):
-        super().__init__(preprod=preprod)
+    def __init__(self, data, preprod=False, conflict=KEEP_LAST):
+        super().__init__(preprod=preprod, conflict=conflict)
         self.name = data.get("Name", "A package")
         self.add(data["Products"])
 
+    @staticmethod
+    def key(product):
+        return product["SellerProductId"]
+
     def add(self, products):
         for product in products:
-            valid_product = self.validate(**product)
-            if valid_product not in self.data:
-                self.data.append(valid_product)
-
-    def extract_from(self, product, attr1, attr2):
-        """
-        Extract the elements of a list from Offer
-
-        (ex: the ShippingInformation elements in ShippingInformationList,
-        the DiscountComponent elements in DiscountList...)
-        """
-        if attr1 in product:
-            sub_record = product.get(attr1, None)
-            if sub_record:
-                datum = sub_record[attr2]
-                del product[attr1]
-                return datum
-            else:
-                return []
-        else:
-            return []
+            self.data.add(self.validate(**product))
 
     def validate(self, **kwargs):
         new_kwargs = kwargs.copy()
@@ -243,39 +315,38 @@ class ProductPackage(BasePackage):
 
         return ProductValidator.validate(new_kwargs["Product"])
 
-    def generate(self):
-        loader = FileSystemLoader(
-            os.path.join(os.path.dirname(__file__), "..", "templates")
-        )
-        env = Environment(loader=loader, trim_blocks=True, lstrip_blocks=True)
-        template = env.get_template("Products.xml")
-        products = deepcopy(self.data)
-        extraction_mapping = {
-            "EanList": ("EanList", "ProductEan"),
-            "Pictures": ("Pictures", "ProductImage"),
+    # The lists of a product rendered as child elements
+    extraction_mapping = {
+        "EanList": ("EanList", "ProductEan"),
+        "Pictures": ("Pictures", "ProductImage"),
+    }
+
+    def render_product(self, product):
+        """
+        Return the context of the template for a product (the product is not
+        modified)
+        """
+        products_datum = {
+            key: [self.extract_from(product, attr1, attr2)]
+            for key, (attr1, attr2) in self.extraction_mapping.items()
         }
+        if "ModelProperties" in product:
+            products_datum["ModelProperties"] = product["ModelProperties"]
 
-        products_data = []
-        for product in products:
-            products_datum = {}
-            for key, (attr1, attr2) in extraction_mapping.items():
-                if key not in products_datum:
-                    products_datum[key] = []
-                products_datum[key].append(self.extract_from(product, attr1, attr2))
-
-            if "ModelProperties" in product:
-                products_datum["ModelProperties"] = product["ModelProperties"]
-                del product["ModelProperties"]
-
-            if "attributes" not in products_datum:
-                products_datum["attributes"] = ""
-
-            # We keep only key:value pairs whose values are not None
-            products_datum["attributes"] += " ".join(
-                '{}="{}"'.format(k, v) for k, v in product.items() if v is not None
-            )
-            products_data.append(products_datum)
-        capacity = sum(len(p['Pictures']) for p in products_data)
+        products_datum["attributes"] = self.attributes(
+            product, excluded=("EanList", "Pictures", "ModelProperties")
+        )
+        return products_datum
+
+    def generate(self):
+        # jinja2 is only needed to render the packages
+        from cdiscountapi.packages.templates import get_template
+
+        template = get_template("Products.xml")
+        # Each product has one list of pictures
+        capacity = len(self.data)
         return template.render(
-            products=products_data, capacity=capacity, name=self.name
+            products=(self.render_product(product) for product in self.data),
+            capacity=capacity,
+            name=self.name,
         )
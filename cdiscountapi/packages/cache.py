@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.cache
+    ---------------------------
+
+    A cache of the packages addressed by their content: a package is only
+    generated when no package was generated from the same offers (or
+    products), and the cache knows whether it's the package submitted last.
+
+    The key of a package is the SHA-256 of a canonical form of the records
+    (sorted by their key, duplicates removed) and of the attributes
+    of the package which change its meaning (PackageType, PurgeAndReplace and
+    OfferPublicationList). The name of the package is not part of the key:
+    a package found in the cache keeps the Name of the data it was first
+    generated from.
+
+    A package validated against the XML schema is marked by an empty file
+    <key>.valid, so the cached packages are validated once.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from collections import namedtuple
+from functools import partial
+from pathlib import Path
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.helpers import XmlGenerator, check_package_type, write_file
+from cdiscountapi.packages import OfferPackage, ProductPackage
+from cdiscountapi.packages.writer import (
+    RECORDS_KEYS,
+    canonical_json,
+    content_name,
+    package_attributes,
+    write_package,
+)
+
+
+# CONSTANTS
+DEFAULT_MAX_SIZE = 1024 ** 3
+
+# The channel of the submissions when there is only one feed
+DEFAULT_CHANNEL = "default"
+
+SUBMITTED_FILE = "submitted.json"
+
+# The number of records encoded at once
+CHUNK_SIZE = 1000
+
+
+def package_key(package_type, data):
+    """
+    Return the key of the package of the data: the SHA-256 of its canonical
+    form
+
+    The records are not validated: the validators return them unchanged, so
+    the key of valid records is the same and invalid records are rejected
+    when the package is generated.
+
+    :param str package_type: 'offer' or 'product'
+    :param dict data: The data of :py:func:`cdiscountapi.helpers.generate_package`
+    """
+    package_type = package_type.lower()
+    digest = hashlib.sha256()
+    if package_type == "offer":
+        package = package_attributes(data)
+        header = {
+            "PackageType": package.package_type,
+            "PurgeAndReplace": package.purge_and_replace,
+            "OfferPublicationList": sorted(
+                publication_pool["Id"]
+                for publication_pool in package.offer_publication_list
+            ),
+        }
+        items, item_key, record_key = data["OfferCollection"], "Offer", OfferPackage.key
+    else:
+        header = {}
+        items, item_key, record_key = data["Products"], "Product", ProductPackage.key
+    digest.update(canonical_json(dict(header, type=package_type)))
+
+    # The last duplicate is kept like in the packages
+    records = {}
+    for item in items:
+        record = item[item_key]
+        records[record_key(record)] = record
+    # The keys are compared by their repr: SKUs can be numbers or strings
+    records = [records[key] for key in sorted(records, key=repr)]
+    for start in range(0, len(records), CHUNK_SIZE):
+        digest.update(canonical_json(records[start:start + CHUNK_SIZE]))
+    return digest.hexdigest()
+
+
+class CachedPackage(namedtuple("CachedPackage", ["key", "path", "hit", "changed"])):
+    """
+    A package returned by :py:meth:`PackageCache.build`: its key, its path in
+    the cache, whether it was already in the cache and whether it differs
+    from the package submitted last
+    """
+
+    def read_bytes(self):
+        return self.path.read_bytes()
+
+
+class PackageCache(object):
+    """
+    Cache the packages in a directory, the least recently used packages are
+    removed when the cache is too big
+
+    Usage::
+
+        cache = PackageCache("/var/cache/cdiscountapi/packages")
+        package = cache.build("offer", data)
+        if package.changed:
+            submit(package.path)
+            cache.mark_submitted(package.key)
+
+    :param str path: The directory of the cache (created if needed)
+    :param int max_size: The maximum size of the packages (bytes, None for
+                         no limit)
+    :param int max_entries: The maximum number of packages (None for no limit)
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE, max_entries=None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def path_of(self, key):
+        return self.path / "{}.zip".format(key)
+
+    @staticmethod
+    def _marker_of(path):
+        # The empty file marking a package validated against the XML schema
+        return path.with_suffix(".valid")
+
+    def get(self, key):
+        """
+        Return the path of the package or None if it's not in the cache
+        """
+        path = self.path_of(key)
+        try:
+            # The modification time orders the packages by last use
+            os.utime(str(path))
+        except FileNotFoundError:
+            return None
+        return path
+
+    def __contains__(self, key):
+        return self.path_of(key).exists()
+
+    def build(self, package_type, data, validate=False, channel=DEFAULT_CHANNEL):
+        """
+        Return the package of the data, generated only if it's not in the cache
+
+        The name of the package is not part of its key: a package found in
+        the cache keeps the Name of the data it was first generated from.
+
+        :param str package_type: 'offer' or 'product'
+        :param dict data: The data of
+                          :py:func:`cdiscountapi.helpers.generate_package`
+                          with the records in OfferCollection or Products
+        :param bool validate: Check the XML against the schema of the package
+                              type (once by package, even when it was
+                              generated without validation)
+        :param str channel: The feed whose last submitted package is compared
+                            with this one
+        :returns: A :py:class:`CachedPackage`
+        :raises ValidationError: When the records are not valid or not in
+                                 OfferCollection or Products
+        """
+        check_package_type(package_type)
+        package_type = package_type.lower()
+        records_key = RECORDS_KEYS[package_type]
+        if records_key not in data:
+            raise ValidationError(
+                "The packages are only cached from the records of {} (not from"
+                " a table or rows of offers).".format(records_key)
+            )
+        try:
+            key = package_key(package_type, data)
+        except (KeyError, TypeError) as error:
+            # The records are not valid: XmlGenerator says why
+            XmlGenerator(data)
+            raise ValidationError(
+                "The records of {} are not valid: {!r}".format(records_key, error)
+            ) from error
+
+        path = self.get(key)
+        hit = path is not None
+        if not hit:
+            content = XmlGenerator(data).generate().encode("utf8")
+            if validate:
+                from cdiscountapi.packages.xsd import validate_xml
+
+                validate_xml(content, package_type)
+            path = write_file(
+                self.path_of(key),
+                partial(write_package, package_type=package_type, content=content),
+            )
+            if validate:
+                self._marker_of(path).touch()
+            self.evict(keep=key)
+        elif validate:
+            self._validate(path, package_type)
+
+        return CachedPackage(key, path, hit, self.is_changed(key, channel))
+
+    def _validate(self, path, package_type):
+        """
+        Validate the XML of a cached package if it wasn't validated yet
+        """
+        marker = self._marker_of(path)
+        if marker.exists():
+            return
+
+        from cdiscountapi.packages.xsd import validate_xml
+
+        with zipfile.ZipFile(str(path)) as zf:
+            with zf.open(content_name(package_type)) as content:
+                validate_xml(content, package_type)
+        marker.touch()
+
+    def entries(self):
+        """
+        Return the packages of the cache: a list of (path, size, last use)
+        from the least recently used
+        """
+        entries = []
+        for path in self.path.glob("*.zip"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used packages until the cache respects
+        max_size and max_entries
+
+        :param str keep: The key of a package which is never removed
+        :returns: The paths of the removed packages
+        """
+        entries = self.entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        removed = []
+        for path, entry_size, _ in entries:
+            too_big = self.max_size is not None and size > self.max_size
+            too_many = (
+                self.max_entries is not None
+                and len(entries) - len(removed) > self.max_entries
+            )
+            if not (too_big or too_many):
+                break
+            if keep is not None and path == self.path_of(keep):
+                continue
+            self._remove(path)
+            size -= entry_size
+            removed.append(path)
+        return removed
+
+    def clear(self):
+        """
+        Remove all the packages (the submissions are kept)
+        """
+        for path, _, _ in self.entries():
+            self._remove(path)
+
+    def _remove(self, path):
+        for path in (path, self._marker_of(path)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _read_submitted(self):
+        try:
+            return json.loads((self.path / SUBMITTED_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def last_submitted(self, channel=DEFAULT_CHANNEL):
+        """
+        Return the key of the package submitted last or None
+        """
+        return self._read_submitted().get(channel, {}).get("key")
+
+    def is_changed(self, key, channel=DEFAULT_CHANNEL):
+        """
+        Return True if the package is not the one submitted last
+        """
+        return self.last_submitted(channel) != key
+
+    def mark_submitted(self, key, channel=DEFAULT_CHANNEL):
+        """
+        Record that the package was submitted
+        """
+        with self._lock:
+            submitted = self._read_submitted()
+            submitted[channel] = {"key": key, "submitted": time.time()}
+            write_file(
+                self.path / SUBMITTED_FILE,
+                lambda f: f.write(json.dumps(submitted, indent=2).encode("utf8")),
+            )
+
+    def copy(self, key, target):
+        """
+        Link (or copy) the cached package to target
+
+        :returns: The path of the copy (Path)
+        """
+        source = self.path_of(key)
+        target = Path(target)
+        tmp_path = target.with_name(
+            ".{}.{}.tmp".format(target.name, uuid.uuid4().hex)
+        )
+        try:
+            os.link(str(source), str(tmp_path))
+        except OSError:
+            # Another file system
+            def copy_package(f):
+                with source.open("rb") as package:
+                    shutil.copyfileobj(package, f)
+
+            return write_file(target, copy_package)
+        os.replace(str(tmp_path), str(target))
+        return target
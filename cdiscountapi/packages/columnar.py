@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.columnar
+    ------------------------------
+
+    Write Offers.xml from a table of offers (a dictionary of columns, a
+    pandas DataFrame or a pyarrow Table) without creating a dictionary per
+    offer.
+
+    The columns are checked once, then they are formatted a chunk of rows at
+    a time (with numpy when the columns are numpy arrays) and the offers are
+    written in the output as they are formatted.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import re
+from collections.abc import Mapping
+from itertools import repeat
+from xml.sax.saxutils import escape
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.validator import (
+    IDENTIFIER,
+    INTEGER,
+    NUMBER,
+    OfferValidator,
+    ShippingInformationValidator,
+    is_nan,
+)
+from cdiscountapi.packages.writer import (
+    OFFER_NAMESPACE,
+    XAML_NAMESPACE,
+    package_attributes,
+)
+
+# The columns written as attributes of Offer
+OFFER_COLUMNS = (OfferValidator.required | OfferValidator.optional) - {
+    "DiscountList",
+    "ShippingInformationList",
+}
+
+# The columns whose values can't be missing when they are in the table
+REQUIRED_VALUE_COLUMNS = ("ProductEan", "SellerProductId", "Price", "Stock")
+
+# The shipping information of a delivery mode is given by the columns
+# ShippingCharges.<DeliveryMode> and AdditionalShippingCharges.<DeliveryMode>
+SHIPPING_COLUMNS = ("ShippingCharges", "AdditionalShippingCharges")
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# The kinds of the numpy arrays whose values all have the type of the
+# attribute by name of type (the floats of INTEGER are checked by
+# check_column)
+_NUMPY_KINDS = {INTEGER.name: "iu", NUMBER.name: "iuf", IDENTIFIER.name: "iu"}
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"}
+_SPECIAL_CHARACTERS = re.compile('[&<>"\n\r\t]')
+
+
+def quote(value):
+    """
+    Return the value escaped for an XML attribute
+    """
+    return escape(str(value), _ATTRIBUTE_ENTITIES)
+
+
+def is_table(obj):
+    """
+    Return True if obj is a table of offers: a dictionary of columns, a
+    pandas DataFrame or a pyarrow Table
+    """
+    return (
+        isinstance(obj, Mapping)
+        or hasattr(obj, "column_names")
+        or (hasattr(obj, "columns") and hasattr(obj, "to_numpy"))
+    )
+
+
+def columns_of(table):
+    """
+    Return the columns of the table in a dictionary {name: sequence}
+
+    The columns of pandas and pyarrow are converted to numpy arrays (without
+    copy when it's possible).
+    """
+    if isinstance(table, Mapping):
+        columns = dict(table)
+    elif hasattr(table, "column_names"):
+        # pyarrow.Table
+        columns = {
+            name: _arrow_values(table.column(name)) for name in table.column_names
+        }
+    elif hasattr(table, "columns") and hasattr(table, "to_numpy"):
+        # pandas.DataFrame
+        columns = {str(name): table[name].to_numpy() for name in table.columns}
+    else:
+        raise TypeError(
+            "The table should be a dictionary of columns, a pandas DataFrame"
+            " or a pyarrow Table."
+        )
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValidationError("The columns of the table don't have the same length.")
+    return columns
+
+
+def _arrow_values(column):
+    if hasattr(column, "to_numpy"):
+        return column.to_numpy()
+    return column.to_pylist()
+
+
+def check_columns(names):
+    """
+    Return the offer columns and the delivery modes of the shipping columns
+
+    :raises ValidationError: When a required column is missing or a column
+                             is unknown
+    """
+    names = list(names)
+    missing = OfferValidator.required - set(names)
+    if missing:
+        raise ValidationError("Missing required columns for Offer: {}".format(missing))
+
+    offer_columns = [name for name in names if name in OFFER_COLUMNS]
+    delivery_modes = []
+    invalid = []
+    for name in names:
+        if name in OFFER_COLUMNS:
+            continue
+        attribute, _, delivery_mode = name.partition(".")
+        if attribute in SHIPPING_COLUMNS and delivery_mode:
+            if delivery_mode not in delivery_modes:
+                delivery_modes.append(delivery_mode)
+        else:
+            invalid.append(name)
+
+    if invalid:
+        raise ValidationError(
+            "These columns are not valid: {}."
+            " Please use only the following ones if necessary: {} and {}".format(
+                invalid,
+                sorted(OFFER_COLUMNS),
+                ", ".join("{}.<DeliveryMode>".format(c) for c in SHIPPING_COLUMNS),
+            )
+        )
+
+    for delivery_mode in delivery_modes:
+        for attribute in SHIPPING_COLUMNS:
+            name = "{}.{}".format(attribute, delivery_mode)
+            if name not in names:
+                raise ValidationError("Missing the column {}.".format(name))
+
+    return offer_columns, delivery_modes
+
+
+def _is_missing(value):
+    try:
+        return value is None or bool(is_nan(value))
+    except (TypeError, ValueError):
+        # pandas.NA
+        return True
+
+
+def _kind(values):
+    """
+    Return the kind of a numpy array (None for the other sequences)
+    """
+    return getattr(getattr(values, "dtype", None), "kind", None)
+
+
+def field_type_of(name):
+    """
+    Return the type of the values of a column (None when it's not checked)
+    """
+    attribute, _, delivery_mode = name.partition(".")
+    if delivery_mode:
+        return ShippingInformationValidator.types[attribute]
+    return OfferValidator.types.get(name)
+
+
+def check_column(name, values, start):
+    """
+    Raise a ValidationError when a value of a column of a chunk of rows
+    doesn't have the type of its attribute, like the offers of
+    :py:meth:`BaseValidator.validate_many`
+
+    The missing values are checked by _check_values. The numeric numpy
+    arrays are checked by their kind: the floats of an integer column (a
+    pandas column with missing values) must be integers.
+    """
+    field_type = field_type_of(name)
+    if field_type is None:
+        return
+    kind = _kind(values)
+    if kind == "f" and field_type is INTEGER:
+        # numpy is already imported since values is a numpy array
+        import numpy
+
+        with numpy.errstate(invalid="ignore"):
+            invalid = ~numpy.isnan(values) & (numpy.mod(values, 1) != 0)
+        if invalid.any():
+            index = int(numpy.argmax(invalid))
+            raise ValidationError(
+                "Row {}, {} should be {}, not {!r}.".format(
+                    start + index, name, field_type.name, values[index].item()
+                )
+            )
+        return
+    if kind is not None and kind in _NUMPY_KINDS.get(field_type.name, ""):
+        return
+
+    values = values.tolist() if hasattr(values, "tolist") else values
+    # Most columns only have values of the exact types or None
+    if set(map(type, values)) <= field_type.exact | {type(None)}:
+        return
+    for index, value in enumerate(values, start):
+        if not _is_missing(value) and not field_type.check(value):
+            raise ValidationError(
+                "Row {}, {} should be {}, not {!r}.".format(
+                    index, name, field_type.name, value
+                )
+            )
+
+
+def format_column(values, integer=False):
+    """
+    Return the values escaped for XML (None for the missing values)
+
+    The numeric numpy arrays are formatted by numpy, the other sequences
+    value by value and only escaped when the column has a special character.
+    The numbers are formatted like str() does, the floats of an integer
+    column as integers.
+    """
+    kind = _kind(values)
+    if kind in ("b", "i", "u"):
+        return values.astype(str).tolist()
+    if kind == "f":
+        # numpy is already imported since values is a numpy array
+        import numpy
+
+        missing = numpy.isnan(values)
+        if integer:
+            values = numpy.where(missing, 0, values).astype(numpy.int64)
+        strings = values.astype(str).astype(object)
+        strings[missing] = None
+        return strings.tolist()
+    return escape_column(
+        [None if _is_missing(value) else str(value) for value in values]
+    )
+
+
+def escape_column(strings):
+    """
+    Return the strings escaped for XML (None is kept)
+
+    Most columns (numbers, EAN, SKU...) have nothing to escape: the list is
+    returned as is.
+    """
+    if _SPECIAL_CHARACTERS.search("".join(filter(None, strings))):
+        return [None if string is None else quote(string) for string in strings]
+    return strings
+
+
+def _check_values(names, formatted, start):
+    """
+    Raise a ValidationError when a required column of a chunk of rows has a
+    missing value (None, NaN or an empty string)
+    """
+    for name, values in zip(names, formatted):
+        if name in REQUIRED_VALUE_COLUMNS and (None in values or "" in values):
+            index = next(
+                index for index, value in enumerate(values, start) if not value
+            )
+            raise ValidationError("Row {}, {} is missing.".format(index, name))
+
+
+def _offer_attributes(names, formatted):
+    """
+    Return the attributes of the Offer elements of a chunk of rows
+    """
+    fragments = [
+        ['{}="{}"'.format(name, value) if value is not None else None for value in values]
+        for name, values in zip(names, formatted)
+    ]
+    return (
+        " ".join(fragment for fragment in row if fragment is not None)
+        for row in zip(*fragments)
+    )
+
+
+def _shipping_information(delivery_modes, formatted, number_of_rows):
+    """
+    Return the ShippingInformationList elements of a chunk of rows
+    """
+    escaped_modes = [quote(delivery_mode) for delivery_mode in delivery_modes]
+    rows = zip(*formatted) if formatted else repeat((), number_of_rows)
+    for row in rows:
+        elements = [
+            '<ShippingInformation AdditionalShippingCharges="{}" DeliveryMode="{}"'
+            ' ShippingCharges="{}" />'.format(additional, delivery_mode, charges)
+            for delivery_mode, charges, additional in zip(
+                escaped_modes, row[::2], row[1::2]
+            )
+            if charges is not None
+        ]
+        yield (
+            '<Offer.ShippingInformationList><ShippingInformationList Capacity="{}">'
+            "{}</ShippingInformationList></Offer.ShippingInformationList>".format(
+                len(elements), "".join(elements)
+            )
+        )
+
+
+def offer_package_start(package):
+    """
+    Return the beginning of Offers.xml until the first offer (bytes)
+
+    :param package: The :py:class:`OfferPackage` of the attributes
+    """
+    return (
+        '<OfferPackage Name="{}" PackageType="{}" PurgeAndReplace="{}"'
+        ' xmlns="{}" xmlns:x="{}"><OfferPackage.Offers>'
+        '<OfferCollection Capacity="1">'.format(
+            quote(package.name),
+            quote(package.package_type),
+            quote(package.purge_and_replace),
+            OFFER_NAMESPACE,
+            XAML_NAMESPACE,
+        ).encode("utf-8")
+    )
+
+
+def offer_package_end(package):
+    """
+    Return the end of Offers.xml after the last offer (bytes)
+
+    :param package: The :py:class:`OfferPackage` of the attributes
+    """
+    end = "</OfferCollection></OfferPackage.Offers>"
+    if package.offer_publication_list:
+        end += (
+            '<OfferPackage.OfferPublicationList><OfferPublicationList Capacity="{}">'
+            "{}</OfferPublicationList></OfferPackage.OfferPublicationList>".format(
+                len(package.offer_publication_list),
+                "".join(
+                    '<PublicationPool Id="{}" />'.format(publication_pool["Id"])
+                    for publication_pool in package.offer_publication_list
+                ),
+            )
+        )
+    return (end + "</OfferPackage>").encode("utf-8")
+
+
+def write_offer_table_xml(output, table, data=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write the content of Offers.xml for the offers of a table in output
+
+    The table has a column per attribute of the offers (ProductEan,
+    SellerProductId, Price, Stock, Vat...) and, for each delivery mode, the
+    columns ShippingCharges.<DeliveryMode> and
+    AdditionalShippingCharges.<DeliveryMode>. The missing values (None, NaN)
+    of the optional columns are not written, but ProductEan, SellerProductId,
+    Price and Stock can't have missing values. The values must have the type
+    of their attribute (cf :py:class:`OfferValidator`), the floats of the
+    integer columns are written as integers. The duplicated offers are not
+    removed.
+
+    :param output: A writable binary file object
+    :param table: A dictionary of columns, a pandas DataFrame or a pyarrow Table
+    :param dict data: The attributes of the package (Name, PackageType,
+                      PurgeAndReplace, OfferPublicationList)
+    :param int chunk_size: The number of rows formatted at the same time
+    :returns: The number of offers written
+    :raises ValidationError: When a column is not valid, a value doesn't
+                             have the type of its attribute or a required
+                             column has a missing value
+
+    Usage::
+
+        table = {
+            "ProductEan": eans,
+            "SellerProductId": skus,
+            "Price": prices,
+            "Stock": stocks,
+            "ShippingCharges.Standard": charges,
+            "AdditionalShippingCharges.Standard": additional_charges,
+        }
+        with open("Offers.xml", "wb") as f:
+            write_offer_table_xml(f, table, {"PackageType": "StockAndPrice"})
+    """
+    columns = columns_of(table)
+    offer_columns, delivery_modes = check_columns(columns)
+    shipping_columns = [
+        "{}.{}".format(attribute, delivery_mode)
+        for delivery_mode in delivery_modes
+        for attribute in SHIPPING_COLUMNS
+    ]
+    integer_columns = {
+        name for name in offer_columns if OfferValidator.types.get(name) is INTEGER
+    }
+    package = package_attributes(data)
+    number_of_offers = len(next(iter(columns.values()), ()))
+
+    output.write(offer_package_start(package))
+
+    for start in range(0, number_of_offers, chunk_size):
+        chunk = slice(start, start + chunk_size)
+        for name in offer_columns + shipping_columns:
+            check_column(name, columns[name][chunk], start)
+        formatted = [
+            format_column(columns[name][chunk], name in integer_columns)
+            for name in offer_columns
+        ]
+        _check_values(offer_columns, formatted, start)
+        attributes = _offer_attributes(offer_columns, formatted)
+        shipping_information = _shipping_information(
+            delivery_modes,
+            [format_column(columns[name][chunk]) for name in shipping_columns],
+            min(chunk_size, number_of_offers - start),
+        )
+        output.write(
+            "".join(
+                "<Offer {}>{}</Offer>".format(offer_attributes, shipping)
+                for offer_attributes, shipping in zip(attributes, shipping_information)
+            ).encode("utf-8")
+        )
+
+    output.write(offer_package_end(package))
+    return number_of_offers
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.delta
+    ---------------------------
+
+    Submit only the offers which changed since the last submission.
+
+    The state of the offers submitted last is kept in a SQLite database: a
+    row by SellerProductId with the ProductEan, a digest of 8 bytes of its
+    ProductEan, SellerProductId, Price and Stock and a digest of its other
+    attributes. A new snapshot of the catalogue is compared with it in one
+    pass:
+
+    - the offers whose stock or price changed are written in StockAndPrice
+      packages with these attributes only, like the removed offers (sent
+      with a stock of 0)
+    - the new offers and the offers whose other attributes changed are
+      written entirely in Full packages
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from cdiscountapi.packages.stock import STOCK_AND_PRICE_COLUMNS
+from cdiscountapi.packages.validator import OfferValidator
+from cdiscountapi.packages.writer import (
+    DEFAULT_MAX_RECORDS,
+    PackageWriter,
+    canonical_digest,
+)
+
+
+# CONSTANTS
+DIGEST_SIZE = 8
+
+# The number of rows read or written at once in the database
+BATCH_SIZE = 10000
+
+
+def offer_digest(offer):
+    """
+    Return the digest of an offer (bytes): the offers equal in the XML have
+    the same digest
+    """
+    return canonical_digest(offer, DIGEST_SIZE)
+
+
+def split_offer(offer):
+    """
+    Return the ProductEan, SellerProductId, Price and Stock of an offer (the
+    offer of a StockAndPrice package) and its other attributes
+    """
+    stock_and_price = {}
+    others = {}
+    for name, value in offer.items():
+        if name in STOCK_AND_PRICE_COLUMNS:
+            stock_and_price[name] = value
+        else:
+            others[name] = value
+    return stock_and_price, others
+
+
+class OfferDelta(object):
+    """
+    The offers of a snapshot which differ from the offers submitted last
+
+    :param list new: The offers which were never submitted
+    :param list updated: The offers whose attributes other than the stock and
+                         the price changed since they were submitted
+    :param list changed: The ProductEan, SellerProductId, Price and Stock of
+                         the offers whose stock or price only changed
+    :param list removed: The offers submitted last which are not in the
+                         snapshot, with a stock of 0
+    :param int unchanged: The number of offers which didn't change
+    :param dict digests: The digests of the new, updated and changed offers
+                         by SellerProductId: (digest of the stock and the
+                         price, digest of the other attributes)
+    """
+
+    def __init__(self, new, updated, changed, removed, unchanged, digests):
+        self.new = new
+        self.updated = updated
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+        self.digests = digests
+
+    def __len__(self):
+        return len(self.new) + len(self.updated) + len(self.changed) + len(self.removed)
+
+    def __repr__(self):
+        return (
+            "<OfferDelta new={} updated={} changed={} removed={} unchanged={}>"
+        ).format(
+            len(self.new),
+            len(self.updated),
+            len(self.changed),
+            len(self.removed),
+            self.unchanged,
+        )
+
+    def full_offers(self):
+        """
+        Yield the offers to submit in a Full package (the new and updated
+        offers) like those of OfferCollection ({"Offer": {...}})
+        """
+        for offers in (self.new, self.updated):
+            for offer in offers:
+                yield {"Offer": offer}
+
+    def stock_and_price_offers(self):
+        """
+        Yield the offers to submit in a StockAndPrice package (the changed
+        and removed offers) like those of OfferCollection ({"Offer": {...}})
+        """
+        for offers in (self.changed, self.removed):
+            for offer in offers:
+                yield {"Offer": offer}
+
+    def write_packages(self, package_path, data=None, max_records=DEFAULT_MAX_RECORDS,
+                       max_size=None):
+        """
+        Write the changed and removed offers in StockAndPrice packages
+
+        :param str package_path: The full path to the packages (without suffix)
+        :param dict data: The other attributes of the packages (Name,
+                          OfferPublicationList)
+        :param int max_records: The maximum number of offers by package
+        :param int max_size: The maximum size of Offers.xml (bytes)
+        :returns: The list of :py:class:`PackageInfo` of the packages (empty
+                  when no stock or price changed)
+        """
+        return self._write(
+            package_path, "StockAndPrice", self.stock_and_price_offers(), data,
+            max_records, max_size,
+        )
+
+    def write_full_packages(self, package_path, data=None,
+                            max_records=DEFAULT_MAX_RECORDS, max_size=None):
+        """
+        Write the new and updated offers in Full packages
+
+        The parameters are those of :py:meth:`write_packages`.
+
+        :returns: The list of :py:class:`PackageInfo` of the packages (empty
+                  when there is no new or updated offer)
+        """
+        return self._write(
+            package_path, "Full", self.full_offers(), data, max_records, max_size
+        )
+
+    def _write(self, package_path, package_type, offers, data, max_records,
+               max_size):
+        data = dict(data or {}, PackageType=package_type)
+        with PackageWriter(
+            package_path, data, max_records=max_records, max_size=max_size
+        ) as writer:
+            writer.extend(offers)
+        return writer.packages
+
+
+class OfferStateStore(object):
+    """
+    The state of the offers submitted last, by SellerProductId
+
+    Usage::
+
+        store = OfferStateStore("/var/lib/cdiscountapi/offers.db")
+        delta = store.diff(offers)
+        for package in delta.write_full_packages("/tmp/offers"):
+            submit(package.path)
+        for package in delta.write_packages("/tmp/stock"):
+            submit(package.path)
+        store.mark_submitted(delta)
+
+    :param str path: The path to the database
+    """
+
+    def __init__(self, path):
+        if str(path) == ":memory:":
+            raise ValueError("OfferStateStore needs a file to keep the offers.")
+
+        self.path = str(path)
+        self._lock = threading.RLock()
+        with self.db_connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS offers "
+                "(seller_product_id TEXT PRIMARY KEY, product_ean TEXT, digest BLOB,"
+                " other_digest BLOB) WITHOUT ROWID"
+            )
+
+    @contextmanager
+    def db_connection(self):
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+
+    def __len__(self):
+        with self.db_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+    def digests(self):
+        """
+        Return the digests of the offers submitted last by SellerProductId:
+        (digest of the stock and the price, digest of the other attributes)
+        """
+        with self.db_connection() as conn:
+            cursor = conn.execute(
+                "SELECT seller_product_id, digest, other_digest FROM offers"
+            )
+            digests = {}
+            for rows in iter(lambda: cursor.fetchmany(BATCH_SIZE), []):
+                digests.update(
+                    (seller_product_id, (digest, other_digest))
+                    for seller_product_id, digest, other_digest in rows
+                )
+        return digests
+
+    def _product_eans(self, seller_product_ids):
+        eans = {}
+        with self.db_connection() as conn:
+            for start in range(0, len(seller_product_ids), 500):
+                batch = seller_product_ids[start:start + 500]
+                eans.update(
+                    conn.execute(
+                        "SELECT seller_product_id, product_ean FROM offers"
+                        " WHERE seller_product_id IN ({})".format(
+                            ",".join("?" * len(batch))
+                        ),
+                        batch,
+                    )
+                )
+        return eans
+
+    def diff(self, offers, complete=True):
+        """
+        Compare a snapshot of the offers with the offers submitted last
+
+        The offers are compared by their digests only: the snapshot can be a
+        generator, only the offers to submit are kept in memory. The last
+        offer with the same SellerProductId is the one kept.
+
+        :param offers: The offers like those of OfferCollection
+                       ({"Offer": {...}})
+        :param bool complete: Whether the snapshot has all the offers of the
+                              seller: the offers submitted last which are not
+                              in the snapshot are removed
+        :returns: An :py:class:`OfferDelta`
+        """
+        submitted = self.digests()
+        seen = set()
+        # The offers to submit: {SellerProductId: (list, offer, digests)}
+        changes = {}
+        new, updated, changed = [], [], []
+        for item in offers:
+            offer = item["Offer"]
+            try:
+                # The SellerProductIds are stored as text
+                seller_product_id = str(offer["SellerProductId"])
+            except (KeyError, TypeError):
+                OfferValidator.validate(offer)
+                raise
+            seen.add(seller_product_id)
+            stock_and_price, others = split_offer(offer)
+            digests = (offer_digest(stock_and_price), offer_digest(others))
+            last = submitted.get(seller_product_id)
+            if last is None:
+                changes[seller_product_id] = (new, offer, digests)
+            elif last[1] != digests[1]:
+                changes[seller_product_id] = (updated, offer, digests)
+            elif last[0] != digests[0]:
+                changes[seller_product_id] = (changed, stock_and_price, digests)
+            else:
+                # A duplicate equal to the offer submitted last
+                changes.pop(seller_product_id, None)
+
+        for offers, offer, _ in changes.values():
+            offers.append(offer)
+
+        removed = []
+        if complete:
+            missing = [
+                seller_product_id
+                for seller_product_id in submitted
+                if seller_product_id not in seen
+            ]
+            eans = self._product_eans(missing)
+            removed = [
+                {
+                    "ProductEan": eans[seller_product_id],
+                    "SellerProductId": seller_product_id,
+                    "Stock": 0,
+                }
+                for seller_product_id in missing
+            ]
+
+        digests = {
+            seller_product_id: digests
+            for seller_product_id, (_, _, digests) in changes.items()
+        }
+        return OfferDelta(
+            new, updated, changed, removed, len(seen) - len(changes), digests
+        )
+
+    def mark_submitted(self, delta, full=True, stock_and_price=True):
+        """
+        Record that the packages of the delta were submitted
+
+        :param OfferDelta delta: The delta returned by :py:meth:`diff`
+        :param bool full: Whether the Full packages (new and updated offers)
+                          were submitted
+        :param bool stock_and_price: Whether the StockAndPrice packages
+                                     (changed and removed offers) were
+                                     submitted
+        """
+        def rows(offers):
+            for offer in offers:
+                seller_product_id = str(offer["SellerProductId"])
+                yield (seller_product_id, offer["ProductEan"]) + delta.digests[
+                    seller_product_id
+                ]
+
+        with self.db_connection() as conn:
+            if full:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO offers"
+                    " (seller_product_id, product_ean, digest, other_digest)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows(delta.new + delta.updated),
+                )
+            if stock_and_price:
+                # The other attributes of the changed offers didn't change
+                conn.executemany(
+                    "UPDATE offers SET product_ean = ?, digest = ?"
+                    " WHERE seller_product_id = ?",
+                    (
+                        (product_ean, digest, seller_product_id)
+                        for seller_product_id, product_ean, digest, _ in rows(
+                            delta.changed
+                        )
+                    ),
+                )
+                conn.executemany(
+                    "DELETE FROM offers WHERE seller_product_id = ?",
+                    [(offer["SellerProductId"],) for offer in delta.removed],
+                )
+
+    def clear(self):
+        """
+        Forget the offers submitted: the next snapshot is submitted entirely
+        """
+        with self.db_connection() as conn:
+            conn.execute("DELETE FROM offers")
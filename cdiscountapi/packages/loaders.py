@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.loaders
+    -----------------------------
+
+    Read the offers and the products of CSV and JSON Lines files one record
+    at a time, to feed the streaming writers of the packages without loading
+    the whole catalogue in memory.
+
+    The columns are the attributes of :py:class:`OfferValidator` and
+    :py:class:`ProductValidator` (after an optional mapping of their names)
+    and the nested lists are flattened:
+
+    - ``<List>.<n>.<Attribute>`` for the n-th item of a list, ex:
+      ``DiscountList.1.DiscountValue``, ``EanList.2.Ean``, ``Pictures.1.Uri``
+    - ``ShippingCharges.<DeliveryMode>`` and
+      ``AdditionalShippingCharges.<DeliveryMode>`` for the shipping
+      information of the offers, like the tables of offers
+    - ``ModelProperties.<Name>`` for the properties of the products
+
+    The empty cells are ignored and the values of the CSV files are converted
+    to the type of their attribute (int, Decimal). Each record is validated;
+    the invalid records are given to an error sink instead of stopping the
+    reading.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import csv
+import json
+from collections import namedtuple
+from decimal import Decimal
+from pathlib import Path
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.columnar import SHIPPING_COLUMNS
+from cdiscountapi.packages.validator import (
+    INTEGER,
+    NUMBER,
+    OfferValidator,
+    ProductValidator,
+    compile_validator,
+)
+
+
+# The attributes of the products given by a column by name
+PROPERTIES = "ModelProperties"
+
+
+class RecordError(namedtuple("RecordError", ["line", "record", "errors"])):
+    """
+    An invalid record given to the error sink: the number of its line in the
+    file, the record as it was read and the list of the errors
+    """
+
+    def __str__(self):
+        return "Line {}: {}".format(self.line, "; ".join(self.errors))
+
+
+def _converter(field_type):
+    """
+    Return the conversion of the strings of the files to the type
+    """
+    if field_type is INTEGER:
+        return int
+    if field_type is NUMBER:
+        return Decimal
+    return None
+
+
+class RecordBuilder(object):
+    """
+    Build the records of a validator from rows of values
+
+    :param validator: OfferValidator or ProductValidator
+    :param list columns: The names of the columns (None for an ignored
+                         column)
+    :raises ValidationError: When a column is not an attribute of the
+                             validator
+    """
+
+    def __init__(self, validator, columns):
+        self.validator = validator
+        self.compiled = compile_validator(validator)
+        self.columns = list(columns)
+        fields = [self._field(column) for column in self.columns]
+        invalid = [
+            column
+            for column, field in zip(self.columns, fields)
+            if column is not None and field is None
+        ]
+        if invalid:
+            raise ValidationError(
+                "These columns are not valid for {}: {}.".format(
+                    validator.package_type(), invalid
+                )
+            )
+        self.fields = fields
+
+    def _field(self, column):
+        """
+        Return (group, attribute, type) of a column: group is None for the
+        attributes of the record, otherwise (list, item) or (PROPERTIES, None)
+        """
+        validator = self.validator
+        if column is None:
+            return None
+        if column in self.compiled.allowed:
+            return None, column, validator.types.get(column)
+
+        name, _, rest = column.partition(".")
+        if name in validator.lists:
+            position, _, attribute = rest.partition(".")
+            _, item_validator = validator.lists[name]
+            if position.isdigit() and (
+                attribute in item_validator.required | item_validator.optional
+            ):
+                return (name, position), attribute, item_validator.types.get(attribute)
+        elif validator is OfferValidator and name in SHIPPING_COLUMNS and rest:
+            return ("ShippingInformationList", rest), name, NUMBER
+        elif name == PROPERTIES and rest and PROPERTIES in self.compiled.allowed:
+            return (PROPERTIES, None), rest, None
+        return None
+
+    def build(self, values):
+        """
+        Return the record of a row of values and the list of its errors
+        """
+        record = {}
+        items = {}
+        errors = []
+        for column, field, value in zip(self.columns, self.fields, values):
+            if field is None or value is None or value == "":
+                continue
+            group, attribute, field_type = field
+            converter = _converter(field_type)
+            if converter is not None and isinstance(value, str):
+                try:
+                    value = converter(value.strip())
+                except (ValueError, ArithmeticError):
+                    errors.append(
+                        "{}: {!r} is not {}".format(column, value, field_type.name)
+                    )
+                    continue
+
+            if group is None:
+                record[attribute] = value
+            elif group[0] == PROPERTIES:
+                record.setdefault(PROPERTIES, []).append({attribute: value})
+            else:
+                item = items.get(group)
+                if item is None:
+                    item = items[group] = {}
+                    if group[0] == "ShippingInformationList":
+                        # The delivery mode is the suffix of the column
+                        item["DeliveryMode"] = group[1]
+                item[attribute] = value
+
+        for (name, _), item in items.items():
+            item_name, _ = self.validator.lists[name]
+            record.setdefault(name, {item_name: []})[item_name].append(item)
+
+        errors.extend(
+            "{}: {}".format(self.compiled.name if field is None else field, reason)
+            for field, reason in self.compiled.errors_of(record)
+        )
+        return record, errors
+
+
+def _open(source, encoding):
+    if isinstance(source, (str, Path)):
+        return open(source, newline="", encoding=encoding)
+    return None
+
+
+def _records(rows, validator, on_error):
+    """
+    Yield the valid records of (line, raw record, record, errors)
+    """
+    key = validator.package_type()
+    for line, raw, record, errors in rows:
+        if not errors:
+            yield {key: record}
+            continue
+        error = RecordError(line, raw, errors)
+        if on_error is None:
+            raise ValidationError(str(error))
+        on_error(error)
+
+
+def _csv_rows(source, validator, mapping, delimiter, encoding):
+    f = _open(source, encoding)
+    try:
+        reader = csv.reader(f or source, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        mapping = mapping or {}
+        builder = RecordBuilder(
+            validator, [mapping.get(column, column) for column in header]
+        )
+        for values in reader:
+            if not any(values):
+                continue
+            record, errors = builder.build(values)
+            if len(values) != len(header):
+                errors.insert(
+                    0, "{} values instead of {}".format(len(values), len(header))
+                )
+            yield reader.line_num, dict(zip(header, values)), record, errors
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _jsonl_rows(source, validator, mapping, encoding):
+    key = validator.package_type()
+    mapping = mapping or {}
+    # The builders of the sets of keys found in the file
+    builders = {}
+    f = _open(source, encoding)
+    try:
+        for line, text in enumerate(f or source, 1):
+            if not text.strip():
+                continue
+            try:
+                raw = json.loads(text, parse_float=Decimal)
+            except ValueError as error:
+                yield line, text, None, ["not valid JSON ({})".format(error)]
+                continue
+            if not isinstance(raw, dict):
+                yield line, raw, None, ["should be an object"]
+                continue
+            data = raw.get(key, raw) if len(raw) == 1 else raw
+
+            columns = tuple(data)
+            builder = builders.get(columns)
+            if builder is None:
+                try:
+                    builder = RecordBuilder(
+                        validator, [mapping.get(column, column) for column in columns]
+                    )
+                except ValidationError as error:
+                    yield line, raw, None, [str(error)]
+                    continue
+                builders[columns] = builder
+            record, errors = builder.build(data.values())
+            yield line, raw, record, errors
+    finally:
+        if f is not None:
+            f.close()
+
+
+def read_csv(source, validator, mapping=None, on_error=None, delimiter=",",
+             encoding="utf-8"):
+    """
+    Yield the records of a CSV file whose first line gives the columns
+
+    :param source: The path of the file or a text file object
+    :param validator: OfferValidator or ProductValidator
+    :param dict mapping: The attributes of the columns whose names are not
+                         attributes {column: attribute} (None to ignore a
+                         column)
+    :param on_error: A function called with the :py:class:`RecordError` of
+                     each invalid record (by default a ValidationError is
+                     raised)
+    :param str delimiter: The delimiter of the values
+    :param str encoding: The encoding of the file
+    :returns: A generator of the records ({"Offer": {...}} or
+              {"Product": {...}})
+    :raises ValidationError: When a column is not valid
+    """
+    return _records(
+        _csv_rows(source, validator, mapping, delimiter, encoding), validator, on_error
+    )
+
+
+def read_jsonl(source, validator, mapping=None, on_error=None, encoding="utf-8"):
+    """
+    Yield the records of a JSON Lines file: a JSON object by line, the
+    record or the record in a dictionary ({"Offer": {...}})
+
+    The attributes can be nested like in the records or flattened like the
+    columns of the CSV files. The numbers are read as Decimal.
+
+    :param source: The path of the file or a text file object
+    :param validator: OfferValidator or ProductValidator
+    :param dict mapping: The attributes of the keys whose names are not
+                         attributes {key: attribute} (None to ignore a key)
+    :param on_error: A function called with the :py:class:`RecordError` of
+                     each invalid record (by default a ValidationError is
+                     raised)
+    :param str encoding: The encoding of the file
+    :returns: A generator of the records ({"Offer": {...}} or
+              {"Product": {...}})
+    """
+    return _records(_jsonl_rows(source, validator, mapping, encoding), validator, on_error)
+
+
+def read_offers_csv(source, mapping=None, on_error=None, **kwargs):
+    """
+    Yield the offers of a CSV file (cf :py:func:`read_csv`)
+
+    Usage::
+
+        errors = []
+        offers = read_offers_csv(
+            "catalogue.csv",
+            mapping={"ean": "ProductEan", "sku": "SellerProductId"},
+            on_error=errors.append,
+        )
+        write_offer_package("offers.zip", {"OfferCollection": offers})
+    """
+    return read_csv(source, OfferValidator, mapping, on_error, **kwargs)
+
+
+def read_products_csv(source, mapping=None, on_error=None, **kwargs):
+    """
+    Yield the products of a CSV file (cf :py:func:`read_csv`)
+    """
+    return read_csv(source, ProductValidator, mapping, on_error, **kwargs)
+
+
+def read_offers_jsonl(source, mapping=None, on_error=None, **kwargs):
+    """
+    Yield the offers of a JSON Lines file (cf :py:func:`read_jsonl`)
+    """
+    return read_jsonl(source, OfferValidator, mapping, on_error, **kwargs)
+
+
+def read_products_jsonl(source, mapping=None, on_error=None, **kwargs):
+    """
+    Yield the products of a JSON Lines file (cf :py:func:`read_jsonl`)
+    """
+    return read_jsonl(source, ProductValidator, mapping, on_error, **kwargs)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.splitter
+    ------------------------------
+
+    Split a large number of offers or products into several packages that
+    respect the limits of the API, and build them in a pool of processes.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import io
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from cdiscountapi.helpers import XmlGenerator, check_package_type, write_file
+from cdiscountapi.packages.writer import (
+    DEFAULT_MAX_RECORDS,
+    RECORDS_KEYS,
+    PackageInfo,
+    write_package,
+)
+
+
+def build_shard(package_type, data, records, max_uncompressed_size=None,
+                max_compressed_size=None):
+    """
+    Build the packages of a shard of records
+
+    The shard is split in two (again and again) while its packages are
+    bigger than the limits.
+
+    :returns: A list of (number of records, uncompressed size, content of the
+              zip file)
+    """
+    xml = XmlGenerator(dict(data, **{RECORDS_KEYS[package_type]: records}))
+    content = xml.generate().encode("utf8")
+    buffer = io.BytesIO()
+    write_package(buffer, package_type, content)
+    package = buffer.getvalue()
+
+    too_big = (
+        max_uncompressed_size is not None and len(content) > max_uncompressed_size
+    ) or (max_compressed_size is not None and len(package) > max_compressed_size)
+    if not too_big:
+        return [(len(xml.data), len(content), package)]
+    if len(records) == 1:
+        raise ValueError(
+            "The package of a single record is bigger than the limits"
+            " ({} bytes, {} bytes compressed).".format(len(content), len(package))
+        )
+
+    middle = len(records) // 2
+    return build_shard(
+        package_type, data, records[:middle], max_uncompressed_size, max_compressed_size
+    ) + build_shard(
+        package_type, data, records[middle:], max_uncompressed_size, max_compressed_size
+    )
+
+
+def _shards(records, max_records):
+    records = iter(records)
+    while True:
+        shard = list(islice(records, max_records))
+        if not shard:
+            return
+        yield shard
+
+
+def _package_path(package_path, number):
+    return package_path.with_name("{}_{:03d}.zip".format(package_path.name, number))
+
+
+def _existing_packages(package_path):
+    """
+    Return the packages named after package_path (<package_path>_001.zip,
+    <package_path>_002.zip...) which exist: {number: path}
+    """
+    package_path = Path(package_path)
+    pattern = re.compile(
+        r"{}_([0-9]{{3,}})\.zip\Z".format(re.escape(package_path.name))
+    )
+    packages = {}
+    for path in package_path.parent.glob("{}_*.zip".format(package_path.name)):
+        match = pattern.match(path.name)
+        if match:
+            packages[int(match.group(1))] = path
+    return packages
+
+
+def split_package(package_type, package_path, data, max_records=DEFAULT_MAX_RECORDS,
+                  max_uncompressed_size=None, max_compressed_size=None,
+                  max_workers=None, overwrite=True):
+    """
+    Generate as many packages as needed for the offers or the products
+
+    The records are split into shards of max_records records whose packages
+    are built by a pool of processes. A shard whose package is bigger than
+    max_uncompressed_size (the size of Offers.xml or Products.xml) or
+    max_compressed_size (the size of the zip file) is split again. The
+    packages are named after package_path: <package_path>_001.zip,
+    <package_path>_002.zip...
+
+    Only the shards being built are in memory, so the records can come from
+    a generator. The duplicated records are removed in each package.
+
+    :param str package_type: 'offer' or 'product'
+    :param str package_path: The full path to the packages (without suffix)
+    :param dict data: The data of :py:func:`cdiscountapi.helpers.generate_package`
+    (OfferCollection or Products can be any iterable)
+    :param int max_records: The maximum number of records by package
+    :param int max_uncompressed_size: The maximum size of the XML file (bytes)
+    :param int max_compressed_size: The maximum size of the zip file (bytes)
+    :param int max_workers: The number of processes (default: the number of
+    CPUs), 0 to build the packages in the current process (the default with
+    a single CPU)
+    :param bool overwrite: Replace the packages that already exist and remove
+    those of a previous split which had more packages. Without overwrite,
+    nothing is written when a package named after package_path exists
+    :returns: The manifest: the list of :py:class:`PackageInfo` of the
+    packages in order
+    :raises FileExistsError: When overwrite is False and a package named
+    after package_path exists
+
+    Usage::
+
+        manifest = split_package("product", "/tmp/products",
+                                 {"Products": products}, max_records=10000)
+        for package in manifest:
+            print(package.path, package.records, package.sha256)
+    """
+    check_package_type(package_type)
+    package_type = package_type.lower()
+    package_path = Path(package_path)
+    if not package_path.parent.exists():
+        raise FileNotFoundError(
+            "The directory {} does not exist.".format(package_path.parent)
+        )
+
+    # The number of packages is only known at the end: all the packages
+    # named after package_path are checked before any is written
+    existing = _existing_packages(package_path)
+    if not overwrite and existing:
+        raise FileExistsError(
+            "The packages {} already exist.".format(
+                ", ".join(str(existing[number]) for number in sorted(existing))
+            )
+        )
+
+    records_key = RECORDS_KEYS[package_type]
+    attributes = {key: value for key, value in data.items() if key != records_key}
+    if max_workers is None:
+        # A pool of a single process would only add the cost of the pickling
+        cpu_count = os.cpu_count() or 1
+        max_workers = cpu_count if cpu_count > 1 else 0
+
+    manifest = []
+
+    def save(packages):
+        for records, uncompressed_size, package in packages:
+            path = _package_path(package_path, len(manifest) + 1)
+            write_file(path, lambda f: f.write(package))
+            manifest.append(
+                PackageInfo(
+                    path,
+                    records,
+                    uncompressed_size,
+                    len(package),
+                    hashlib.sha256(package).hexdigest(),
+                )
+            )
+
+    shards = _shards(data[records_key], max_records)
+    limits = (max_uncompressed_size, max_compressed_size)
+    if not max_workers:
+        for shard in shards:
+            save(build_shard(package_type, attributes, shard, *limits))
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            # The packages are saved in order and at most 2 shards by process
+            # are waiting
+            pending = deque()
+            for shard in shards:
+                pending.append(
+                    executor.submit(
+                        build_shard, package_type, attributes, shard, *limits
+                    )
+                )
+                if len(pending) >= 2 * max_workers:
+                    save(pending.popleft().result())
+            while pending:
+                save(pending.popleft().result())
+
+    # The packages of a previous split of more records
+    for number, path in existing.items():
+        if number > len(manifest):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    return manifest
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.stock
+    ---------------------------
+
+    Write the StockAndPrice packages of the stock and price updates, the most
+    frequent submissions, without the generic path of the offers.
+
+    The rows (ProductEan, SellerProductId, Price, Stock) are checked a column
+    at a time, then each offer is formatted by a single string operation and
+    a chunk of offers is written at once.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+from itertools import islice
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.columnar import (
+    DEFAULT_CHUNK_SIZE,
+    columns_of,
+    escape_column,
+    is_table,
+    offer_package_end,
+    offer_package_start,
+)
+from cdiscountapi.packages.validator import OfferValidator, is_nan
+from cdiscountapi.packages.writer import package_attributes, write_package
+
+
+STOCK_AND_PRICE_COLUMNS = ("ProductEan", "SellerProductId", "Price", "Stock")
+
+# The Offer element of a row, like those written by write_offer
+OFFER_TEMPLATE = (
+    '<Offer ProductEan="%s" SellerProductId="%s" Price="%s" Stock="%s">'
+    "<Offer.ShippingInformationList>"
+    '<ShippingInformationList Capacity="0" />'
+    "</Offer.ShippingInformationList></Offer>"
+)
+
+
+def is_rows(obj):
+    """
+    Return True if obj is a sequence of rows (tuples) instead of offers
+    """
+    return (
+        isinstance(obj, (list, tuple))
+        and len(obj) > 0
+        and isinstance(obj[0], (list, tuple))
+    )
+
+
+def _check_column(name, values, start):
+    """
+    Return the values of a column escaped for XML when needed
+
+    :raises ValidationError: When a value doesn't have the type of the
+                             attribute
+    """
+    field_type = OfferValidator.types[name]
+    # Most columns only have values of the exact types (and no NaN)
+    if not set(map(type, values)) <= field_type.exact or any(map(is_nan, values)):
+        for index, value in enumerate(values, start):
+            if not field_type.check(value):
+                raise ValidationError(
+                    "Row {}, {} should be {}, not {!r}.".format(
+                        index, name, field_type.name, value
+                    )
+                )
+
+    if str in field_type.exact:
+        # The integers of the EAN and the SKU are written with str()
+        if not set(map(type, values)) <= {str}:
+            values = [value if type(value) is str else str(value) for value in values]
+        if not all(values):
+            index = start + values.index("")
+            raise ValidationError("Row {}, {} is empty.".format(index, name))
+        return escape_column(values)
+    return values
+
+
+def _row_chunks(rows, chunk_size):
+    """
+    Yield (index of the first row, columns) for the chunks of rows
+    """
+    if is_table(rows):
+        columns = columns_of(rows)
+        names = set(columns)
+        if names != set(STOCK_AND_PRICE_COLUMNS):
+            raise ValidationError(
+                "The columns should be {} (not {}).".format(
+                    ", ".join(STOCK_AND_PRICE_COLUMNS), ", ".join(sorted(names))
+                )
+            )
+        columns = [columns[name] for name in STOCK_AND_PRICE_COLUMNS]
+        for start in range(0, len(columns[0]), chunk_size):
+            chunk = [values[start:start + chunk_size] for values in columns]
+            # The numpy arrays are converted to Python values
+            yield start, [
+                values.tolist() if hasattr(values, "tolist") else list(values)
+                for values in chunk
+            ]
+        return
+
+    rows = iter(rows)
+    start = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        if set(map(len, chunk)) != {len(STOCK_AND_PRICE_COLUMNS)}:
+            index = next(
+                index
+                for index, row in enumerate(chunk, start)
+                if len(row) != len(STOCK_AND_PRICE_COLUMNS)
+            )
+            raise ValidationError(
+                "Row {} should be ({}).".format(
+                    index, ", ".join(STOCK_AND_PRICE_COLUMNS)
+                )
+            )
+        yield start, [list(values) for values in zip(*chunk)]
+        start += len(chunk)
+
+
+def write_stock_and_price_xml(output, rows, data=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write the content of Offers.xml of a StockAndPrice package in output
+
+    The duplicated offers are not removed.
+
+    :param output: A writable binary file object
+    :param rows: An iterable of tuples (ProductEan, SellerProductId, Price,
+                 Stock) or a table with these columns (a dictionary of
+                 columns, a pandas DataFrame or a pyarrow Table)
+    :param dict data: The other attributes of the package (Name,
+                      PurgeAndReplace, OfferPublicationList)
+    :param int chunk_size: The number of rows formatted at the same time
+    :returns: The number of offers written
+    :raises ValidationError: When a value is missing or doesn't have the type
+                             of its attribute
+
+    Usage::
+
+        rows = [("3600000000001", "SKU1", 12.5, 3), ("3600000000002", "SKU2", 8, 0)]
+        with open("Offers.xml", "wb") as f:
+            write_stock_and_price_xml(f, rows, {"Name": "Stock"})
+    """
+    data = dict(data or {})
+    data.setdefault("PackageType", "StockAndPrice")
+    package = package_attributes(data)
+    if package.package_type != "StockAndPrice":
+        raise ValidationError(
+            "The rows (ProductEan, SellerProductId, Price, Stock) can only be"
+            " written in a StockAndPrice package."
+        )
+    number_of_offers = 0
+
+    output.write(offer_package_start(package))
+    for start, columns in _row_chunks(rows, chunk_size):
+        columns = [
+            _check_column(name, values, start)
+            for name, values in zip(STOCK_AND_PRICE_COLUMNS, columns)
+        ]
+        output.write(
+            "".join(map(OFFER_TEMPLATE.__mod__, zip(*columns))).encode("utf-8")
+        )
+        number_of_offers += len(columns[0])
+    output.write(offer_package_end(package))
+    return number_of_offers
+
+
+def write_stock_and_price_package(target, rows, data=None):
+    """
+    Write a StockAndPrice package in the zip file target
+
+    :param target: The path of the zip file or a writable binary file object
+    :param rows: The rows of :py:func:`write_stock_and_price_xml`
+    :param dict data: The other attributes of the package
+    :returns: The number of offers written
+    """
+    return write_package(
+        target,
+        "offer",
+        lambda entry: write_stock_and_price_xml(entry, rows, data),
+    )
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.templates
+    -------------------------------
+
+    The Jinja environment used to render Offers.xml and Products.xml.
+
+    The environment is created once per process and the templates are only
+    compiled the first time they are used. The compiled templates are bundled
+    in cdiscountapi/assets/templates (as Python modules, so they are compiled
+    to bytecode when the package is installed). Build them again with::
+
+        python -m cdiscountapi.packages.templates
+
+    They are only used when they were compiled with the installed version of
+    jinja2 from the current templates. Otherwise the templates are compiled
+    when they are loaded.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import jinja2
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, ModuleLoader
+
+
+# CONSTANTS
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+COMPILED_TEMPLATES_DIR = Path(__file__).parent.parent / "assets" / "templates"
+MANIFEST = COMPILED_TEMPLATES_DIR / "manifest.json"
+
+_environment = None
+_environment_lock = threading.Lock()
+
+
+def _digests():
+    return {
+        path.name: hashlib.sha1(path.read_bytes()).hexdigest()
+        for path in sorted(TEMPLATES_DIR.glob("*.xml"))
+    }
+
+
+def _manifest():
+    return {"jinja2": jinja2.__version__, "templates": _digests()}
+
+
+def compiled_templates_are_valid():
+    """
+    Return True if the bundled compiled templates can be used
+    """
+    try:
+        manifest = json.loads(MANIFEST.read_text())
+    except (OSError, ValueError):
+        return False
+    return manifest == _manifest()
+
+
+def create_environment(precompiled=True):
+    """
+    Return a new Jinja environment for the templates of the packages
+
+    :param bool precompiled: Load the compiled templates if they are valid
+    """
+    loader = FileSystemLoader(str(TEMPLATES_DIR))
+    if precompiled and compiled_templates_are_valid():
+        loader = ChoiceLoader([ModuleLoader(str(COMPILED_TEMPLATES_DIR)), loader])
+    # The templates don't change while the process is running
+    return Environment(
+        loader=loader, trim_blocks=True, lstrip_blocks=True, auto_reload=False
+    )
+
+
+def get_environment():
+    """
+    Return the Jinja environment shared by the packages of the process
+    """
+    global _environment
+    if _environment is None:
+        with _environment_lock:
+            if _environment is None:
+                _environment = create_environment()
+    return _environment
+
+
+def get_template(name):
+    """
+    Return the compiled template (ex: "Offers.xml")
+
+    Usage::
+
+        content = get_template("Offers.xml").render(offers=offers, ...)
+    """
+    return get_environment().get_template(name)
+
+
+def compile_templates(target=COMPILED_TEMPLATES_DIR):
+    """
+    Compile the templates in the directory target and write the manifest
+    """
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    for path in target.glob("tmpl_*.py"):
+        path.unlink()
+    create_environment(precompiled=False).compile_templates(
+        str(target), zip=None, ignore_errors=False
+    )
+    (target / MANIFEST.name).write_text(json.dumps(_manifest(), indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    compile_templates()
+    print("Compiled the templates in {}".format(COMPILED_TEMPLATES_DIR))
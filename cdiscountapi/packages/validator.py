@@ -1,10 +1,105 @@
+# Python imports
+import operator
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from itertools import accumulate, chain, compress, islice, repeat
+
 # Project imports
 from cdiscountapi.exceptions import ValidationError
 
 
+# The number of records checked at the same time by validate_many
+CHUNK_SIZE = 1000
+
+# The numbers and the integers written as strings (ex: "15.98", "10")
+_NUMBER_STRING = re.compile(r"[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)\Z")
+_INTEGER_STRING = re.compile(r"[+-]?[0-9]+\Z")
+
+# The dates of the XSD of the offers (ex: "2019-04-15T10:30:00")
+_DATE_STRING = re.compile(
+    r"([0-9]{4}-[0-9]{2}-[0-9]{2})"
+    r"(?:[T ]([0-9]{2}:[0-9]{2})(?::([0-9]{2})(?:\.[0-9]+)?)?"
+    r"([+-][0-9]{2}:[0-9]{2}|Z)?)?"
+    r"\Z"
+)
+
+
+class FieldType(namedtuple("FieldType", ["name", "check", "exact"])):
+    """
+    The type of the values of an attribute: its name in the error messages,
+    a function returning True for the valid values and the types whose
+    values are valid without calling it (NaN excepted)
+    """
+
+
+def is_nan(value):
+    """
+    Return True if the value is NaN (float or Decimal)
+    """
+    # NaN is the only value different from itself
+    return value != value
+
+
+def _is_identifier(value):
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    if isinstance(value, str):
+        return _INTEGER_STRING.match(value) is not None
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    if isinstance(value, str):
+        return _NUMBER_STRING.match(value) is not None
+    return (
+        isinstance(value, (int, float, Decimal))
+        and not isinstance(value, bool)
+        and not is_nan(value)
+    )
+
+
+def _is_date(value):
+    if isinstance(value, date):
+        return True
+    if not isinstance(value, str):
+        return False
+    match = _DATE_STRING.match(value)
+    if match is None:
+        return False
+    day, minutes, seconds, _ = match.groups()
+    try:
+        # datetime.fromisoformat doesn't exist in Python 3.6
+        datetime.strptime(
+            "{} {}:{}".format(day, minutes or "00:00", seconds or "00"),
+            "%Y-%m-%d %H:%M:%S",
+        )
+    except ValueError:
+        return False
+    return True
+
+
+STRING = FieldType("a string", lambda value: isinstance(value, str), {str})
+# The EAN and the SKU can be integers: they are written with str()
+IDENTIFIER = FieldType("a string or an integer", _is_identifier, {str, int})
+INTEGER = FieldType("an integer", _is_integer, {int})
+NUMBER = FieldType("a number", _is_number, {int, float, Decimal})
+DATE = FieldType("a date (datetime or ISO 8601 string)", _is_date, {datetime, date})
+
+
 class BaseValidator(object):
     required = set()
     optional = set()
+    # The types of the attributes checked by validate_many
+    types = {}
+    # The lists of records of the attributes: {attribute: (item, validator)}
+    lists = {}
 
     @classmethod
     def package_type(cls):
@@ -34,6 +129,65 @@ class BaseValidator(object):
             )
         return data
 
+    @classmethod
+    def compile(cls):
+        """
+        Return the :py:class:`CompiledValidator` of the validator (compiled
+        once)
+        """
+        return compile_validator(cls)
+
+    @classmethod
+    def validate_many(cls, records, key=None):
+        """
+        Validate all the records in one pass and return the report of all
+        their errors
+
+        The types of the attributes and the lists of nested records are
+        checked too.
+
+        :param records: An iterable of records
+        :param str key: The key of the record in each item of records (ex:
+                        "Offer" for an OfferCollection)
+        :returns: A :py:class:`ValidationReport`
+
+        Usage::
+
+            report = OfferValidator.validate_many(offer_collection, key="Offer")
+            for error in report:
+                print(error.index, error.field, error.reason)
+        """
+        return cls.compile().validate(records, key)
+
+
+class DiscountComponentValidator(BaseValidator):
+    required = {"DiscountValue", "Type", "StartDate", "EndDate"}
+    types = {
+        "DiscountValue": NUMBER,
+        "Type": INTEGER,
+        "StartDate": DATE,
+        "EndDate": DATE,
+    }
+
+
+class ShippingInformationValidator(BaseValidator):
+    required = {"ShippingCharges", "AdditionalShippingCharges", "DeliveryMode"}
+    types = {
+        "ShippingCharges": NUMBER,
+        "AdditionalShippingCharges": NUMBER,
+        "DeliveryMode": STRING,
+    }
+
+
+class ProductEanValidator(BaseValidator):
+    required = {"Ean"}
+    types = {"Ean": IDENTIFIER}
+
+
+class ProductImageValidator(BaseValidator):
+    required = {"Uri"}
+    types = {"Uri": STRING}
+
 
 class OfferValidator(BaseValidator):
     # Parameters common to PackageType "Full" and "StockAndPrice"
@@ -62,6 +216,31 @@ class OfferValidator(BaseValidator):
         "PreparationTime",
     }
 
+    types = {
+        "ProductEan": IDENTIFIER,
+        "SellerProductId": IDENTIFIER,
+        "Comment": STRING,
+        "StrikedPrice": NUMBER,
+        "MinimumPriceForPriceAlignment": NUMBER,
+        "ProductPackagingValue": NUMBER,
+        "BluffDeliveryMax": INTEGER,
+        "ProductCondition": INTEGER,
+        "Price": NUMBER,
+        "EcoPart": NUMBER,
+        "Vat": NUMBER,
+        "DeaTax": NUMBER,
+        "Stock": INTEGER,
+        "PreparationTime": INTEGER,
+    }
+
+    lists = {
+        "DiscountList": ("DiscountComponent", DiscountComponentValidator),
+        "ShippingInformationList": (
+            "ShippingInformation",
+            ShippingInformationValidator,
+        ),
+    }
+
 
 class ProductValidator(BaseValidator):
     required = {
@@ -92,18 +271,318 @@ class ProductValidator(BaseValidator):
         "Navigation",
     }
 
+    types = dict(
+        {
+            name: STRING
+            for name in required | optional
+            if name not in ("EanList", "Pictures", "ModelProperties")
+        },
+        SellerProductId=IDENTIFIER,
+        Width=NUMBER,
+        Weight=NUMBER,
+        Length=NUMBER,
+        Height=NUMBER,
+    )
 
-class DiscountComponentValidator(BaseValidator):
-    required = {"DiscountValue", "Type", "StartDate", "EndDate"}
+    lists = {
+        "EanList": ("ProductEan", ProductEanValidator),
+        "Pictures": ("ProductImage", ProductImageValidator),
+    }
 
 
-class ShippingInformationValidator(BaseValidator):
-    required = {"ShippingCharges", "AdditionalShippingCharges", "DeliveryMode"}
+class FieldError(namedtuple("FieldError", ["index", "field", "reason"])):
+    """
+    An error of a :py:class:`ValidationReport`: the index of the record, the
+    attribute (ex: ShippingInformationList.ShippingInformation[0].DeliveryMode)
+    and the reason
+    """
 
+    def __str__(self):
+        return "Record {}, {}: {}".format(self.index, self.field, self.reason)
 
-class ProductEanValidator(BaseValidator):
-    required = {"Ean"}
 
+class ValidationReport(object):
+    """
+    The errors of a collection of records returned by
+    :py:meth:`BaseValidator.validate_many`
+    """
 
-class ProductImageValidator(BaseValidator):
-    required = {"Uri"}
+    def __init__(self, name, number_of_records, errors):
+        self.name = name
+        self.number_of_records = number_of_records
+        self.errors = errors
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    @property
+    def invalid_records(self):
+        """
+        The sorted indexes of the records with errors
+        """
+        return sorted({error.index for error in self.errors})
+
+    def __iter__(self):
+        return iter(self.errors)
+
+    def __len__(self):
+        return len(self.errors)
+
+    def __str__(self):
+        if self.is_valid:
+            return "The {} {} records are valid.".format(
+                self.number_of_records, self.name
+            )
+        return "{} errors in {} of the {} {} records".format(
+            len(self.errors),
+            len(self.invalid_records),
+            self.number_of_records,
+            self.name,
+        )
+
+    def __repr__(self):
+        return "<ValidationReport: {}>".format(self)
+
+    def raise_for_errors(self, limit=10):
+        """
+        Raise a ValidationError listing the first errors if there are errors
+        """
+        if self.is_valid:
+            return
+        lines = [str(error) for error in self.errors[:limit]]
+        if len(self.errors) > limit:
+            lines.append("...")
+        raise ValidationError("{}:\n{}".format(self, "\n".join(lines)))
+
+
+class CompiledValidator(object):
+    """
+    The tables of a validator computed once to validate many records: the
+    required attributes, the allowed attributes, their types and the
+    compiled validators of the nested lists
+    """
+
+    def __init__(self, validator):
+        self.name = validator.package_type()
+        self.required = tuple(sorted(validator.required))
+        self.required_set = frozenset(validator.required)
+        self.optional = frozenset(validator.optional)
+        self.allowed = frozenset(validator.required | validator.optional)
+        self.types = dict(validator.types)
+        # The types accepted without calling FieldType.check
+        self.exact_types = {
+            attribute: frozenset(field_type.exact)
+            for attribute, field_type in self.types.items()
+        }
+        # The types accepted by valid_mask, None is accepted for the optional
+        # attributes
+        self.accepted = {
+            attribute: exact | {type(None)} if attribute in self.optional else exact
+            for attribute, exact in self.exact_types.items()
+        }
+        self.lists = {
+            attribute: (item, compile_validator(item_validator))
+            for attribute, (item, item_validator) in validator.lists.items()
+        }
+        # The required attributes found neither in a column nor in a list
+        self.untyped_required = frozenset(
+            self.required_set - set(self.types) - set(self.lists)
+        )
+
+    def errors_of(self, record):
+        """
+        Return the errors of a record: a list of (attribute, reason), the
+        attribute is None when the record itself is not valid
+        """
+        if type(record) is not dict and not isinstance(record, Mapping):
+            return [(None, "should be a dictionary, not {!r}".format(record))]
+
+        errors = []
+        if not record.keys() >= self.required_set:
+            errors.extend(
+                (attribute, "missing required attribute")
+                for attribute in self.required
+                if attribute not in record
+            )
+        if not self.allowed.issuperset(record):
+            errors.extend(
+                (attribute, "unknown attribute")
+                for attribute in record
+                if attribute not in self.allowed
+            )
+
+        exact_types = self.exact_types
+        lists = self.lists
+        for attribute, value in record.items():
+            exact = exact_types.get(attribute)
+            if exact is not None:
+                if type(value) in exact and not is_nan(value):
+                    continue
+                if value is None and attribute in self.optional:
+                    # The optional attributes set to None are not written
+                    continue
+                field_type = self.types[attribute]
+                if not field_type.check(value):
+                    errors.append(
+                        (
+                            attribute,
+                            "should be {}, not {!r}".format(field_type.name, value),
+                        )
+                    )
+            elif attribute in lists:
+                errors.extend(self._list_errors(attribute, value))
+        return errors
+
+    def _list_errors(self, attribute, value):
+        item, validator = self.lists[attribute]
+        path = "{}.{}".format(attribute, item)
+        items = value.get(item) if isinstance(value, Mapping) else None
+        if not isinstance(items, (list, tuple)):
+            return [
+                (path, "should be a list of {} in a dictionary".format(validator.name))
+            ]
+        errors = []
+        for position, item_record in enumerate(items):
+            for field, reason in validator.errors_of(item_record):
+                item_path = "{}[{}]".format(path, position)
+                if field is not None:
+                    item_path = "{}.{}".format(item_path, field)
+                errors.append((item_path, reason))
+        return errors
+
+    def valid_mask(self, records):
+        """
+        Return a list of booleans, True for the records which are valid
+
+        The records are checked an attribute at a time: the records marked
+        False are only suspect, errors_of gives their errors (ex: a number
+        written as a string is valid).
+        """
+        # The mask is only built for the first column with a suspect value
+        mask = None
+        if not set(map(type, records)) <= _DICT:
+            mask = _type_mask(records, _DICT)
+            records = [record if valid else {} for record, valid in zip(records, mask)]
+        present = set().union(*records)
+        if not present <= self.allowed:
+            mask = _and(mask, [self.allowed.issuperset(record) for record in records])
+        if self.untyped_required:
+            required = self.untyped_required
+            mask = _and(mask, [record.keys() >= required for record in records])
+
+        # A column is suspect when a value has another type or is NaN: the
+        # mask is only computed for these columns
+        for attribute, accepted in self.accepted.items():
+            if attribute not in present and attribute not in self.required_set:
+                continue
+            # The missing required attributes are found as None
+            column = [record.get(attribute) for record in records]
+            types = set(map(type, column))
+            if types <= accepted and not (
+                types & _NAN_TYPES and any(map(is_nan, column))
+            ):
+                continue
+            mask = _and(
+                mask,
+                [type(value) in accepted and not is_nan(value) for value in column],
+            )
+
+        for attribute, (item, validator) in self.lists.items():
+            if attribute not in present and attribute not in self.required_set:
+                continue
+            empty = {item: ()}
+            # The missing required lists are found as None
+            default = None if attribute in self.required_set else empty
+            containers = [record.get(attribute, default) for record in records]
+            if not set(map(type, containers)) <= _DICT:
+                valid = _type_mask(containers, _DICT)
+                mask = _and(mask, valid)
+                containers = [c if ok else empty for c, ok in zip(containers, valid)]
+            lists = [container.get(item) for container in containers]
+            if not set(map(type, lists)) <= _SEQUENCES:
+                valid = _type_mask(lists, _SEQUENCES)
+                mask = _and(mask, valid)
+                lists = [items if ok else () for items, ok in zip(lists, valid)]
+
+            item_mask = validator.valid_mask(list(chain.from_iterable(lists)))
+            if not all(item_mask):
+                # The index of the record of an item is found by its position
+                ends = list(accumulate(map(len, lists)))
+                invalid = {
+                    bisect_right(ends, position)
+                    for position, ok in enumerate(item_mask)
+                    if not ok
+                }
+                mask = _and(
+                    mask, (index not in invalid for index in range(len(records)))
+                )
+        return [True] * len(records) if mask is None else mask
+
+    def validate(self, records, key=None):
+        """
+        Return the :py:class:`ValidationReport` of the records
+        """
+        errors = []
+        errors_of = self.errors_of
+        name = key or self.name
+        number_of_records = 0
+        records = iter(records)
+        for chunk in iter(lambda: list(islice(records, CHUNK_SIZE)), []):
+            start = number_of_records
+            number_of_records += len(chunk)
+            if key is not None:
+                if set(map(type, chunk)) <= _DICT:
+                    chunk = list(map(dict.get, chunk, repeat(key)))
+                else:
+                    chunk = [
+                        container.get(key) if isinstance(container, Mapping) else None
+                        for container in chunk
+                    ]
+            mask = self.valid_mask(chunk)
+            if all(mask):
+                continue
+
+            suspects = compress(range(len(chunk)), map(operator.not_, mask))
+            for position in suspects:
+                index, record = start + position, chunk[position]
+                if record is None and key is not None:
+                    errors.append(FieldError(index, key, "missing record"))
+                    continue
+                record_errors = errors_of(record)
+                if record_errors:
+                    errors.extend(
+                        FieldError(index, name if field is None else field, reason)
+                        for field, reason in record_errors
+                    )
+        return ValidationReport(self.name, number_of_records, errors)
+
+
+_DICT = frozenset({dict})
+_NAN_TYPES = frozenset({float, Decimal})
+_SEQUENCES = frozenset({list, tuple})
+
+
+def _type_mask(values, types):
+    """
+    Return a list of booleans, True for the values whose type is in types
+    """
+    return list(map(types.__contains__, map(type, values)))
+
+
+def _and(mask, other):
+    """
+    Return the mask of the values valid in mask and in other (mask is None
+    when all the values are valid)
+    """
+    if mask is None:
+        return list(other)
+    return list(map(operator.and_, mask, other))
+
+
+@lru_cache(maxsize=None)
+def compile_validator(validator):
+    """
+    Return the :py:class:`CompiledValidator` of a validator class
+    """
+    return CompiledValidator(validator)
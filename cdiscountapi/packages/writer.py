@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.writer
+    ----------------------------
+
+    Write the zip packages (Open Packaging Conventions) in memory or in a
+    file without temporary directory. Offers.xml can be serialized one offer
+    at a time with lxml directly in the compressed entry of the zip file, so
+    the memory used doesn't depend on the number of offers.
+    :py:class:`PackageWriter` appends the offers of a feed to an open
+    package and starts a new one when it's full.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import json
+import os
+import time
+import uuid
+import zipfile
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from lxml import etree
+
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages import OfferPackage
+
+
+OFFER_NAMESPACE = (
+    "clr-namespace:Cdiscount.Service.OfferIntegration.Pivot;"
+    "assembly=Cdiscount.Service.OfferIntegration"
+)
+XAML_NAMESPACE = "http://schemas.microsoft.com/winfx/2006/xaml"
+
+PACKAGE_TEMPLATES_DIR = Path(__file__).parent
+
+# The files of the packages which don't depend on the content
+PACKAGE_FILES = ("[Content_Types].xml", "_rels/.rels")
+
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# The API accepts between 10K and 20K products by package
+DEFAULT_MAX_RECORDS = 10000
+
+# The size of the digests of the records appended to a PackageWriter
+RECORD_DIGEST_SIZE = 16
+
+# The records of the packages in the data by package type
+RECORDS_KEYS = {"offer": "OfferCollection", "product": "Products"}
+
+# The dates and the decimals are compared as they are written in the XML
+_encoder = json.JSONEncoder(
+    sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+)
+
+# The lists of an offer written as child elements instead of attributes
+OFFER_LISTS = ("ShippingInformationList", "DiscountList")
+
+SHIPPING_INFORMATION_ATTRIBUTES = (
+    "AdditionalShippingCharges",
+    "DeliveryMode",
+    "ShippingCharges",
+)
+DISCOUNT_COMPONENT_ATTRIBUTES = ("DiscountValue", "EndDate", "StartDate", "Type")
+
+
+class PackageInfo(
+    namedtuple(
+        "PackageInfo",
+        ["path", "records", "uncompressed_size", "compressed_size", "sha256"],
+    )
+):
+    """
+    A package written on the disk: the path of the package, the number of
+    offers (or products), the size of the XML file, the size of the zip file
+    and its SHA-256
+    """
+
+    def as_dict(self):
+        return dict(self._asdict(), path=str(self.path))
+
+
+@lru_cache(maxsize=None)
+def package_file(package_type, name):
+    """
+    Return the content of a file of the package template (read only once)
+    """
+    path = PACKAGE_TEMPLATES_DIR / "{}_package".format(package_type) / name
+    return path.read_bytes()
+
+
+def content_name(package_type):
+    """
+    Return the name of the XML file in the package (ex: Content/Offers.xml)
+    """
+    return "Content/{}s.xml".format(package_type.capitalize())
+
+
+def package_attributes(data):
+    """
+    Return the :py:class:`OfferPackage` of the attributes of a package (Name,
+    PackageType, PurgeAndReplace, OfferPublicationList) without its offers:
+    the attributes are checked by OfferPackage
+    """
+    return OfferPackage(dict(data or {}, OfferCollection=[]))
+
+
+def _zip_info(name):
+    # The entries have a fixed date: the same content gives the same package
+    info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def write_package(target, package_type, content):
+    """
+    Write the zip package in target
+
+    Nothing else is written on the disk and the current directory is not
+    changed, so several packages can be written at the same time.
+
+    :param target: The path of the zip file or a writable binary file object
+    :param str package_type: 'offer' or 'product'
+    :param content: The content of the XML file (bytes) or a function writing
+                    it in the binary file object it receives
+    :returns: The value returned by content if it's a function
+    """
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in PACKAGE_FILES:
+            zf.writestr(_zip_info(name), package_file(package_type, name))
+        info = _zip_info(content_name(package_type))
+        with zf.open(info, "w", force_zip64=True) as entry:
+            if callable(content):
+                return content(entry)
+            entry.write(content)
+
+
+def _tag(name):
+    return "{%s}%s" % (OFFER_NAMESPACE, name)
+
+
+def _items(offer, list_name, item_name):
+    return (offer.get(list_name) or {}).get(item_name, [])
+
+
+def _write_empty_element(xf, name, attributes):
+    with xf.element(_tag(name), attributes):
+        pass
+
+
+def write_offer(xf, offer):
+    """
+    Write the Offer element of a validated offer
+
+    The attributes are those of the offer whose values are not None, the
+    shipping information and the discounts are written as child elements.
+
+    :param xf: The lxml.etree.xmlfile in which the offer is written
+    :param dict offer: The offer returned by OfferPackage.validate
+    """
+    attributes = {
+        key: str(value)
+        for key, value in offer.items()
+        if value is not None and key not in OFFER_LISTS
+    }
+    with xf.element(_tag("Offer"), attributes):
+        shipping_information_list = _items(
+            offer, "ShippingInformationList", "ShippingInformation"
+        )
+        with xf.element(_tag("Offer.ShippingInformationList")):
+            with xf.element(
+                _tag("ShippingInformationList"),
+                Capacity=str(len(shipping_information_list)),
+            ):
+                for shipping_information in shipping_information_list:
+                    _write_empty_element(
+                        xf,
+                        "ShippingInformation",
+                        {
+                            key: str(shipping_information.get(key))
+                            for key in SHIPPING_INFORMATION_ATTRIBUTES
+                        },
+                    )
+
+        if "DiscountList" in offer:
+            discount_list = _items(offer, "DiscountList", "DiscountComponent")
+            with xf.element(_tag("Offer.PriceAndDiscountList")):
+                with xf.element(
+                    _tag("DiscountComponentList"), Capacity=str(len(discount_list))
+                ):
+                    for discount_component in discount_list:
+                        attributes = {"DiscountUnit": "1"}
+                        attributes.update(
+                            (key, str(discount_component.get(key)))
+                            for key in DISCOUNT_COMPONENT_ATTRIBUTES
+                        )
+                        _write_empty_element(xf, "DiscountComponent", attributes)
+
+
+def _offer_package_element(xf, package):
+    return xf.element(
+        _tag("OfferPackage"),
+        {
+            "Name": str(package.name),
+            "PackageType": str(package.package_type),
+            "PurgeAndReplace": str(package.purge_and_replace),
+        },
+        nsmap={None: OFFER_NAMESPACE, "x": XAML_NAMESPACE},
+    )
+
+
+@contextmanager
+def _offer_collection_element(xf):
+    with xf.element(_tag("OfferPackage.Offers")):
+        with xf.element(_tag("OfferCollection"), Capacity="1"):
+            yield
+
+
+def _write_offer_publication_list(xf, package):
+    if not package.offer_publication_list:
+        return
+    with xf.element(_tag("OfferPackage.OfferPublicationList")):
+        with xf.element(
+            _tag("OfferPublicationList"),
+            Capacity=str(len(package.offer_publication_list)),
+        ):
+            for publication_pool in package.offer_publication_list:
+                _write_empty_element(
+                    xf, "PublicationPool", {"Id": str(publication_pool["Id"])}
+                )
+
+
+def write_offers_xml(output, data):
+    """
+    Write the content of Offers.xml in output, one offer at a time
+
+    The offers are validated as they are written. Unlike
+    :py:class:`OfferPackage`, the duplicated offers are not removed: keeping
+    track of them would need the whole catalog in memory.
+
+    :param output: A binary file object or a path
+    :param dict data: The same data as
+                      :py:func:`cdiscountapi.helpers.generate_package` but
+                      OfferCollection can be any iterable (a generator...)
+    :returns: The number of offers written
+
+    Usage::
+
+        with open("Offers.xml", "wb") as f:
+            write_offers_xml(f, {"OfferCollection": offers, "Name": "A package"})
+    """
+    package = package_attributes(data)
+    number_of_offers = 0
+
+    with etree.xmlfile(output, encoding="utf-8") as xf:
+        with _offer_package_element(xf, package):
+            with _offer_collection_element(xf):
+                for offer in data["OfferCollection"]:
+                    write_offer(xf, package.validate(**offer))
+                    number_of_offers += 1
+            _write_offer_publication_list(xf, package)
+
+    return number_of_offers
+
+
+def write_offer_package(target, data):
+    """
+    Write the offer package in the zip file target
+
+    Offers.xml is compressed while the offers are serialized: neither the XML
+    nor the list of the offers is kept in memory.
+
+    :param target: The path of the zip file or a writable binary file object
+    :param dict data: The data of :py:func:`write_offers_xml`
+    :returns: The number of offers written
+
+    Usage::
+
+        offers = ({"Offer": offer} for offer in read_offers())
+        write_offer_package("offers.zip", {"OfferCollection": offers})
+    """
+    return write_package(target, "offer", lambda entry: write_offers_xml(entry, data))
+
+
+class _CountingWriter(object):
+    """
+    Count the bytes written in a binary file object
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return self.output.write(data)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def canonical_json(value):
+    """
+    Return the JSON of a value with sorted keys (bytes): the values equal in
+    the XML have the same JSON, whatever the order of their keys
+    """
+    return _encoder.encode(value).encode("utf8")
+
+
+def canonical_digest(record, digest_size=RECORD_DIGEST_SIZE):
+    """
+    Return the digest of a record (bytes) computed from its canonical JSON
+    (cf :py:func:`canonical_json`)
+    """
+    return hashlib.blake2b(canonical_json(record), digest_size=digest_size).digest()
+
+
+class PackageWriter(object):
+    """
+    Append offers to an open offer package and seal it when it's full
+
+    The offers are validated and serialized in the compressed entry of the
+    zip file as they are appended: only the keys of the offers of the open
+    package are kept in memory. The package is sealed (the XML is closed and
+    the zip file is renamed <package_path>_001.zip, <package_path>_002.zip...)
+    when it has max_records offers, when Offers.xml reaches max_size bytes or
+    when it was opened max_age seconds ago. The next offers go in a new
+    package. The numbers of the packages already in the directory are
+    skipped.
+
+    An offer appended twice to the same package is only written once. A new
+    version of an offer of the open package seals it and goes in the next
+    one, so the last version is the one applied by Cdiscount.
+
+    The open package is sealed at the end of the with block, unless an error
+    other than a ValidationError (an invalid offer) was raised: the
+    incomplete package is then discarded.
+
+    :param str package_path: The full path to the packages (without suffix)
+    :param dict data: The attributes of the packages (Name, PackageType,
+                      PurgeAndReplace, OfferPublicationList)
+    :param int max_records: The maximum number of offers by package
+    :param int max_size: The maximum size of Offers.xml (bytes)
+    :param float max_age: The maximum time (seconds) between the first offer
+                          of a package and its sealing. It's checked by
+                          append() and flush()
+    :param on_seal: A function called with the :py:class:`PackageInfo` of
+                    each sealed package
+
+    Usage::
+
+        with PackageWriter("/tmp/offers", {"PackageType": "StockAndPrice"},
+                           max_age=300, on_seal=submit) as writer:
+            for offer in feed:
+                writer.append({"Offer": offer})
+                writer.flush()
+        print(writer.packages)
+    """
+
+    def __init__(self, package_path, data=None, max_records=DEFAULT_MAX_RECORDS,
+                 max_size=None, max_age=None, on_seal=None):
+        self.package_path = Path(package_path)
+        if not self.package_path.parent.exists():
+            raise FileNotFoundError(
+                "The directory {} does not exist.".format(self.package_path.parent)
+            )
+        self.package = package_attributes(data)
+        self.max_records = max_records
+        self.max_size = max_size
+        self.max_age = max_age
+        self.on_seal = on_seal
+        self.packages = []
+        self._number = 0
+        self._stack = None
+
+    @property
+    def is_open(self):
+        """
+        True if a package is being written
+        """
+        return self._stack is not None
+
+    @property
+    def records(self):
+        """
+        The number of offers in the open package
+        """
+        return len(self._keys) if self.is_open else 0
+
+    def _next_path(self):
+        while True:
+            self._number += 1
+            path = self.package_path.with_name(
+                "{}_{:03d}.zip".format(self.package_path.name, self._number)
+            )
+            if not path.exists():
+                return path
+
+    def _open(self):
+        self._path = self._next_path()
+        self._tmp_path = self._path.with_name(
+            ".{}.{}.tmp".format(self._path.name, uuid.uuid4().hex)
+        )
+        stack = ExitStack()
+        try:
+            f = stack.enter_context(open(self._tmp_path, "wb"))
+            zf = stack.enter_context(zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED))
+            for name in PACKAGE_FILES:
+                zf.writestr(_zip_info(name), package_file("offer", name))
+            entry = stack.enter_context(
+                zf.open(_zip_info(content_name("offer")), "w", force_zip64=True)
+            )
+            self._output = _CountingWriter(entry)
+            self._xf = stack.enter_context(
+                etree.xmlfile(self._output, encoding="utf-8")
+            )
+            stack.enter_context(_offer_package_element(self._xf, self.package))
+            self._offers = ExitStack()
+            self._offers.enter_context(_offer_collection_element(self._xf))
+        except BaseException:
+            stack.close()
+            os.unlink(self._tmp_path)
+            raise
+        self._file = f
+        self._stack = stack
+        self._keys = {}
+        self._opened_at = time.monotonic()
+
+    def _is_expired(self):
+        return (
+            self.max_age is not None
+            and self.is_open
+            and time.monotonic() - self._opened_at >= self.max_age
+        )
+
+    def _is_full(self):
+        if len(self._keys) >= self.max_records:
+            return True
+        if self.max_size is None:
+            return False
+        # Count what lxml keeps in its buffer too
+        self._xf.flush()
+        return self._output.size >= self.max_size
+
+    def append(self, offer):
+        """
+        Validate the offer and write it in the open package
+
+        :param dict offer: An offer like those of OfferCollection
+                           ({"Offer": {...}})
+        :returns: False if the same offer is already in the open package
+        """
+        valid_offer = self.package.validate(**offer)
+        key = self.package.key(valid_offer)
+        digest = canonical_digest(valid_offer)
+
+        if self._is_expired():
+            self.seal()
+        known_digest = self._keys.get(key) if self.is_open else None
+        if known_digest == digest:
+            return False
+        if known_digest is not None:
+            self.seal()
+
+        if not self.is_open:
+            self._open()
+        write_offer(self._xf, valid_offer)
+        self._keys[key] = digest
+
+        if self._is_full():
+            self.seal()
+        return True
+
+    def extend(self, offers):
+        """
+        Append the offers one at a time
+
+        :returns: The number of offers written
+        """
+        return sum(1 for offer in offers if self.append(offer))
+
+    def flush(self):
+        """
+        Write the offers kept in the buffers in the file of the open package
+        (or seal it if it's too old)
+
+        The end of the compressed data is only written when the package is
+        sealed.
+        """
+        if self._is_expired():
+            self.seal()
+        elif self.is_open:
+            self._xf.flush()
+            self._file.flush()
+
+    def seal(self):
+        """
+        Close the open package and give it its final name
+
+        :returns: The :py:class:`PackageInfo` of the package or None if no
+                  package is open
+        """
+        if not self.is_open:
+            return None
+        stack, self._stack = self._stack, None
+        try:
+            self._offers.close()
+            _write_offer_publication_list(self._xf, self.package)
+            stack.close()
+            os.replace(self._tmp_path, self._path)
+        except BaseException:
+            stack.close()
+            if self._tmp_path.exists():
+                os.unlink(self._tmp_path)
+            raise
+
+        info = PackageInfo(
+            self._path,
+            len(self._keys),
+            self._output.size,
+            self._path.stat().st_size,
+            _sha256(self._path),
+        )
+        self._keys = {}
+        self.packages.append(info)
+        if self.on_seal is not None:
+            self.on_seal(info)
+        return info
+
+    def discard(self):
+        """
+        Delete the open package without sealing it
+        """
+        if not self.is_open:
+            return
+        stack, self._stack = self._stack, None
+        self._keys = {}
+        # The elements of the offers are closed first
+        stack.push(self._offers)
+        try:
+            stack.close()
+        finally:
+            if self._tmp_path.exists():
+                os.unlink(self._tmp_path)
+
+    def close(self):
+        """
+        Seal the open package
+        """
+        self.seal()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # An invalid offer is rejected before it's written: the open package
+        # only has valid offers. After any other error it's incomplete and
+        # must not reach on_seal.
+        if exc_type is None or issubclass(exc_type, ValidationError):
+            self.close()
+        else:
+            self.discard()
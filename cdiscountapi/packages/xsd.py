@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.packages.xsd
+    -------------------------
+
+    Check Offers.xml and Products.xml against the XML schemas bundled in
+    cdiscountapi/assets/xsd before the packages are submitted, instead of
+    waiting for the result of the submission.
+
+    The schemas are compiled once per thread: an XMLSchema can't validate in
+    several threads at the same time, so the threads validate in parallel
+    with their own schemas. The XML is validated while it
+    is parsed by an incremental parser whose elements are removed as soon as
+    they are validated, so the memory used doesn't depend on the size of the
+    XML and the XML can be validated while it's written.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import re
+import threading
+from pathlib import Path
+
+from lxml import etree
+
+from cdiscountapi.exceptions import ValidationError
+
+
+XSD_DIR = Path(__file__).parent.parent / "assets" / "xsd"
+
+SCHEMAS = {"offer": "Offers.xsd", "product": "Products.xsd"}
+
+ROOT_TAGS = {"offer": "OfferPackage", "product": "ProductPackage"}
+
+# The elements of the records (the index of the invalid record is reported)
+RECORD_TAGS = {"offer": "Offer", "product": "Product"}
+COLLECTION_TAGS = {"offer": "OfferCollection", "product": "ProductCollection"}
+
+# The number of errors in the message of ValidationError
+MAX_ERRORS = 10
+
+# The compiled schemas of each thread: {package type: XMLSchema}
+_local = threading.local()
+# The namespaces of the tags in the messages of lxml (not the sets of values)
+_NAMESPACE = re.compile(r"\{[^}' ]*\}")
+
+
+def get_schema(package_type):
+    """
+    Return the compiled XMLSchema of the XML file of the packages (compiled
+    once per thread)
+
+    :param str package_type: 'offer' or 'product'
+    """
+    package_type = package_type.lower()
+    if package_type not in SCHEMAS:
+        raise ValueError("The package type should be 'offer' or 'product'.")
+    schemas = getattr(_local, "schemas", None)
+    if schemas is None:
+        schemas = _local.schemas = {}
+    schema = schemas.get(package_type)
+    if schema is None:
+        schema = schemas[package_type] = etree.XMLSchema(
+            etree.parse(str(XSD_DIR / SCHEMAS[package_type]))
+        )
+    return schema
+
+
+def _error_message(package_type, index, errors):
+    messages = [_NAMESPACE.sub("", message) for message in errors]
+    if len(messages) > MAX_ERRORS:
+        messages = messages[:MAX_ERRORS] + ["..."]
+    where = "" if index is None else " ({} {})".format(RECORD_TAGS[package_type], index)
+    return "{}s.xml is not valid{}:\n{}".format(
+        package_type.capitalize(), where, "\n".join(messages)
+    )
+
+
+class SchemaValidator(object):
+    """
+    Validate XML against the schema of a package type while it's fed
+
+    The offers (or products) are validated as soon as they are parsed, then
+    they are removed from the tree: the memory used doesn't depend on the
+    number of records. The rest of the package is validated by close(), once the whole
+    XML was fed. The errors give the index of the invalid record.
+
+    Usage::
+
+        validator = SchemaValidator("offer")
+        for chunk in chunks:
+            validator.feed(chunk)
+        validator.close()
+    """
+
+    def __init__(self, package_type):
+        self.package_type = package_type.lower()
+        # The schema of the thread is compiled now
+        get_schema(self.package_type)
+        self.parser = etree.XMLPullParser(
+            events=("end",), tag="{*}" + RECORD_TAGS[self.package_type]
+        )
+        # The number of records validated
+        self.records = 0
+
+    @property
+    def schema(self):
+        """
+        The schema of the current thread
+        """
+        return get_schema(self.package_type)
+
+    def _errors(self, element):
+        schema = self.schema
+        if schema.validate(element):
+            return []
+        return [error.message for error in schema.error_log]
+
+    def _validate(self, element, index=None):
+        errors = self._errors(element)
+        if errors:
+            raise ValidationError(_error_message(self.package_type, index, errors))
+
+    def _validate_records(self):
+        records = [
+            element
+            for _, element in self.parser.read_events()
+            if element.getparent() is not None
+        ]
+        if not records:
+            return
+        # The records parsed are moved to a collection validated at once,
+        # which is much faster than a validation by record
+        collection = etree.Element(
+            "{%s}%s"
+            % (etree.QName(records[0]).namespace, COLLECTION_TAGS[self.package_type])
+        )
+        collection.extend(records)
+        errors = self._errors(collection)
+        if errors:
+            for index, record in enumerate(records, self.records):
+                self._validate(record, index)
+            raise ValidationError(_error_message(self.package_type, None, errors))
+        self.records += len(records)
+
+    def feed(self, data):
+        """
+        Parse a chunk of XML and validate the records it completes
+
+        :raises ValidationError: When the XML is not well-formed or a record
+                                 is not valid
+        """
+        try:
+            self.parser.feed(data)
+        except etree.XMLSyntaxError as error:
+            raise ValidationError(
+                _error_message(self.package_type, None, [str(error)])
+            ) from error
+        self._validate_records()
+
+    def close(self):
+        """
+        Validate the end of the XML and the package
+
+        :raises ValidationError: When the XML is not valid
+        """
+        try:
+            root = self.parser.close()
+        except etree.XMLSyntaxError as error:
+            raise ValidationError(
+                _error_message(self.package_type, None, [str(error)])
+            ) from error
+        self._validate_records()
+        root_tag = ROOT_TAGS[self.package_type]
+        if etree.QName(root).localname != root_tag:
+            message = "The root element should be {}.".format(root_tag)
+            raise ValidationError(_error_message(self.package_type, None, [message]))
+        self._validate(root)
+
+
+class ValidatingWriter(object):
+    """
+    A binary file object which validates the XML written in it before
+    writing it in output
+
+    Usage::
+
+        with zf.open("Content/Offers.xml", "w") as entry:
+            output = ValidatingWriter(entry, "offer")
+            write_offers_xml(output, data)
+            output.close()
+    """
+
+    def __init__(self, output, package_type):
+        self.output = output
+        self.validator = SchemaValidator(package_type)
+        self.error = None
+
+    def write(self, data):
+        if self.error is None:
+            try:
+                self.validator.feed(data)
+            except ValidationError as error:
+                # lxml.etree.xmlfile ignores the errors of its last write
+                self.error = error
+        if self.error is not None:
+            raise self.error
+        return self.output.write(data)
+
+    def close(self):
+        """
+        Check the end of the XML (output is not closed)
+
+        :raises ValidationError: When the XML is not valid
+        """
+        if self.error is not None:
+            raise self.error
+        self.validator.close()
+
+
+def validate_xml(source, package_type, chunk_size=1 << 16):
+    """
+    Validate the content of Offers.xml or Products.xml
+
+    :param source: The XML (bytes or str), a path or a binary file object
+    :param str package_type: 'offer' or 'product'
+    :raises ValidationError: When the XML is not valid
+
+    Usage::
+
+        validate_xml(content, "offer")
+    """
+    validator = SchemaValidator(package_type)
+    if isinstance(source, str) and source.lstrip().startswith("<"):
+        source = source.encode("utf8")
+    if isinstance(source, bytes):
+        for start in range(0, len(source), chunk_size):
+            validator.feed(source[start:start + chunk_size])
+    elif isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                validator.feed(chunk)
+    else:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            validator.feed(chunk)
+    validator.close()
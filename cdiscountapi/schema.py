@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.schema
+    -------------------
+
+    Share the parsed WSDL between the connections of a process.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import io
+import threading
+import time
+
+from zeep.wsdl import Document
+
+from cdiscountapi.cache import digest_of
+from cdiscountapi.snapshot import load_snapshot
+
+
+# CONSTANTS
+# Number of seconds before the WSDL is downloaded again to check its hash
+DEFAULT_REVALIDATION_TIMEOUT = 3600
+
+
+class SchemaRegistry(object):
+    """
+    A registry of the parsed WSDL documents keyed by (domain, hash of the WSDL)
+
+    The first connection parses the WSDL and the next ones reuse the same
+    zeep Document (and so the same types) as long as the WSDL doesn't change.
+    The WSDL is downloaded again to check its hash every
+    ``revalidation_timeout`` seconds.
+
+    When the bundled snapshot of the domain (cf cdiscountapi.snapshot) was
+    created from a WSDL with the same hash, the document is loaded from the
+    snapshot instead of being parsed.
+
+    Usage::
+
+        document = registry.get_document(domain, wsdl, transport)
+        client = zeep.Client(document, transport=transport)
+
+    :param int revalidation_timeout: The number of seconds before the hash of the
+                                     WSDL is checked again
+    :param bool snapshots: Whether the bundled snapshots are used
+    """
+
+    def __init__(self, revalidation_timeout=DEFAULT_REVALIDATION_TIMEOUT, snapshots=True):
+        self.revalidation_timeout = revalidation_timeout
+        self.snapshots = snapshots
+        self._documents = {}
+        # The last validated hash of the WSDL of each domain: {domain: (hash, time)}
+        self._validated = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _current_digest(self, domain, wsdl, transport):
+        """
+        Return the hash of the WSDL and its content if it had to be downloaded
+        """
+        digest, validated_at = self._validated.get(domain, (None, 0))
+        if digest is not None and time.time() - validated_at < self.revalidation_timeout:
+            return digest, None
+
+        content = transport.load(wsdl)
+        digest = digest_of(content)
+        self._validated[domain] = (digest, time.time())
+        return digest, content
+
+    def get_document(self, domain, wsdl, transport):
+        """
+        Return the parsed WSDL for the domain
+
+        :param str domain: The domain of the API ("cdiscount.com" or "preprod-cdiscount.com")
+        :param str wsdl: The url of the WSDL
+        :param transport: The transport used to load the WSDL and the XSD documents
+        """
+        with self._lock:
+            digest, content = self._current_digest(domain, wsdl, transport)
+            key = (domain, digest)
+            document = self._documents.get(key)
+            if document is not None:
+                return document
+
+            if self.snapshots:
+                document = load_snapshot(domain, digest, transport)
+            if document is None:
+                if content is None:
+                    content = transport.load(wsdl)
+                document = Document(io.BytesIO(content), transport, base=wsdl)
+
+            # The documents parsed from a previous version of the WSDL are obsolete
+            for obsolete_key in [k for k in self._documents if k[0] == domain]:
+                del self._documents[obsolete_key]
+            self._documents[key] = document
+            return document
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._validated.clear()
+
+
+# The registry shared by all the connections of the process
+registry = SchemaRegistry()
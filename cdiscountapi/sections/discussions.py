@@ -9,7 +9,6 @@
 """
 
 
-from zeep.helpers import serialize_object
 from .base import BaseSection
 from ..helpers import auto_refresh_token
 
@@ -41,10 +40,7 @@ class Discussions(BaseSection):
         Return the list of order claims
         """
         order_claim_filter = self.api.factory.OrderClaimFilter(**order_claim_filter)
-        response = self.api.client.service.GetOrderClaimList(
-            headerMessage=self.api.header, orderClaimFilter=order_claim_filter
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetOrderClaimList", orderClaimFilter=order_claim_filter)
 
     @auto_refresh_token
     def get_offer_question_list(self, **offer_question_filter):
@@ -83,10 +79,9 @@ class Discussions(BaseSection):
         offer_question_filter = self.api.factory.OfferQuestionFilter(
             **offer_question_filter
         )
-        response = self.api.client.service.GetOfferQuestionList(
-            headerMessage=self.api.header, offerQuestionFilter=offer_question_filter
+        return self.api.call(
+            "GetOfferQuestionList", offerQuestionFilter=offer_question_filter
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_order_question_list(self, **order_question_filter):
@@ -123,10 +118,9 @@ class Discussions(BaseSection):
         order_question_filter = self.api.factory.OrderQuestionFilter(
             **order_question_filter
         )
-        response = self.api.client.service.GetOrderQuestionList(
-            headerMessage=self.api.header, orderQuestionFilter=order_question_filter
+        return self.api.call(
+            "GetOrderQuestionList", orderQuestionFilter=order_question_filter
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def close_discussion_list(self, discussion_ids):
@@ -143,8 +137,6 @@ class Discussions(BaseSection):
         close_discussion_request = self.api.factory.CloseDiscussionRequest(
             DiscussionIds=self.array_of("long", discussion_ids)
         )
-        response = self.api.client.service.CloseDiscussionList(
-            headerMessage=self.api.header,
-            closeDiscussionRequest=close_discussion_request,
+        return self.api.call(
+            "CloseDiscussionList", closeDiscussionRequest=close_discussion_request
         )
-        return serialize_object(response, dict)
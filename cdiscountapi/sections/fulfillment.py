@@ -9,7 +9,6 @@
 """
 
 
-from zeep.helpers import serialize_object
 from .base import BaseSection
 from ..helpers import auto_refresh_token, check_element
 
@@ -77,10 +76,7 @@ class Fulfillment(BaseSection):
         for desc in prod_desc_list:
             check_element(desc, self.api.factory.FulfilmentProductDescription)
 
-        response = self.api.client.service.SubmitFulfilmentSupplyOrder(
-            headerMessage=self.api.header, request=prod_desc_list
-        )
-        return serialize_object(response, dict)
+        return self.api.call("SubmitFulfilmentSupplyOrder", request=prod_desc_list)
 
     @auto_refresh_token
     def submit_fulfillment_on_demand_supply_order(self, order_list):
@@ -106,10 +102,9 @@ class Fulfillment(BaseSection):
         """
         for order in order_list:
             check_element(order, self.api.factory.FulfilmentOrderLineRequest)
-        response = self.api.client.service.SubmitFulfilmentOnDemandSupplyOrder(
-            headerMessage=self.api.header, request={"OrderLineList": order_list}
+        return self.api.call(
+            "SubmitFulfilmentOnDemandSupplyOrder", request={"OrderLineList": order_list}
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_fulfillment_supply_order_report_list(self, **request):
@@ -141,10 +136,9 @@ class Fulfillment(BaseSection):
         supply_order_report_request = self.api.factory.SupplyOrderReportRequest(
             **request
         )
-        response = self.api.client.service.GetFulfilmentSupplyOrderReportList(
-            headerMessage=self.api.header, request=supply_order_report_request
+        return self.api.call(
+            "GetFulfilmentSupplyOrderReportList", request=supply_order_report_request
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_fulfillment_delivery_document(self, deposit_id):
@@ -159,10 +153,9 @@ class Fulfillment(BaseSection):
 
         :return: data for printing PDF documents, in the form of a Base64-encoded string.
         """
-        response = self.api.client.service.GetFulfilmentDeliveryDocument(
-            headerMessage=self.api.header, request={"DepositId": deposit_id}
+        return self.api.call(
+            "GetFulfilmentDeliveryDocument", request={"DepositId": deposit_id}
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_fulfillment_supply_order(self, **request):
@@ -192,10 +185,9 @@ class Fulfillment(BaseSection):
         )
 
         supply_order_report_request = self.api.factory.SupplyOrderRequest(**request)
-        response = self.api.client.service.GetFulfilmentSupplyOrder(
-            headerMessage=self.api.header, request=supply_order_report_request
+        return self.api.call(
+            "GetFulfilmentSupplyOrder", request=supply_order_report_request
         )
-        return serialize_object(response, dict)
 
     # TODO Make this method more robust
     @auto_refresh_token
@@ -238,10 +230,7 @@ class Fulfillment(BaseSection):
 
         :return: deposit id
         """
-        response = self.api.client.service.SubmitFulfilmentActivation(
-            headerMessage=self.api.header, request=request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("SubmitFulfilmentActivation", request=request)
 
     @auto_refresh_token
     def get_fulfillment_activation_report_list(self, **request):
@@ -262,10 +251,9 @@ class Fulfillment(BaseSection):
         activation_report_request = self.api.factory.FulfilmentActivationReportRequest(
             **request
         )
-        response = self.api.client.service.GetFulfilmentActivationReportList(
-            headerMessage=self.api.header, request=activation_report_request
+        return self.api.call(
+            "GetFulfilmentActivationReportList", request=activation_report_request
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_fulfillment_order_list_to_supply(self, **request):
@@ -288,10 +276,7 @@ class Fulfillment(BaseSection):
         :return: fulfillment on demand order lines to supply answering the search criterion.
         """
         references = self.api.factory.FulfilmentOnDemandOrderLineFilter(**request)
-        response = self.api.client.service.GetFulfilmentActivationReportList(
-            headerMessage=self.api.header, request=references
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetFulfilmentActivationReportList", request=references)
 
     @auto_refresh_token
     def submit_offer_state_action(self, **request):
@@ -311,10 +296,7 @@ class Fulfillment(BaseSection):
         :return:
         """
         seller_action = self.api.factory.OfferStateActionRequest(**request)
-        response = self.api.client.service.SubmitOfferStateAction(
-            headerMessage=self.api.header, offerStateRequest=seller_action
-        )
-        return serialize_object(response, dict)
+        return self.api.call("SubmitOfferStateAction", offerStateRequest=seller_action)
 
     @auto_refresh_token
     def create_external_order(self, **order):
@@ -344,10 +326,7 @@ class Fulfillment(BaseSection):
 
         :return: The response
         """
-        response = self.api.client.service.CreateExternalOrder(
-            headerMessage=self.api.header, request={"Order": order}
-        )
-        return serialize_object(response, dict)
+        return self.api.call("CreateExternalOrder", request={"Order": order})
 
     @auto_refresh_token
     def get_external_order_status(self, **request):
@@ -367,14 +346,13 @@ class Fulfillment(BaseSection):
 
         :return: Status ("OK", "Pending", "KO")
         """
-        response = self.api.client.service.GetExternalOrderStatus(
-            headerMessage=self.api.header,
+        return self.api.call(
+            "GetExternalOrderStatus",
             request={
                 "Corporation": request.get("Corporation"),
                 "CustomerOrderNumber": request.get("CustomerOrderNumber"),
             },
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_product_stock_list(self, **request):
@@ -415,7 +393,4 @@ class Fulfillment(BaseSection):
 
         :return: ProductStockList, Status ("OK", "NoData", "KO") and TotalProductCount
         """
-        response = self.api.client.service.GetProductStockList(
-            headerMessage=self.api.header, request=request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetProductStockList", request=request)
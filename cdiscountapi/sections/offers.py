@@ -8,13 +8,32 @@
     :copyright: © 2019 Alexandria
 """
 
-from zeep.helpers import serialize_object
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from cdiscountapi.exceptions import CdiscountApiException
 from cdiscountapi.helpers import generate_package
+from cdiscountapi.packages.columnar import is_table
+from cdiscountapi.packages.stock import is_rows
 from .base import BaseSection
 from ..helpers import auto_refresh_token
 
 
+# The number of pages requested in advance by Offers.iter_offers
+DEFAULT_PREFETCH = 4
+
+
+def _offers_of_page(response, page_number):
+    if not response.get("OperationSuccess", True):
+        raise CdiscountApiException(
+            "GetOfferListPaginated failed on page {}: {}".format(
+                page_number, response.get("ErrorMessage")
+            )
+        )
+    return (response.get("OfferList") or {}).get("Offer") or []
+
+
 class Offers(BaseSection):
     """
     Offers section lets sellers retrieve information about their offers.
@@ -23,6 +42,7 @@ class Offers(BaseSection):
 
         get_offer_list(**filters)
         get_offer_list_paginated(**filters)
+        iter_offers(prefetch=4, **filters)
         generate_offer_package(package_name,
                                offers_list,
                                offer_publication_list=offer_publication_list,
@@ -59,10 +79,7 @@ class Offers(BaseSection):
         )
 
         offer_filter = self.api.factory.OfferFilter(**filters)
-        response = self.api.client.service.GetOfferList(
-            headerMessage=self.api.header, offerFilter=offer_filter
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetOfferList", offerFilter=offer_filter)
 
     @auto_refresh_token
     def get_offer_list_paginated(self, **filters):
@@ -103,10 +120,73 @@ class Offers(BaseSection):
         )
 
         offer_filter = self.api.factory.OfferFilterPaginated(**filters)
-        response = self.api.client.service.GetOfferListPaginated(
-            headerMessage=self.api.header, offerFilter=offer_filter
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetOfferListPaginated", offerFilter=offer_filter)
+
+    def iter_offers(self, prefetch=DEFAULT_PREFETCH, **filters):
+        """
+        Yield the offers of all the pages of get_offer_list_paginated
+
+        The first page gives the number of pages. Then the next pages are
+        requested on prefetch threads while the offers of the current page
+        are yielded: at most prefetch pages are requested in advance, and
+        the offers are yielded in the order of the pages. No more pages are
+        requested when the iteration stops.
+
+        :param int prefetch: The number of pages requested at the same time
+        (0 to request the pages one at a time)
+        :param filters: The filters of :py:meth:`get_offer_list_paginated`
+        (PageNumber is the first page, 1 by default)
+        :raises CdiscountApiException: When a page is not returned
+
+        Example::
+
+            for offer in api.offers.iter_offers(OfferStateFilter="Active"):
+                print(offer["SellerProductId"], offer["Stock"])
+        """
+        if self.api.is_async:
+            raise CdiscountApiException(
+                "iter_offers is not available with AsyncConnection."
+            )
+
+        first_page = filters.pop("PageNumber", 1)
+        response = self.get_offer_list_paginated(PageNumber=first_page, **filters)
+        pages = iter(range(first_page + 1, (response.get("NumberOfPages") or 0) + 1))
+
+        if not prefetch:
+            yield from _offers_of_page(response, first_page)
+            for page_number in pages:
+                response = self.get_offer_list_paginated(
+                    PageNumber=page_number, **filters
+                )
+                yield from _offers_of_page(response, page_number)
+            return
+
+        def get_page(page_number):
+            return self.get_offer_list_paginated(PageNumber=page_number, **filters)
+
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        pending = deque()
+
+        def request_next_page():
+            page_number = next(pages, None)
+            if page_number is not None:
+                pending.append((page_number, executor.submit(get_page, page_number)))
+
+        try:
+            for _ in range(prefetch):
+                request_next_page()
+            yield from _offers_of_page(response, first_page)
+            while pending:
+                page_number, future = pending.popleft()
+                response = future.result()
+                # The next page is requested before the offers are consumed
+                request_next_page()
+                yield from _offers_of_page(response, page_number)
+        finally:
+            # The pages not started are not requested when the iteration stops
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
 
     @staticmethod
     def generate_offer_package(
@@ -116,7 +196,10 @@ class Offers(BaseSection):
             package_type="Full",
             offer_publication_list=[],
             purge_and_replace=False,
-            overwrite=True
+            overwrite=True,
+            streaming=False,
+            validate=False,
+            cache=None
     ):
         """
         Generate a zip offers package as cdiscount wanted.
@@ -130,7 +213,23 @@ class Offers(BaseSection):
         :param bool purge_and_replace: [optional]
         :param bool overwrite: [optional] Determine if an existing package is
         overwritten when a new one with the same name is created (default: True)
-        :param list offers_list: list of dict [{offer, shipping}, ...]:
+        :param bool streaming: [optional] Write the offers one at a time in
+        the zip file: offers_list can be a generator and the memory used
+        doesn't depend on the number of offers (default: False)
+        :param bool validate: [optional] Check Offers.xml against the schema
+        of the offer packages before the package is created (default: False)
+        :param cache: [optional] A
+        :py:class:`cdiscountapi.packages.cache.PackageCache` in which the
+        package is only generated if the same offers were not already
+        packaged, it keeps the name of the first package (not with a table
+        or rows of offers)
+        :param list offers_list: list of dict [{offer, shipping}, ...] or a
+        table of offers (a dictionary of columns, a pandas DataFrame or a
+        pyarrow Table, cf
+        :py:func:`cdiscountapi.packages.columnar.write_offer_table_xml`) or,
+        for a StockAndPrice package, a list of tuples (ProductEan,
+        SellerProductId, Price, Stock) (cf
+        :py:func:`cdiscountapi.packages.stock.write_stock_and_price_xml`):
 
             -Offer:
                 - Mandatory attributes:
@@ -196,19 +295,29 @@ class Offers(BaseSection):
                 purge_and_replace=purge_and_replace
             )
 
-        :returns: None
+        :returns: The path of the package (with the suffix .zip)
         """
+        # A table of offers is written without a dictionary per offer
+        if is_table(offers_list):
+            offers_key = "OfferTable"
+        elif is_rows(offers_list):
+            offers_key = "StockAndPriceRows"
+        else:
+            offers_key = "OfferCollection"
         return generate_package(
             "offer",
             package_path,
             {
-                "OfferCollection": offers_list,
+                offers_key: offers_list,
                 "OfferPublicationList": offer_publication_list,
                 "PurgeAndReplace": purge_and_replace,
                 "Name": package_name,
                 "PackageType": package_type
             },
-            overwrite=overwrite
+            overwrite=overwrite,
+            streaming=streaming,
+            validate=validate,
+            cache=cache
         )
 
     @auto_refresh_token
@@ -236,10 +345,7 @@ class Offers(BaseSection):
         offer_package = self.api.factory.OfferPackageRequest(url)
 
         # Send request.
-        response = self.api.client.service.SubmitOfferPackage(
-            headerMessage=self.api.header, offerPackageRequest=offer_package
-        )
-        return serialize_object(response, dict)
+        return self.api.call("SubmitOfferPackage", offerPackageRequest=offer_package)
 
     @auto_refresh_token
     def get_offer_package_submission_result(self, package_id):
@@ -250,7 +356,6 @@ class Offers(BaseSection):
         :return: Offer report logs
         """
         package = self.api.factory.PackageFilter(package_id)
-        response = self.api.client.service.GetOfferPackageSubmissionResult(
-            headerMessage=self.api.header, offerPackageFilter=package
+        return self.api.call(
+            "GetOfferPackageSubmissionResult", offerPackageFilter=package
         )
-        return serialize_object(response, dict)
@@ -202,10 +202,7 @@ class Orders(BaseSection):
             order_filter.update(FetchOrderLines=True)
 
         order_filter = self.api.factory.OrderFilter(**order_filter)
-        response = self.api.client.service.GetOrderList(
-            headerMessage=self.api.header, orderFilter=order_filter
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetOrderList", orderFilter=order_filter)
 
     @auto_refresh_token
     def get_global_configuration(self):
@@ -215,10 +212,7 @@ class Orders(BaseSection):
 
         - Carrier list
         """
-        response = self.api.client.service.GetGlobalConfiguration(
-            headerMessage=self.api.header
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetGlobalConfiguration")
 
     def _prepare_validation(self, data):
         """
@@ -339,11 +333,9 @@ class Orders(BaseSection):
         validate_order_list_message = self.api.factory.ValidateOrderListMessage(
             **validate_order_list_message
         )
-        response = self.api.client.service.ValidateOrderList(
-            headerMessage=self.api.header,
-            validateOrderListMessage=validate_order_list_message,
+        return self.api.call(
+            "ValidateOrderList", validateOrderListMessage=validate_order_list_message
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def create_refund_voucher(self, **request):
@@ -438,10 +430,7 @@ class Orders(BaseSection):
                 request.get("SellerRefundList")
             ),
         )
-        response = self.api.client.service.CreateRefundVoucher(
-            headerMessage=self.api.header, request=request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("CreateRefundVoucher", request=request)
 
     @auto_refresh_token
     def manage_parcel(self, parcel_actions_list=None, scopus_id=None):
@@ -485,7 +474,4 @@ class Orders(BaseSection):
             ScopusId=scopus_id,
         )
 
-        response = self.api.client.service.ManageParcel(
-            headerMessage=self.api.header, manageParcelRequest=manage_parcel_request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("ManageParcel", manageParcelRequest=manage_parcel_request)
@@ -51,10 +51,7 @@ class Products(BaseSection):
 
         :return:  tree of the categories leaves of which are authorized for the integration of products and/or offers
         """
-        response = self.api.client.service.GetAllowedCategoryTree(
-            headerMessage=self.api.header
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetAllowedCategoryTree")
 
     @auto_refresh_token
     def get_all_allowed_category_tree(self):
@@ -90,10 +87,7 @@ class Products(BaseSection):
         """
         filters = self.api.factory.ProductFilter(category_code)
 
-        response = self.api.client.service.GetProductList(
-            headerMessage=self.api.header, productFilter=filters
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetProductList", productFilter=filters)
 
     @auto_refresh_token
     def get_model_list(self, category=None):
@@ -115,10 +109,7 @@ class Products(BaseSection):
             self.array_of('string', categories)
         )
 
-        response = self.api.client.service.GetModelList(
-            headerMessage=self.api.header, modelFilter=model_filter
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetModelList", modelFilter=model_filter)
 
     # TODO find a way to call it.
     @auto_refresh_token
@@ -153,8 +144,7 @@ class Products(BaseSection):
 
         :return: all brands
         """
-        response = self.api.client.service.GetBrandList(headerMessage=self.api.header)
-        return serialize_object(response, dict)
+        return self.api.call("GetBrandList")
 
     @staticmethod
     def generate_product_package(
@@ -233,10 +223,9 @@ class Products(BaseSection):
         product_package = self.api.factory.ProductPackageRequest(url)
 
         # Send request.
-        response = self.api.client.service.SubmitProductPackage(
-            headerMessage=self.api.header, productPackageRequest=product_package
+        return self.api.call(
+            "SubmitProductPackage", productPackageRequest=product_package
         )
-        return serialize_object(response, dict)
 
     # TODO find why it doesn't work.
     @auto_refresh_token
@@ -253,10 +242,9 @@ class Products(BaseSection):
         :return: partial or complete report of package integration
         """
         filters = self.api.factory.PackageFilter(package_ids)
-        response = self.api.client.service.GetProductPackageSubmissionResult(
-            headerMessage=self.api.header, productPackageFilter=filters
+        return self.api.call(
+            "GetProductPackageSubmissionResult", productPackageFilter=filters
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_product_package_product_matching_file_data(self, package_id):
@@ -272,11 +260,10 @@ class Products(BaseSection):
         :return: information of the created products
         """
         if package_id:
-            response = self.api.client.service.GetProductPackageProductMatchingFileData(
-                headerMessage=self.api.header,
+            return self.api.call(
+                "GetProductPackageProductMatchingFileData",
                 productPackageFilter={"PackageID": package_id},
             )
-            return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_product_list_by_identifier(self, ean_list=[]):
@@ -292,7 +279,4 @@ class Products(BaseSection):
         :return: complete list of products
         """
         request = {"IdentifierType": "EAN", "ValueList": ean_list}
-        response = self.api.client.service.GetProductListByIdentifier(
-            headerMessage=self.api.header, identifierRequest=request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetProductListByIdentifier", identifierRequest=request)
@@ -9,7 +9,6 @@
 """
 
 
-from zeep.helpers import serialize_object
 from .base import BaseSection
 from ..helpers import auto_refresh_token
 
@@ -39,10 +38,7 @@ class Relays(BaseSection):
             response = api.relays.get_parcel_shop_list()
 
         """
-        response = self.api.client.service.GetParcelShopList(
-            headerMessage=self.api.header
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetParcelShopList")
 
     @auto_refresh_token
     def submit_relays_file(self, relays_file_uri):
@@ -65,10 +61,7 @@ class Relays(BaseSection):
         relays_file_request = self.api.factory.RelaysFileIntegrationRequest(
             relays_file_uri
         )
-        response = self.api.client.service.SubmitRelaysFile(
-            headerMessage=self.api.header, relaysFileRequest=relays_file_request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("SubmitRelaysFile", relaysFileRequest=relays_file_request)
 
     @auto_refresh_token
     def get_relays_file_submission_result(self, relays_file_ids):
@@ -88,7 +81,6 @@ class Relays(BaseSection):
 
         """
         relays_file_filter = self.api.factory.RelaysFileFilter(relays_file_ids)
-        response = self.api.client.service.GetRelaysFileSubmissionResult(
-            headerMessage=self.api.header, relaysFileFilter=relays_file_filter
+        return self.api.call(
+            "GetRelaysFileSubmissionResult", relaysFileFilter=relays_file_filter
         )
-        return serialize_object(response, dict)
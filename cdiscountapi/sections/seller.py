@@ -9,7 +9,6 @@
 """
 
 
-from zeep.helpers import serialize_object
 from .base import BaseSection
 from ..helpers import auto_refresh_token
 
@@ -47,10 +46,7 @@ class Seller(BaseSection):
 
         :return: Information of the authenticated seller.
         """
-        response = self.api.client.service.GetSellerInformation(
-            headerMessage=self.api.header
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetSellerInformation")
 
     @auto_refresh_token
     def get_seller_indicators(self):
@@ -64,7 +60,4 @@ class Seller(BaseSection):
 
         :return: a dict with the data of the user
         """
-        response = self.api.client.service.GetSellerIndicators(
-            headerMessage=self.api.header
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetSellerIndicators")
@@ -9,7 +9,6 @@
 """
 
 
-from zeep.helpers import serialize_object
 from .base import BaseSection
 from ..helpers import auto_refresh_token
 
@@ -43,10 +42,9 @@ class WebMail(BaseSection):
             response = api.generate_discussion_mail_guid(order_id)
 
         """
-        response = self.api.client.service.GenerateDiscussionMailGuid(
-            headerMessage=self.api.header, request={"ScopusId": order_id}
+        return self.api.call(
+            "GenerateDiscussionMailGuid", request={"ScopusId": order_id}
         )
-        return serialize_object(response, dict)
 
     @auto_refresh_token
     def get_discussion_mail_list(self, discussion_ids):
@@ -67,7 +65,4 @@ class WebMail(BaseSection):
         request = self.api.factory.GetDiscussionMailListRequest(
             DiscussionIds=self.array_of("long", discussion_ids)
         )
-        response = self.api.client.service.GetDiscussionMailList(
-            headerMessage=self.api.header, request=request
-        )
-        return serialize_object(response, dict)
+        return self.api.call("GetDiscussionMailList", request=request)
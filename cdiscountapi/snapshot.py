@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.snapshot
+    ---------------------
+
+    Serialize the parsed WSDL so that a connection doesn't have to parse it.
+
+    A snapshot is a compressed pickle of the zeep Document preceded by a JSON
+    header with the hash of the WSDL and the version of zeep used to create it.
+    The snapshots are bundled in cdiscountapi/assets/schema. Build the
+    snapshots of the production and the preprod again with::
+
+        python -m cdiscountapi.snapshot [domain ...]
+
+    A snapshot is only used when its hash matches the current WSDL and it was
+    created with the installed version of zeep (the bundled snapshot: zeep
+    4.3.3). Otherwise the WSDL is parsed and the reason is logged at the
+    debug level.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import copyreg
+import functools
+import io
+import json
+import logging
+import pickle
+import sys
+import zlib
+from pathlib import Path
+
+import zeep
+from lxml import etree
+from zeep.settings import Settings
+from zeep.transports import Transport as ZeepTransport
+from zeep.wsdl import Document
+
+from cdiscountapi.cache import digest_of
+
+
+logger = logging.getLogger(__name__)
+
+# CONSTANTS
+MAGIC = b"CDISCOUNTAPI-SNAPSHOT-1\n"
+SNAPSHOTS_DIR = Path(__file__).parent / "assets" / "schema"
+DOMAINS = ("cdiscount.com", "preprod-cdiscount.com")
+WSDL_URL = "https://wsvc.{0}/MarketplaceAPIService.svc?wsdl"
+
+
+def snapshot_path(domain):
+    return SNAPSHOTS_DIR / "{}.snapshot".format(domain)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_property_names(cls):
+    return frozenset(
+        name
+        for klass in cls.__mro__
+        for name, value in vars(klass).items()
+        if isinstance(value, functools.cached_property)
+    )
+
+
+def _value_class_attribute(cls):
+    xsd_type = cls._xsd_type
+    if xsd_type.__dict__.get("_value_class") is cls:
+        return "_value_class"
+    return "_array_class"
+
+
+class SnapshotPickler(pickle.Pickler):
+    """
+    Pickle a zeep Document
+
+    - the transport and the settings are replaced when the snapshot is loaded
+    - the classes that zeep creates on the fly are rebuilt from their name
+      and their bases
+    - the values cached on the XSD types are computed again when needed
+    """
+
+    dispatch_table = copyreg.dispatch_table.copy()
+    dispatch_table[etree.QName] = lambda qname: (etree.QName, (qname.text,))
+
+    def __init__(self, file, transport, **kwargs):
+        super().__init__(file, **kwargs)
+        self.transport = transport
+
+    def persistent_id(self, obj):
+        if obj is self.transport or isinstance(obj, ZeepTransport):
+            return "transport"
+        if isinstance(obj, Settings):
+            return "settings"
+        return None
+
+    def reducer_override(self, obj):
+        if isinstance(obj, type):
+            if obj.__module__ == "zeep.xsd.dynamic_types":
+                attributes = {
+                    k: v for k, v in vars(obj).items() if k in ("__module__", "_xsd_name")
+                }
+                return type, (obj.__name__, obj.__bases__, attributes)
+            if obj.__module__ == "zeep.objects":
+                return getattr, (obj._xsd_type, _value_class_attribute(obj))
+            return NotImplemented
+
+        names = _cached_property_names(type(obj))
+        state = getattr(obj, "__dict__", None)
+        if not names or not state or names.isdisjoint(state):
+            return NotImplemented
+        state = {k: v for k, v in state.items() if k not in names}
+        return copyreg.__newobj__, (type(obj),), state
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, transport, settings):
+        super().__init__(file)
+        self.persistent_objects = {"transport": transport, "settings": settings}
+
+    def persistent_load(self, pid):
+        return self.persistent_objects[pid]
+
+
+def dumps(document, wsdl_content):
+    """
+    Return the snapshot of the document parsed from wsdl_content
+    """
+    if sys.version_info < (3, 8):
+        raise RuntimeError("Creating a snapshot requires Python 3.8 or later.")
+
+    # The XSD types are deeply nested
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, 100000))
+    try:
+        buffer = io.BytesIO()
+        SnapshotPickler(buffer, document.transport, protocol=4).dump(document)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    header = {
+        "zeep": zeep.__version__,
+        "wsdl": document.location,
+        "digest": digest_of(wsdl_content),
+    }
+    return MAGIC + json.dumps(header).encode("utf8") + b"\n" + zlib.compress(buffer.getvalue(), 9)
+
+
+def read_header(content):
+    """
+    Return the header of the snapshot or None if it's not a valid snapshot
+    """
+    if not content.startswith(MAGIC):
+        return None
+    end = content.index(b"\n", len(MAGIC))
+    return json.loads(content[len(MAGIC):end].decode("utf8"))
+
+
+def loads(content, transport, settings=None):
+    """
+    Return the zeep Document of the snapshot
+    """
+    end = content.index(b"\n", len(MAGIC))
+    data = zlib.decompress(content[end + 1:])
+
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, 100000))
+    try:
+        unpickler = SnapshotUnpickler(io.BytesIO(data), transport, settings or Settings())
+        return unpickler.load()
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_bundled(domain):
+    path = snapshot_path(domain)
+    if not path.exists():
+        return None
+    return path.read_bytes()
+
+
+def load_snapshot(domain, digest, transport):
+    """
+    Return the Document of the bundled snapshot for the domain if it was
+    created from a WSDL with the given hash by the installed version of zeep,
+    None otherwise.
+    """
+    content = _read_bundled(domain)
+    if content is None:
+        logger.debug("No snapshot of the WSDL of %s.", domain)
+        return None
+
+    header = read_header(content)
+    if header is None:
+        logger.debug("The snapshot of %s is not valid.", domain)
+        return None
+    if header["zeep"] != zeep.__version__:
+        logger.debug(
+            "The snapshot of %s is skipped: it was created with zeep %s, not %s.",
+            domain,
+            header["zeep"],
+            zeep.__version__,
+        )
+        return None
+    if header["digest"] != digest:
+        logger.debug("The snapshot of %s is skipped: the WSDL changed.", domain)
+        return None
+    return loads(content, transport)
+
+
+def build_snapshot(domain, transport=None, output_dir=SNAPSHOTS_DIR):
+    """
+    Parse the WSDL of the domain and write its snapshot in output_dir
+    """
+    transport = transport or ZeepTransport()
+    wsdl = WSDL_URL.format(domain)
+    content = transport.load(wsdl)
+    document = Document(io.BytesIO(content), transport, base=wsdl)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / "{}.snapshot".format(domain)
+    path.write_bytes(dumps(document, content))
+    return path
+
+
+if __name__ == "__main__":
+    for domain in sys.argv[1:] or DOMAINS:
+        print("Created {}".format(build_snapshot(domain)))
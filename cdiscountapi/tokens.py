@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.tokens
+    -------------------
+
+    Stores for the tokens of the API shared by the connections of a process
+    or by several processes.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# CONSTANTS
+# A token issued by the STS is valid for 48 hours
+DEFAULT_TOKEN_LIFETIME = 48 * 3600
+# The token is refreshed one hour before it expires
+DEFAULT_REFRESH_MARGIN = 3600
+# The iterations of the digest of the password in the keys of the tokens
+TOKEN_KEY_ITERATIONS = 10000
+
+
+class Token(namedtuple("Token", ["value", "expires"])):
+    """
+    A token and the time (in seconds since the epoch) when it expires
+    """
+
+    def is_valid(self, margin=0, now=None):
+        """
+        Return True if the token doesn't expire within margin seconds
+        """
+        now = time.time() if now is None else now
+        return self.expires - margin > now
+
+
+def token_key(login, domain, password):
+    """
+    Return the key of the tokens of a login: the login, the domain and a
+    digest of the password (salted by the login and the domain), so a
+    connection with a wrong or a new password doesn't reuse the token
+    """
+    account = "{}@{}".format(login, domain)
+    digest = hashlib.pbkdf2_hmac(
+        "sha256",
+        password.encode("utf8"),
+        account.encode("utf8"),
+        TOKEN_KEY_ITERATIONS,
+    )
+    return "{}/{}".format(account, digest.hex()[:32])
+
+
+class TokenStore(object):
+    """
+    Base class for the stores of tokens
+
+    The tokens are identified by a key built from the login, the domain and
+    a digest of the password (see :py:func:`token_key`). ``lock(key)`` must prevent the other
+    connections using the store from fetching a token for the same key at the
+    same time.
+    """
+
+    def get(self, key):
+        """
+        Return the Token stored for the key or None
+        """
+        raise NotImplementedError
+
+    def set(self, key, token):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def lock(self, key):
+        """
+        Return a context manager holding the lock of the key
+        """
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Store the tokens in memory: they are shared by the connections of the
+    process only
+    """
+
+    def __init__(self):
+        self._tokens = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._tokens.get(key)
+
+    def set(self, key, token):
+        self._tokens[key] = Token(*token)
+
+    def delete(self, key):
+        self._tokens.pop(key, None)
+
+    @contextmanager
+    def lock(self, key):
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.RLock())
+        with key_lock:
+            yield
+
+
+class FileTokenStore(MemoryTokenStore):
+    """
+    Store the tokens in a directory shared by several processes
+
+    The files are only readable by their owner. The processes fetching a
+    token for the same login are serialized with a lock file (on the systems
+    supporting ``fcntl``).
+
+    Usage::
+
+        store = FileTokenStore("/var/cache/cdiscountapi/tokens")
+        api = Connection(login, password, header_message=header_message, token_store=store)
+
+    :param str path: The directory in which the tokens are stored
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.path.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    def _path(self, key, suffix=".json"):
+        return self.path / (hashlib.sha1(key.encode("utf8")).hexdigest() + suffix)
+
+    def get(self, key):
+        try:
+            data = json.loads(self._path(key).read_text())
+            return Token(data["value"], data["expires"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def set(self, key, token):
+        token = Token(*token)
+        content = json.dumps({"key": key, "value": token.value, "expires": token.expires})
+        # mkstemp creates the file with the permissions 0600
+        fd, tmp = tempfile.mkstemp(dir=str(self.path), prefix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(content)
+            os.replace(tmp, str(self._path(key)))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def delete(self, key):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self, key):
+        # The lock file serializes the processes, the thread lock the
+        # connections of this process
+        with super().lock(key):
+            if fcntl is None:
+                yield
+                return
+
+            fd = os.open(str(self._path(key, ".lock")), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+
+# The store used by default: the connections of the process share their tokens
+default_store = MemoryTokenStore()
+
+
+def get_token_store(store):
+    """
+    Return the token store to use in a Connection
+
+    :param store: None (the store shared by the connections of the process),
+                  a TokenStore or the path to a directory
+    """
+    if store is None:
+        return default_store
+    if isinstance(store, TokenStore):
+        return store
+    return FileTokenStore(store)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+    cdiscountapi.transport
+    ----------------------
+
+    The transport used to communicate with the API.
+
+    :copyright: © 2019 Alexandria
+"""
+
+
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from zeep.transports import Transport as ZeepTransport
+
+from cdiscountapi.cache import SchemaCache
+from cdiscountapi.exceptions import CdiscountApiConnectionError
+
+
+# CONSTANTS
+DEFAULT_POOL_SIZE = 10
+
+
+class ConnectionStats(object):
+    """
+    Count the connections opened and the requests sent per host
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def record(self, pool, new_connection):
+        host = "{}://{}:{}".format(pool.scheme, pool.host, pool.port)
+        with self._lock:
+            host_stats = self._hosts.setdefault(host, {"connections": 0, "requests": 0})
+            host_stats["requests"] += 1
+            if new_connection:
+                host_stats["connections"] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                host: dict(
+                    host_stats,
+                    reused=host_stats["requests"] - host_stats["connections"],
+                )
+                for host, host_stats in self._hosts.items()
+            }
+
+
+class CountingPoolMixin(object):
+    stats = None
+
+    def _validate_conn(self, conn):
+        # The socket of a new or dropped connection is opened right after
+        if self.stats is not None:
+            self.stats.record(self, new_connection=getattr(conn, "sock", None) is None)
+        super()._validate_conn(conn)
+
+
+class CountingHTTPConnectionPool(CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class CountingPoolManager(PoolManager):
+    def __init__(self, *args, stats=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+        self.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.stats = self.stats
+        return pool
+
+
+class PoolingAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter counting the connections opened and the requests sent per host
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.stats = ConnectionStats()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = CountingPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            stats=self.stats,
+            **pool_kwargs
+        )
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, keep_alive=True, gzip=True):
+    """
+    Return a requests.Session keeping up to pool_size connections per host
+
+    :param int pool_size: The maximum number of connections kept per host
+    :param bool keep_alive: Whether the connections are reused between requests
+    :param bool gzip: Whether the responses can be compressed
+    """
+    session = requests.Session()
+    adapter = PoolingAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    session.headers["Accept-Encoding"] = "gzip, deflate" if gzip else "identity"
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+class Transport(ZeepTransport):
+    """
+    The transport shared by the token requests and the SOAP requests
+
+    All the requests go through one requests.Session so the connections
+    (and their TLS handshakes) are reused.
+
+    :param cache: The cache of the WSDL and XSD documents
+    :param bool offline: Whether the documents must be loaded from the cache
+                         without any network I/O (default: False)
+    :param int pool_size: The maximum number of connections kept per host
+                          (default: 10)
+    :param bool keep_alive: Whether the connections are reused (default: True)
+    :param bool gzip: Whether the responses can be compressed (default: True)
+    :param int timeout: The timeout to load the WSDL, the XSD documents and the
+                        token (default: 300)
+    :param int operation_timeout: The timeout of the operations (default: None)
+    :param session: A requests.Session used instead of creating a new one
+
+    Usage::
+
+        transport = Transport(pool_size=32, timeout=10, operation_timeout=60)
+        api = Connection(login, password, config=config, transport=transport)
+        api.transport.connection_stats()
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        offline=False,
+        pool_size=DEFAULT_POOL_SIZE,
+        keep_alive=True,
+        gzip=True,
+        session=None,
+        **kwargs
+    ):
+        # zeep.Transport.__del__ needs it when the constructor fails
+        self._close_session = False
+        if offline and not isinstance(cache, SchemaCache):
+            raise CdiscountApiConnectionError(
+                "The offline mode needs a cache (FileCache or SqliteCache)."
+            )
+        close_session = session is None
+        if session is None:
+            session = create_session(pool_size=pool_size, keep_alive=keep_alive, gzip=gzip)
+        super().__init__(cache=cache, session=session, **kwargs)
+        self._close_session = close_session
+        self.offline = offline
+        self.pool_size = pool_size
+
+    def connection_stats(self):
+        """
+        Return the number of connections opened and requests sent per host
+
+        Example::
+
+            >>> api.transport.connection_stats()
+            {'https://wsvc.cdiscount.com:443': {'connections': 1, 'requests': 12, 'reused': 11}}
+
+        .. note:: Only the requests sent through a :py:class:`PoolingAdapter`
+                  (the default adapter of the session) are counted.
+        """
+        stats = {}
+        adapters = {id(a): a for a in self.session.adapters.values()}.values()
+        for adapter in adapters:
+            if isinstance(adapter, PoolingAdapter):
+                stats.update(adapter.stats.as_dict())
+        return stats
+
+    def load(self, url):
+        if not self.offline or urlparse(url).scheme not in ("http", "https"):
+            return super().load(url)
+
+        # Expired entries are still good enough when we can't download the documents
+        content = self.cache.get(url, expired=True)
+        if content is None:
+            raise CdiscountApiConnectionError(
+                "{} is not in the cache and can't be downloaded in offline mode.".format(url)
+            )
+        return bytes(content)
@@ -44,6 +44,7 @@ setup(
     keywords=['api', 'cdiscount', 'python'],
     packages=find_packages(),
     install_requires=install_requirements,
+    extras_require={'async': ['httpx']},
     zip_safe=True,
     license='MIT',
     classifiers=[
@@ -9,7 +9,14 @@ import pytest
 from tempfile import gettempdir
 from shutil import rmtree
 from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import vcr
+import yaml
 from cdiscountapi import Connection
+from cdiscountapi.tokens import MemoryTokenStore
+from cdiscountapi.transport import Transport
 
 
 VCR_CASSETTE_DIR = Path(__file__).parent.joinpath("cassettes")
@@ -94,6 +101,115 @@ def api():
     )
 
 
+# Stand-in for the STS and the API {{{1
+FAULT = (
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+    "<s:Fault><faultcode>{}</faultcode><faultstring>{}</faultstring></s:Fault>"
+    "</s:Body></s:Envelope>"
+)
+
+
+def seller_information_response():
+    cassette = VCR_CASSETTE_DIR / "test_seller" / "test_get_seller_info.yaml"
+    interactions = yaml.safe_load(cassette.read_text())["interactions"]
+    return next(
+        i["response"]["body"]["string"]
+        for i in interactions
+        if i["request"]["method"] == "POST"
+        and "GetSellerInformationResponse" in i["response"]["body"]["string"]
+    ).encode("utf8")
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Issue tokens on GET /sts and answer GetSellerInformation on POST /soap
+    when the token of the request is the last token issued
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, sts_delay=0.2):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.sts_delay = sts_delay
+        self.lock = threading.Lock()
+        self.token = None
+        self.sts_calls = 0
+        self.soap_calls = 0
+        self.response = seller_information_response()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self.server_port)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/xml; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # The STS is slow so that all the threads see the token rejected
+        time.sleep(self.server.sts_delay)
+        with self.server.lock:
+            self.server.sts_calls += 1
+            self.server.token = "{:032x}".format(self.server.sts_calls)
+            token = self.server.token
+        self.send(200, "<string>{}</string>".format(token).encode("utf8"))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.soap_calls += 1
+            token = self.server.token
+
+        if token is None or token.encode("utf8") not in body:
+            fault = FAULT.format("s:RequestTokenValidationError", "Invalid token")
+            self.send(500, fault.encode("utf8"))
+        else:
+            self.send(200, self.server.response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    """
+    A connection whose token and SOAP requests go to a local stand-in server
+    """
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    # The WSDL and the first token are replayed from a cassette
+    cassette = VCR_CASSETTE_DIR / "test_connection" / "test_initialization.yaml"
+    with vcr.use_cassette(str(cassette), record_mode="none", allow_playback_repeats=True):
+        api = Connection(
+            "login",
+            "password",
+            header_message={
+                "Context": {"SiteID": 100, "CatalogID": 1},
+                "Localization": {"Country": "Fr", "Currency": "Eur"},
+                "Security": {"UserName": ""},
+                "Version": "1.0",
+            },
+            token_store=MemoryTokenStore(),
+            transport=Transport(pool_size=32),
+        )
+    api.auth_url = server.url + "/sts"
+    api.client.service._binding_options["address"] = server.url + "/soap"
+
+    yield api, server
+    server.shutdown()
+    server.server_close()
+
+
 # Offers {{{1
 @pytest.fixture
 def valid_offer():
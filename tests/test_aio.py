@@ -0,0 +1,102 @@
+# Python imports
+import asyncio
+from copy import deepcopy
+from pathlib import Path
+
+# Third-party imports
+import pytest
+import vcr
+import zeep
+
+# Project imports
+from cdiscountapi import AsyncConnection
+from cdiscountapi.helpers import auto_refresh_token
+from cdiscountapi.sections.seller import Seller
+
+
+CASSETTES = Path(__file__).parent / "cassettes"
+
+HEADER_MESSAGE = {
+    "Context": {"SiteID": 100, "CatalogID": 1},
+    "Localization": {"Country": "Fr", "Currency": "Eur"},
+    "Security": {"UserName": ""},
+    "Version": "1.0",
+}
+
+
+class FakeAsyncApi(object):
+    """
+    The attributes of an AsyncConnection used by auto_refresh_token
+    """
+
+    is_async = True
+
+    def __init__(self):
+        self.header = {"Security": {"TokenId": "expired"}}
+        self.refreshed = []
+
+    async def ensure_token_async(self):
+        return self.header["Security"]["TokenId"]
+
+    async def refresh_token_async(self, rejected=None):
+        self.refreshed.append(rejected)
+        self.header["Security"]["TokenId"] = "valid"
+        return "valid"
+
+    async def call(self, operation, **kwargs):
+        if self.header["Security"]["TokenId"] != "valid":
+            raise zeep.exceptions.Fault("", code="s:RequestTokenValidationError")
+        return {"operation": operation, "OperationSuccess": True}
+
+
+def test_auto_refresh_token_with_async_connection():
+    """
+    The methods of the sections should return coroutines that refresh the
+    token when it's rejected
+    """
+    api = FakeAsyncApi()
+    seller = Seller.__new__(Seller)
+    seller.api = api
+
+    coroutine = seller.get_seller_info()
+    assert asyncio.iscoroutine(coroutine)
+    assert asyncio.run(coroutine) == {
+        "operation": "GetSellerInformation",
+        "OperationSuccess": True,
+    }
+    assert api.refreshed == ["expired"]
+
+
+def test_auto_refresh_token_with_async_connection_and_other_fault():
+    api = FakeAsyncApi()
+    api.header["Security"]["TokenId"] = "valid"
+
+    @auto_refresh_token
+    def operation(section):
+        raise zeep.exceptions.Fault("Invalid request", code="s:Client")
+
+    section = Seller.__new__(Seller)
+    section.api = api
+    with pytest.raises(zeep.exceptions.Fault):
+        asyncio.run(operation(section))
+    assert api.refreshed == []
+
+
+def test_async_connection():
+    """
+    The sections of an AsyncConnection should return the same responses as
+    those of a Connection
+    """
+    pytest.importorskip("httpx")
+    cassette = CASSETTES / "test_seller" / "test_get_seller_info.yaml"
+
+    async def get_seller_info():
+        async with AsyncConnection(
+            "login", "password", header_message=deepcopy(HEADER_MESSAGE)
+        ) as api:
+            return await api.seller.get_seller_info()
+
+    with vcr.use_cassette(str(cassette), record_mode="none", allow_playback_repeats=True):
+        response = asyncio.run(get_seller_info())
+    assert response["OperationSuccess"] is True
+    assert "SellerLogin" in response
@@ -0,0 +1,109 @@
+# Python imports
+import asyncio
+import threading
+import time
+from functools import partial
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.batch import BatchResult, run_batch, run_batch_async
+
+
+class Counter(object):
+    """
+    Count the calls running at the same time
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, value):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        with self.lock:
+            self.running -= 1
+        if value < 0:
+            raise ValueError(value)
+        return value * 2
+
+
+def test_run_batch_keeps_the_order():
+    results = run_batch([partial(Counter(), i) for i in range(20)], max_workers=4)
+    assert [result.value for result in results] == [i * 2 for i in range(20)]
+    assert all(result.ok for result in results)
+
+
+def test_run_batch_captures_the_errors():
+    results = run_batch([partial(Counter(), i) for i in (1, -1, 2)])
+    assert results[0] == BatchResult(2, None)
+    assert not results[1].ok
+    assert isinstance(results[1].error, ValueError)
+    assert results[2] == BatchResult(4, None)
+
+
+def test_run_batch_limits_the_concurrency():
+    counter = Counter()
+    run_batch([partial(counter, i) for i in range(20)], max_workers=3)
+    assert counter.max_running == 3
+
+
+def test_run_batch_without_calls():
+    assert run_batch([]) == []
+
+
+def test_run_batch_async():
+    running = []
+    max_running = []
+
+    async def double(value):
+        running.append(value)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(value)
+        if value < 0:
+            raise ValueError(value)
+        return value * 2
+
+    results = asyncio.run(
+        run_batch_async([partial(double, i) for i in (1, -1, 2, 3)], max_workers=2)
+    )
+    assert [result.value for result in results] == [2, None, 4, 6]
+    assert isinstance(results[1].error, ValueError)
+    assert max(max_running) == 2
+
+
+def test_connection_map(stand_in):
+    """
+    The calls should share the session and refresh the token once
+    """
+    api, server = stand_in
+    results = api.map(lambda _: api.seller.get_seller_info(), range(16), max_workers=8)
+
+    assert len(results) == 16
+    assert all(result.ok and result.value["OperationSuccess"] for result in results)
+    assert server.sts_calls == 1
+    stats = api.transport.connection_stats()[server.url]
+    assert stats["connections"] <= 8
+
+
+def test_connection_max_workers(stand_in):
+    api, _ = stand_in
+    assert api.max_workers == 32
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_connection_batch(stand_in, max_workers):
+    api, server = stand_in
+    results = api.batch(
+        [api.seller.get_seller_info, partial(api.orders.get_order_list, Foo=1)],
+        max_workers=max_workers,
+    )
+    assert results[0].ok
+    # The arguments of the second call are invalid
+    assert isinstance(results[1].error, TypeError)
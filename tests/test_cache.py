@@ -0,0 +1,126 @@
+# Python imports
+import time
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi import Connection
+from cdiscountapi.cache import FileCache, SqliteCache, get_cache
+from cdiscountapi.exceptions import CdiscountApiConnectionError
+from cdiscountapi.transport import Transport
+
+
+WSDL_URL = "https://wsvc.cdiscount.com/MarketplaceAPIService.svc?wsdl"
+WSDL_CONTENT = b"<wsdl:definitions/>"
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "file":
+        return FileCache(tmp_path / "cache")
+    return SqliteCache(tmp_path / "cache.db")
+
+
+def expire(cache, url):
+    """
+    Make the entry of the url older than the timeout of the cache
+    """
+    cache._touch(url, time.time() - cache.timeout - 1)
+
+
+def test_get_without_entry(cache):
+    assert cache.get(WSDL_URL) is None
+
+
+def test_add_and_get(cache):
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    assert cache.get(WSDL_URL) == WSDL_CONTENT
+
+
+def test_get_with_expired_entry(cache):
+    """
+    An expired entry should only be returned when expired=True
+    """
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    expire(cache, WSDL_URL)
+    assert cache.get(WSDL_URL) is None
+    assert cache.get(WSDL_URL, expired=True) == WSDL_CONTENT
+
+
+def test_add_with_same_content_revalidates_the_entry(cache):
+    """
+    When the content downloaded again has the same hash, the entry should be
+    valid again without being rewritten
+    """
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    expire(cache, WSDL_URL)
+    digest = cache._read(WSDL_URL).digest
+
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    assert cache.get(WSDL_URL) == WSDL_CONTENT
+    assert cache._read(WSDL_URL).digest == digest
+
+
+def test_add_with_new_content(cache):
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    cache.add(WSDL_URL, b"<wsdl:definitions name='new'/>")
+    assert cache.get(WSDL_URL) == b"<wsdl:definitions name='new'/>"
+
+
+def test_get_with_corrupted_entry(tmp_path):
+    """
+    An entry whose content doesn't match its hash should be ignored
+    """
+    cache = FileCache(tmp_path)
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    content_path, _ = cache._paths(WSDL_URL)
+    content_path.write_bytes(b"<wsdl:defin")
+    assert cache.get(WSDL_URL) is None
+
+
+def test_get_cache(tmp_path):
+    assert get_cache(None) is None
+    assert isinstance(get_cache(tmp_path / "cache.db"), SqliteCache)
+    assert isinstance(get_cache(str(tmp_path / "cache")), FileCache)
+
+    cache = FileCache(tmp_path)
+    assert get_cache(cache) is cache
+
+
+def test_transport_offline_with_expired_entry(cache):
+    """
+    In offline mode, the documents should be loaded from the cache even when
+    they are expired
+    """
+    cache.add(WSDL_URL, WSDL_CONTENT)
+    expire(cache, WSDL_URL)
+    transport = Transport(cache=cache, offline=True)
+    assert transport.load(WSDL_URL) == WSDL_CONTENT
+
+
+def test_transport_offline_without_entry(cache):
+    transport = Transport(cache=cache, offline=True)
+    pytest.raises(CdiscountApiConnectionError, transport.load, WSDL_URL)
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_transport_offline_without_cache():
+    pytest.raises(CdiscountApiConnectionError, Transport, offline=True)
+
+
+def test_connection_offline_with_empty_cache(tmp_path):
+    """
+    Connection should raise a CdiscountApiConnectionError without sending any
+    request when the WSDL is not in the cache in offline mode
+    """
+    pytest.raises(
+        CdiscountApiConnectionError,
+        Connection,
+        "login",
+        "password",
+        header_message={"Context": {"SiteID": 100, "CatalogID": 1}},
+        cache=tmp_path,
+        offline=True,
+        shared_schema=False,
+    )
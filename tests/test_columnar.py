@@ -0,0 +1,235 @@
+# Python imports
+import io
+import zipfile
+from pathlib import Path
+from tempfile import gettempdir
+
+# Third-party imports
+import pytest
+
+# Project imports
+from . import SAMPLES_DIR, assert_xml_files_equal
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages import OfferPackage
+from cdiscountapi.packages.columnar import (
+    check_columns,
+    format_column,
+    is_table,
+    write_offer_table_xml,
+)
+from cdiscountapi.sections.offers import Offers
+
+
+def make_table(offers):
+    """
+    Return the table of the offers (with the columns of the shipping
+    information by delivery mode)
+    """
+    table = {}
+    for i, item in enumerate(offers):
+        offer = dict(item["Offer"])
+        shipping_information_list = offer.pop("ShippingInformationList", {})
+        for shipping_information in shipping_information_list.get("ShippingInformation", []):
+            for attribute in ("ShippingCharges", "AdditionalShippingCharges"):
+                offer["{}.{}".format(attribute, shipping_information["DeliveryMode"])] = (
+                    shipping_information[attribute]
+                )
+        for key, value in offer.items():
+            table.setdefault(key, [None] * len(offers))[i] = value
+    return table
+
+
+def test_write_offer_table_xml(valid_offers_for_package):
+    """
+    The offers of a table should be written like the offers of OfferPackage
+    """
+    data = {"Name": "A good package", "OfferPublicationList": [1, 16]}
+    output = io.BytesIO()
+    assert write_offer_table_xml(output, make_table(valid_offers_for_package), data) == 2
+
+    with open(SAMPLES_DIR.joinpath("offers", "Offers_with_offer_publication_list.xml")) as f:
+        expected = f.read()
+    assert_xml_files_equal(output.getvalue(), expected, "Offer")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_write_offer_table_xml_with_missing_values(chunk_size):
+    table = {
+        "ProductEan": ["1", "2", "3"],
+        "SellerProductId": ["SKU1", "SKU2", "SKU3"],
+        "Price": [10, 11, 12.5],
+        "Stock": [1, 2, 3],
+        "Vat": [20, None, float("nan")],
+        "ShippingCharges.Standard": [2, None, 3],
+        "AdditionalShippingCharges.Standard": [1, None, 1],
+    }
+    output = io.BytesIO()
+    write_offer_table_xml(output, table, chunk_size=chunk_size)
+
+    expected = OfferPackage({"OfferCollection": [
+        {"Offer": {
+            "ProductEan": "1", "SellerProductId": "SKU1", "Price": 10, "Stock": 1,
+            "Vat": 20,
+            "ShippingInformationList": {"ShippingInformation": [
+                {"ShippingCharges": 2, "AdditionalShippingCharges": 1,
+                 "DeliveryMode": "Standard"},
+            ]},
+        }},
+        {"Offer": {"ProductEan": "2", "SellerProductId": "SKU2", "Price": 11,
+                   "Stock": 2}},
+        {"Offer": {
+            "ProductEan": "3", "SellerProductId": "SKU3", "Price": 12.5, "Stock": 3,
+            "ShippingInformationList": {"ShippingInformation": [
+                {"ShippingCharges": 3, "AdditionalShippingCharges": 1,
+                 "DeliveryMode": "Standard"},
+            ]},
+        }},
+    ]}).generate()
+    assert_xml_files_equal(output.getvalue(), expected, "Offer")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+@pytest.mark.parametrize(
+    "column, values",
+    [
+        ("ProductEan", ["1", "2", ""]),
+        ("SellerProductId", ["SKU1", "SKU2", None]),
+        ("Price", [10, 11, None]),
+        ("Stock", [1, 2, float("nan")]),
+    ],
+)
+def test_write_offer_table_xml_with_missing_required_values(chunk_size, column, values):
+    table = {
+        "ProductEan": ["1", "2", "3"],
+        "SellerProductId": ["SKU1", "SKU2", "SKU3"],
+        "Price": [10, 11, 12.5],
+        "Stock": [1, 2, 3],
+    }
+    table[column] = values
+    with pytest.raises(ValidationError, match="Row 2, {} is missing".format(column)):
+        write_offer_table_xml(io.BytesIO(), table, chunk_size=chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1000])
+@pytest.mark.parametrize(
+    "column, values, message",
+    [
+        ("Price", [10, 11, "abc"], "Row 2, Price should be a number, not 'abc'"),
+        ("Stock", [1, 2, 3.0], "Row 2, Stock should be an integer, not 3.0"),
+        ("Stock", [1, 2, True], "Row 2, Stock should be an integer"),
+        ("ProductEan", ["1", "2", 3.5], "Row 2, ProductEan should be"),
+        ("ShippingCharges.Standard", [2, 2, "free"], "Row 2, ShippingCharges"),
+    ],
+)
+def test_write_offer_table_xml_with_invalid_values(chunk_size, column, values, message):
+    table = {
+        "ProductEan": ["1", "2", "3"],
+        "SellerProductId": ["SKU1", "SKU2", "SKU3"],
+        "Price": [10, 11, 12.5],
+        "Stock": [1, 2, 3],
+        "ShippingCharges.Standard": [2, 2, 2],
+        "AdditionalShippingCharges.Standard": [1, 1, 1],
+    }
+    table[column] = values
+    with pytest.raises(ValidationError, match=message):
+        write_offer_table_xml(io.BytesIO(), table, chunk_size=chunk_size)
+
+
+def test_write_offer_table_xml_with_integer_identifiers():
+    table = {"ProductEan": [3600000000001], "SellerProductId": [1], "Price": ["9.5"]}
+    output = io.BytesIO()
+    write_offer_table_xml(output, table)
+    assert b'ProductEan="3600000000001" SellerProductId="1" Price="9.5"' in (
+        output.getvalue()
+    )
+
+
+def test_write_offer_table_xml_escapes_the_values():
+    table = {"ProductEan": ["1"], "SellerProductId": ['<SKU "1" & 2>']}
+    output = io.BytesIO()
+    write_offer_table_xml(output, table, {"Name": "A & B"})
+    assert b'Name="A &amp; B"' in output.getvalue()
+    assert b'SellerProductId="&lt;SKU &quot;1&quot; &amp; 2&gt;"' in output.getvalue()
+
+
+def test_check_columns():
+    assert check_columns(
+        ["ProductEan", "SellerProductId", "Price",
+         "ShippingCharges.Tracked", "AdditionalShippingCharges.Tracked"]
+    ) == (["ProductEan", "SellerProductId", "Price"], ["Tracked"])
+
+    with pytest.raises(ValidationError):
+        check_columns(["ProductEan"])
+    with pytest.raises(ValidationError):
+        check_columns(["ProductEan", "SellerProductId", "InvalidColumn"])
+    with pytest.raises(ValidationError):
+        check_columns(["ProductEan", "SellerProductId", "ShippingCharges.Tracked"])
+
+
+def test_columns_with_different_lengths():
+    table = {"ProductEan": ["1", "2"], "SellerProductId": ["SKU1"]}
+    with pytest.raises(ValidationError):
+        write_offer_table_xml(io.BytesIO(), table)
+
+
+def test_is_table(valid_offers_for_package):
+    assert is_table({"ProductEan": []})
+    assert not is_table(valid_offers_for_package)
+    assert not is_table(iter(valid_offers_for_package))
+
+
+def test_format_numpy_columns():
+    numpy = pytest.importorskip("numpy")
+    assert format_column(numpy.array([1, 20])) == ["1", "20"]
+    assert format_column(numpy.array([19.36, 10.0, numpy.nan])) == ["19.36", "10.0", None]
+    assert format_column(numpy.array([True, False])) == ["True", "False"]
+    assert format_column(numpy.array(["a&b", None], dtype=object)) == ["a&amp;b", None]
+
+
+def test_write_offer_table_xml_with_dataframe(valid_offers_for_package):
+    pandas = pytest.importorskip("pandas")
+    table = pandas.DataFrame(make_table(valid_offers_for_package))
+    output = io.BytesIO()
+    write_offer_table_xml(output, table, {"Name": "A good package"})
+
+    with open(SAMPLES_DIR.joinpath("offers", "Offers.xml")) as f:
+        expected = f.read()
+    assert_xml_files_equal(output.getvalue(), expected, "Offer")
+
+
+def test_write_offer_table_xml_with_float_stocks():
+    pandas = pytest.importorskip("pandas")
+    table = pandas.DataFrame({
+        "ProductEan": ["1", "2"],
+        "SellerProductId": ["SKU1", "SKU2"],
+        "Price": [10, 11],
+        "Stock": [3, 4],
+        "PreparationTime": [1, None],
+    })
+    # The integers of a column with missing values are floats in pandas
+    assert table["PreparationTime"].dtype.kind == "f"
+    output = io.BytesIO()
+    write_offer_table_xml(output, table)
+    assert b'Stock="3" PreparationTime="1"' in output.getvalue()
+    assert b"PreparationTime" not in output.getvalue().split(b"SKU2")[1]
+
+    table["Stock"] = [3.5, 4.0]
+    with pytest.raises(ValidationError, match="Row 0, Stock should be an integer"):
+        write_offer_table_xml(io.BytesIO(), table)
+    table["Stock"] = [3, 4]
+    table["Price"] = ["abc", "11"]
+    with pytest.raises(ValidationError, match="Row 0, Price should be a number"):
+        write_offer_table_xml(io.BytesIO(), table)
+
+
+def test_generate_offer_package_with_table(valid_offer_package):
+    package_path = Path(gettempdir()) / "uploading_package"
+    Offers.generate_offer_package(
+        "A good package", package_path, make_table(valid_offer_package)
+    )
+
+    with zipfile.ZipFile(package_path.with_suffix(".zip")) as zf:
+        created = zf.read("Content/Offers.xml")
+    with open(SAMPLES_DIR.joinpath("offers", "Offers.xml")) as f:
+        expected = f.read()
+    assert_xml_files_equal(created, expected, "Offer")
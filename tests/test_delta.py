@@ -0,0 +1,168 @@
+# Python imports
+import zipfile
+
+# Third-party imports
+import pytest
+from lxml import etree
+
+# Project imports
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.delta import OfferStateStore, offer_digest, split_offer
+
+
+def make_offer(number, **kwargs):
+    offer = {
+        "ProductEan": "{:013d}".format(3600000000000 + number),
+        "SellerProductId": "SKU{}".format(number),
+        "Price": 10 + number,
+        "Stock": 5,
+        "Vat": 20,
+        "Comment": "Offer {}".format(number),
+    }
+    offer.update(kwargs)
+    return {"Offer": offer}
+
+
+def stock_and_price(offer):
+    return {
+        name: offer["Offer"][name]
+        for name in ("ProductEan", "SellerProductId", "Price", "Stock")
+    }
+
+
+def skus(offers):
+    return sorted(offer["SellerProductId"] for offer in offers)
+
+
+def read_offers(package):
+    with zipfile.ZipFile(str(package.path)) as zf:
+        root = etree.fromstring(zf.read("Content/Offers.xml"))
+    return root.get("PackageType"), {
+        offer.get("SellerProductId"): dict(offer.attrib)
+        for offer in root.iter("{*}Offer")
+    }
+
+
+def test_offer_digest():
+    offer = make_offer(1)["Offer"]
+    assert offer_digest(offer) == offer_digest(dict(reversed(list(offer.items()))))
+    assert offer_digest(offer) != offer_digest(dict(offer, Stock=4))
+    assert len(offer_digest(offer)) == 8
+
+
+def test_split_offer():
+    offer = make_offer(1)
+    assert split_offer(offer["Offer"]) == (
+        stock_and_price(offer),
+        {"Vat": 20, "Comment": "Offer 1"},
+    )
+
+
+def test_diff(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    offers = [make_offer(i) for i in range(5)]
+
+    delta = store.diff(offers)
+    assert skus(delta.new) == ["SKU0", "SKU1", "SKU2", "SKU3", "SKU4"]
+    assert (delta.updated, delta.changed, delta.removed) == ([], [], [])
+    assert delta.unchanged == 0
+    store.mark_submitted(delta)
+    assert len(store) == 5
+    assert len(store.diff(offers)) == 0
+
+    snapshot = offers[:2] + [
+        make_offer(2, Comment="New comment", Stock=1),
+        make_offer(3, Price=99),
+        make_offer(5),
+    ]
+    delta = store.diff(iter(snapshot))
+    assert delta.new == [snapshot[4]["Offer"]]
+    # The other attributes changed: the whole offer is submitted again
+    assert delta.updated == [snapshot[2]["Offer"]]
+    # Only the price changed: only the attributes of StockAndPrice are kept
+    assert delta.changed == [stock_and_price(snapshot[3])]
+    assert delta.removed == [
+        {"ProductEan": "3600000000004", "SellerProductId": "SKU4", "Stock": 0}
+    ]
+    assert delta.unchanged == 2
+    assert len(delta) == 4
+
+    # The offers are not submitted: the delta stays the same
+    assert len(store.diff(snapshot)) == 4
+    store.mark_submitted(delta)
+    assert len(store.diff(snapshot)) == 0
+    assert len(store) == 5
+
+
+def test_mark_submitted_by_package_type(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    store.mark_submitted(store.diff([make_offer(i) for i in range(3)]))
+    snapshot = [make_offer(0, Vat=5.5), make_offer(1, Stock=0), make_offer(3)]
+
+    # Only the StockAndPrice package was submitted
+    store.mark_submitted(store.diff(snapshot), full=False)
+    delta = store.diff(snapshot)
+    assert (skus(delta.new), skus(delta.updated)) == (["SKU3"], ["SKU0"])
+    assert (delta.changed, delta.removed) == ([], [])
+
+    store.mark_submitted(delta, stock_and_price=False)
+    assert len(store.diff(snapshot)) == 0
+
+
+def test_diff_of_partial_snapshot(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    store.mark_submitted(store.diff([make_offer(i) for i in range(3)]))
+
+    delta = store.diff([make_offer(1, Stock=0)], complete=False)
+    assert skus(delta.changed) == ["SKU1"]
+    assert delta.removed == []
+
+
+def test_diff_keeps_the_last_duplicate(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    store.mark_submitted(store.diff([make_offer(1)]))
+
+    delta = store.diff([make_offer(1, Stock=0), make_offer(1)])
+    assert len(delta) == 0 and delta.unchanged == 1
+
+    delta = store.diff([make_offer(1), make_offer(1, Stock=0)])
+    assert delta.changed == [stock_and_price(make_offer(1, Stock=0))]
+
+
+def test_diff_with_invalid_offer(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    with pytest.raises(ValidationError):
+        store.diff([{"Offer": {"ProductEan": "3600000000001"}}])
+
+
+def test_write_packages(tmp_path):
+    store = OfferStateStore(tmp_path / "offers.db")
+    store.mark_submitted(store.diff([make_offer(i) for i in range(3)]))
+    delta = store.diff(
+        [make_offer(0, Comment="New"), make_offer(1, Stock=2), make_offer(3)]
+    )
+
+    manifest = delta.write_packages(tmp_path / "stock", {"Name": "Stock"})
+    assert [package.records for package in manifest] == [2]
+    package_type, offers = read_offers(manifest[0])
+    assert package_type == "StockAndPrice"
+    assert offers == {
+        "SKU1": {"ProductEan": "3600000000001", "SellerProductId": "SKU1",
+                 "Price": "11", "Stock": "2"},
+        "SKU2": {"ProductEan": "3600000000002", "SellerProductId": "SKU2",
+                 "Stock": "0"},
+    }
+
+    manifest = delta.write_full_packages(tmp_path / "offers", {"Name": "Offers"})
+    assert [package.records for package in manifest] == [2]
+    package_type, offers = read_offers(manifest[0])
+    assert package_type == "Full"
+    assert offers["SKU0"]["Comment"] == "New"
+    assert offers["SKU3"]["Vat"] == "20"
+
+    store.mark_submitted(delta)
+    delta = store.diff(
+        [make_offer(0, Comment="New"), make_offer(1, Stock=2), make_offer(3)]
+    )
+    assert delta.write_packages(tmp_path / "nothing") == []
+    assert delta.write_full_packages(tmp_path / "nothing") == []
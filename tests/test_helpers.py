@@ -1,6 +1,9 @@
 # Python imports
+import io
 import os
 import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
 # Third-party imports
@@ -8,7 +11,12 @@ import pytest
 
 # Project imports
 from cdiscountapi import Connection
-from cdiscountapi.helpers import XmlGenerator, check_element
+from cdiscountapi.helpers import (
+    XmlGenerator,
+    build_package,
+    check_element,
+    make_package,
+)
 from cdiscountapi.exceptions import ValidationError
 from . import (
     SAMPLES_DIR,
@@ -42,7 +50,6 @@ def test_check_element_with_invalid_element(api):
 
 
 # XmlGenerator
-@pytest.mark.vcr()
 def test_XmlGenerator_constructor(valid_offer_for_package):
     """
     XmlGenerator should raise a ValueError if `data` isn't a dictionary with the key
@@ -55,7 +62,6 @@ def test_XmlGenerator_constructor(valid_offer_for_package):
     )
 
 
-@pytest.mark.vcr()
 def test_add_offers(valid_offer_for_package):
     """
     XmlGenerator.add should append the unique valid offers in the
@@ -79,11 +85,17 @@ def test_add_offers(valid_offer_for_package):
     }
     xml_generator.add([{"Offer": valid_offer_for_package1}])
 
+    # It has the same SellerProductId and ProductEan: it replaces the first one
+    assert len(xml_generator.data) == 1
+    assert "DiscountList" in xml_generator.data[0]
+
+    valid_offer_for_package1["SellerProductId"] = "MY_SKU2"
+    xml_generator.add([{"Offer": valid_offer_for_package1}])
+
     # There should be 2 valid offers
     assert len(xml_generator.data) == 2
 
 
-@pytest.mark.vcr()
 def test_add_offers_with_invalid_offer(valid_offer_for_package):
     """
     XmlGenerator.add should raise a TypeError when the offer is invalid
@@ -97,7 +109,6 @@ def test_add_offers_with_invalid_offer(valid_offer_for_package):
     )
 
 
-@pytest.mark.vcr()
 def test_generate_offers(valid_offer_for_package):
     """
     XmlGenerator.generate should return the content of Offers.xml
@@ -119,7 +130,6 @@ def test_generate_offers(valid_offer_for_package):
     assert_xml_files_equal(content, expected_content, "Offer")
 
 
-@pytest.mark.vcr()
 def test_generate_offers_with_discount(valid_offer_for_package):
     """
     XmlGenerator.generate should return the content of Offers.xml
@@ -146,7 +156,6 @@ def test_generate_offers_with_discount(valid_offer_for_package):
     assert_xml_files_equal(content, expected_content, "Offer")
 
 
-@pytest.mark.vcr()
 def test_generate_offers_with_offer_publication_list(valid_offer_for_package):
     """
     XmlGenerator.generate should return the content of Offers.xml
@@ -171,7 +180,6 @@ def test_generate_offers_with_offer_publication_list(valid_offer_for_package):
 
 
 # ProductPackage
-@pytest.mark.vcr()
 def test_add_products(valid_product_for_package):
     xml_generator = XmlGenerator({"Products": [{"Product": valid_product_for_package}]})
     assert len(xml_generator.data) == 1
@@ -181,16 +189,22 @@ def test_add_products(valid_product_for_package):
     # The should be only 1 valid offer (we added 2 times the same offer)
     assert len(xml_generator.data) == 1
 
-    # We create a new valid offer with a different DiscountValue
+    # We create a new valid product with a different SellerProductColorName
     valid_product1 = deepcopy(valid_product_for_package)
     valid_product1["SellerProductColorName"] = "Bleu Canard"
     xml_generator.add([{"Product": valid_product1}])
 
-    # There should be 2 valid offers
+    # It has the same SellerProductId: it replaces the first one
+    assert len(xml_generator.data) == 1
+    assert xml_generator.data[0]["SellerProductColorName"] == "Bleu Canard"
+
+    valid_product1["SellerProductId"] = "120905784"
+    xml_generator.add([{"Product": valid_product1}])
+
+    # There should be 2 valid products
     assert len(xml_generator.data) == 2
 
 
-@pytest.mark.vcr()
 def test_add_products_with_invalid_product(valid_product_for_package):
     xml_generator = XmlGenerator({"Products": [{"Product": valid_product_for_package}]})
     invalid_product = {"invalid_product": True}
@@ -200,7 +214,6 @@ def test_add_products_with_invalid_product(valid_product_for_package):
     )
 
 
-@pytest.mark.vcr()
 def test_generate_products(valid_product_for_package):
     """
     XmlGenerator.generate should return the content of Products.xml
@@ -223,6 +236,76 @@ def test_generate_products(valid_product_for_package):
     assert_xml_files_equal(content, expected_content, "Product")
 
 
+# build_package
+def read_offers_xml(package):
+    with zipfile.ZipFile(package) as zf:
+        assert set(zf.namelist()) == {
+            "[Content_Types].xml", "_rels/.rels", "Content/Offers.xml"
+        }
+        return zf.read("Content/Offers.xml")
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_build_package_in_memory(valid_offer_for_package, streaming):
+    """
+    build_package should return the content of the package without writing
+    any file
+    """
+    content = build_package(
+        "offer",
+        {"OfferCollection": [{"Offer": valid_offer_for_package}], "Name": "A good package"},
+        streaming=streaming,
+    )
+    assert isinstance(content, bytes)
+    assert b"MY_SKU1" in read_offers_xml(io.BytesIO(content))
+
+
+def test_build_package_in_file(tmp_path, valid_offer_for_package):
+    data = {"OfferCollection": [{"Offer": valid_offer_for_package}]}
+    path = build_package("offer", data, str(tmp_path / "offers.zip"))
+    assert path == tmp_path / "offers.zip"
+    # No temporary file is left
+    assert os.listdir(str(tmp_path)) == ["offers.zip"]
+    assert b"MY_SKU1" in read_offers_xml(path)
+
+    output = io.BytesIO()
+    assert build_package("offer", data, output) is output
+    assert output.getvalue()
+
+
+def test_build_package_in_threads(tmp_path, valid_offer_for_package):
+    """
+    The packages built at the same time should have their own offers and the
+    current directory shouldn't change
+    """
+    cwd = os.getcwd()
+
+    def build(i):
+        offer = dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))
+        path = tmp_path / "offers{}.zip".format(i)
+        return build_package("offer", {"OfferCollection": [{"Offer": offer}]}, path)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        paths = list(executor.map(build, range(32)))
+
+    for i, path in enumerate(paths):
+        content = read_offers_xml(path)
+        assert 'SellerProductId="SKU{}"'.format(i).encode() in content
+        assert content.count(b"SellerProductId=") == 1
+    assert os.getcwd() == cwd
+
+
+def test_make_package_is_deprecated(tmp_path):
+    path = tmp_path / "offers"
+    for name in ("Content/Offers.xml", "_rels/.rels", "[Content_Types].xml"):
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text("<a />")
+    with pytest.warns(DeprecationWarning):
+        make_package("offer", path)
+    with zipfile.ZipFile(str(tmp_path / "offers.zip")) as zf:
+        assert "Content/Offers.xml" in zf.namelist()
+
+
 # auto_refresh_token
 @pytest.mark.vcr()
 def test_auto_refresh_token():
@@ -0,0 +1,41 @@
+# Python imports
+import subprocess
+import sys
+
+# Third-party imports
+import pytest
+
+
+def imported_modules(statement):
+    """
+    Return the heavy modules imported by the statement in a new interpreter
+    """
+    script = (
+        "import sys\n{}\n"
+        "print(' '.join(m for m in ('zeep', 'requests', 'lxml', 'yaml', 'jinja2') "
+        "if m in sys.modules))".format(statement)
+    )
+    return subprocess.check_output([sys.executable, "-c", script]).decode().split()
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import cdiscountapi",
+        "from cdiscountapi.helpers import XmlGenerator",
+        "from cdiscountapi.packages.validator import OfferValidator",
+    ],
+)
+def test_import_is_lazy(statement):
+    assert imported_modules(statement) == []
+
+
+def test_connection_is_imported_on_demand():
+    assert "zeep" in imported_modules("from cdiscountapi import Connection")
+
+
+def test_unknown_attribute():
+    import cdiscountapi
+
+    with pytest.raises(AttributeError):
+        cdiscountapi.Unknown
@@ -0,0 +1,185 @@
+# Python imports
+import io
+import json
+import zipfile
+from decimal import Decimal
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.loaders import (
+    read_offers_csv,
+    read_offers_jsonl,
+    read_products_csv,
+    read_products_jsonl,
+)
+from cdiscountapi.packages.writer import PackageWriter
+
+
+OFFERS_CSV = """\
+ean;sku;ProductCondition;Price;Stock;ShippingCharges.Standard;AdditionalShippingCharges.Standard;DiscountList.1.DiscountValue;DiscountList.1.Type;DiscountList.1.StartDate;DiscountList.1.EndDate;internal
+3600000000001;SKU1;6;10.90;3;2;1;1.5;1;2020-01-01T00:00:00;2020-01-31T00:00:00;x
+3600000000002;SKU2;6;8;0;;;;;;;y
+3600000000003;SKU3;6;cheap;1;;;;;;;z
+"""
+
+
+def read_offers(text, **kwargs):
+    return read_offers_csv(
+        io.StringIO(text),
+        mapping={"ean": "ProductEan", "sku": "SellerProductId", "internal": None},
+        delimiter=";",
+        **kwargs
+    )
+
+
+def test_read_offers_csv():
+    errors = []
+    offers = list(read_offers(OFFERS_CSV, on_error=errors.append))
+
+    assert offers == [
+        {
+            "Offer": {
+                "ProductEan": "3600000000001",
+                "SellerProductId": "SKU1",
+                "ProductCondition": 6,
+                "Price": Decimal("10.90"),
+                "Stock": 3,
+                "ShippingInformationList": {
+                    "ShippingInformation": [
+                        {
+                            "DeliveryMode": "Standard",
+                            "ShippingCharges": Decimal("2"),
+                            "AdditionalShippingCharges": Decimal("1"),
+                        }
+                    ]
+                },
+                "DiscountList": {
+                    "DiscountComponent": [
+                        {
+                            "DiscountValue": Decimal("1.5"),
+                            "Type": 1,
+                            "StartDate": "2020-01-01T00:00:00",
+                            "EndDate": "2020-01-31T00:00:00",
+                        }
+                    ]
+                },
+            }
+        },
+        {
+            "Offer": {
+                "ProductEan": "3600000000002",
+                "SellerProductId": "SKU2",
+                "ProductCondition": 6,
+                "Price": Decimal("8"),
+                "Stock": 0,
+            }
+        },
+    ]
+    assert [(error.line, error.record["sku"]) for error in errors] == [(4, "SKU3")]
+    assert str(errors[0]) == "Line 4: Price: 'cheap' is not a number"
+
+
+def test_read_offers_csv_raises_without_error_sink():
+    offers = read_offers(OFFERS_CSV)
+    assert next(offers)["Offer"]["SellerProductId"] == "SKU1"
+    assert next(offers)["Offer"]["SellerProductId"] == "SKU2"
+    with pytest.raises(ValidationError, match="Line 4"):
+        next(offers)
+
+
+def test_read_offers_csv_with_invalid_columns():
+    with pytest.raises(ValidationError, match="Colour"):
+        list(read_offers_csv(io.StringIO("ProductEan,SellerProductId,Colour\n")))
+
+    errors = []
+    text = "ProductEan,SellerProductId,Stock\n1,SKU1,2,3\n,SKU2,1\n"
+    assert list(read_offers_csv(io.StringIO(text), on_error=errors.append)) == []
+    assert [str(error) for error in errors] == [
+        "Line 2: 4 values instead of 3",
+        "Line 3: ProductEan: missing required attribute",
+    ]
+
+
+def test_read_offers_jsonl(valid_offers_for_package):
+    lines = [
+        json.dumps(valid_offers_for_package[0]),
+        "",
+        json.dumps({"ean": "3600000000002", "SellerProductId": "SKU2", "Price": 9.5,
+                    "ShippingCharges.Standard": "2",
+                    "AdditionalShippingCharges.Standard": 1}),
+        "{not json",
+        json.dumps({"ProductEan": "3600000000003", "SellerProductId": "SKU3",
+                    "Stock": "many"}),
+    ]
+    errors = []
+    offers = list(
+        read_offers_jsonl(
+            io.StringIO("\n".join(lines)),
+            mapping={"ean": "ProductEan"},
+            on_error=errors.append,
+        )
+    )
+    assert offers[0]["Offer"]["SellerProductId"] == "MY_SKU1"
+    assert offers[1] == {
+        "Offer": {
+            "ProductEan": "3600000000002",
+            "SellerProductId": "SKU2",
+            "Price": Decimal("9.5"),
+            "ShippingInformationList": {
+                "ShippingInformation": [
+                    {
+                        "DeliveryMode": "Standard",
+                        "ShippingCharges": Decimal("2"),
+                        "AdditionalShippingCharges": 1,
+                    }
+                ]
+            },
+        }
+    }
+    assert [error.line for error in errors] == [4, 5]
+    assert "Stock: 'many' is not an integer" in str(errors[1])
+
+
+def test_read_products(tmp_path, valid_product_for_package):
+    path = tmp_path / "products.csv"
+    product = valid_product_for_package
+    path.write_text(
+        "SellerProductId,ShortLabel,CategoryCode,ProductKind,Model,LongLabel,"
+        "Description,BrandName,EanList.1.Ean,EanList.2.Ean,Pictures.1.Uri,"
+        "ModelProperties.Genre,Width\n"
+        + ",".join(
+            [product[name] for name in ("SellerProductId", "ShortLabel",
+                                        "CategoryCode", "ProductKind", "Model",
+                                        "LongLabel")]
+            + ['"{}"'.format(product["Description"]), product["BrandName"],
+               "3606918243767", "", "http://example.com/1.jpg", "Homme", "12.5"]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    (record,) = read_products_csv(path)
+    assert record["Product"]["EanList"] == {"ProductEan": [{"Ean": "3606918243767"}]}
+    assert record["Product"]["Pictures"] == {
+        "ProductImage": [{"Uri": "http://example.com/1.jpg"}]
+    }
+    assert record["Product"]["ModelProperties"] == [{"Genre": "Homme"}]
+    assert record["Product"]["Width"] == Decimal("12.5")
+
+    path = tmp_path / "products.jsonl"
+    path.write_text(json.dumps({"Product": product}) + "\n", encoding="utf-8")
+    assert list(read_products_jsonl(path)) == [{"Product": product}]
+
+
+def test_write_package_from_csv(tmp_path):
+    errors = []
+    with PackageWriter(tmp_path / "offers") as writer:
+        writer.extend(read_offers(OFFERS_CSV, on_error=errors.append))
+    (package,) = writer.packages
+    assert package.records == 2 and len(errors) == 1
+    with zipfile.ZipFile(str(package.path)) as zf:
+        content = zf.read("Content/Offers.xml")
+    assert b'Price="10.90"' in content
+    assert b'DeliveryMode="Standard"' in content
@@ -5,6 +5,8 @@
 # Python imports
 from shutil import make_archive
 from tempfile import gettempdir
+import threading
+import time
 import zipfile
 from pathlib import Path
 
@@ -19,6 +21,7 @@ from . import (
     discount_component,
     offer_publication_list,
 )
+from cdiscountapi.exceptions import CdiscountApiException
 from cdiscountapi.sections.offers import Offers
 
 
@@ -45,7 +48,93 @@ def test_get_offer_list_paginated(api):
     assert "OfferList" in response.keys()
 
 
-@pytest.mark.vcr()
+class FakePages(object):
+    """
+    Answer get_offer_list_paginated with pages of 3 offers and count the
+    pages requested at the same time
+    """
+
+    def __init__(self, number_of_pages, delay=0.01, failed_page=None):
+        self.number_of_pages = number_of_pages
+        self.delay = delay
+        self.failed_page = failed_page
+        self.lock = threading.Lock()
+        self.requested = []
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, PageNumber, **filters):
+        with self.lock:
+            self.requested.append(PageNumber)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        # The last pages answer first
+        time.sleep(self.delay * (self.number_of_pages - PageNumber + 1))
+        with self.lock:
+            self.running -= 1
+        if PageNumber == self.failed_page:
+            return {"OperationSuccess": False, "ErrorMessage": "Timeout"}
+        offers = [
+            {"SellerProductId": "SKU{}-{}".format(PageNumber, i), "Filters": filters}
+            for i in range(3)
+        ]
+        return {
+            "OperationSuccess": True,
+            "CurrentPageNumber": PageNumber,
+            "NumberOfPages": self.number_of_pages,
+            "OfferList": {"Offer": offers},
+        }
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iter_offers(stand_in, monkeypatch, prefetch):
+    api, _ = stand_in
+    pages = FakePages(6)
+    monkeypatch.setattr(api.offers, "get_offer_list_paginated", pages)
+
+    offers = list(api.offers.iter_offers(prefetch=prefetch, OfferStateFilter="Active"))
+    assert [offer["SellerProductId"] for offer in offers] == [
+        "SKU{}-{}".format(page, i) for page in range(1, 7) for i in range(3)
+    ]
+    assert all(offer["Filters"] == {"OfferStateFilter": "Active"} for offer in offers)
+    assert sorted(pages.requested) == [1, 2, 3, 4, 5, 6]
+    assert pages.max_running <= max(prefetch, 1)
+
+
+def test_iter_offers_is_lazy(stand_in, monkeypatch):
+    api, _ = stand_in
+    pages = FakePages(50, delay=0)
+    monkeypatch.setattr(api.offers, "get_offer_list_paginated", pages)
+
+    offers = api.offers.iter_offers(prefetch=2, PageNumber=10)
+    assert next(offers)["SellerProductId"] == "SKU10-0"
+    offers.close()
+    # The first page and at most the window of the next pages
+    assert sorted(pages.requested)[:2] == [10, 11]
+    assert len(pages.requested) <= 4
+
+
+def test_iter_offers_with_failed_page(stand_in, monkeypatch):
+    api, _ = stand_in
+    monkeypatch.setattr(
+        api.offers, "get_offer_list_paginated", FakePages(4, failed_page=3)
+    )
+
+    offers = api.offers.iter_offers(prefetch=2)
+    assert len([next(offers) for _ in range(6)]) == 6
+    with pytest.raises(CdiscountApiException, match="page 3: Timeout"):
+        next(offers)
+
+
+def test_iter_offers_without_offers(stand_in, monkeypatch):
+    api, _ = stand_in
+    response = {"OperationSuccess": True, "NumberOfPages": 0, "OfferList": None}
+    monkeypatch.setattr(
+        api.offers, "get_offer_list_paginated", lambda **filters: response
+    )
+    assert list(api.offers.iter_offers()) == []
+
+
 def test_generate_offer_package(valid_offer_package):
     # ---- BEFORE ----
     package_path = Path(gettempdir()) / "uploading_package"
@@ -74,7 +163,6 @@ def test_generate_offer_package(valid_offer_package):
     assert_xml_files_equal(created, expected, "Offer")
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_nonexistent_directory(valid_offer_package):
     """
     When the parent of the package_path does not exist a FileNotFoundError
@@ -90,7 +178,6 @@ def test_generate_offer_package_with_nonexistent_directory(valid_offer_package):
     )
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_existing_package_name_and_overwrite_false(valid_offer_package):
     """
     When the package_path already exists and overwrite=False, Offers.generate_offer_package should
@@ -109,7 +196,6 @@ def test_generate_offer_package_with_existing_package_name_and_overwrite_false(v
     )
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_existing_package_name_and_overwrite_true(valid_offer_package):
     """
     When the package_path already exists and overwrite=True, Offers.generate_offer_package should
@@ -122,9 +208,10 @@ def test_generate_offer_package_with_existing_package_name_and_overwrite_true(va
         "A good package", package_path, valid_offer_package,
         overwrite=True
     )
+    assert not package_path.exists()
+    assert package_path.with_suffix(".zip").exists()
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_discount(valid_offer_package):
     """
     When the key 'DiscountList' is in the offer for the package,
@@ -161,7 +248,6 @@ def test_generate_offer_package_with_discount(valid_offer_package):
     assert_xml_files_equal(created, expected, "Offer")
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_offer_publication_list(valid_offer_package):
     """
     When the argument 'offer_publication_list' is specified,
@@ -202,7 +288,6 @@ def test_generate_offer_package_with_offer_publication_list(valid_offer_package)
     assert_xml_files_equal(created, expected, "Offer")
 
 
-@pytest.mark.vcr()
 def test_generate_offer_package_with_purge_and_replace(valid_offer_package):
     """
     When the argument 'purge_and_replace' is set to True,
@@ -241,6 +326,50 @@ def test_generate_offer_package_with_purge_and_replace(valid_offer_package):
     assert_xml_files_equal(created, expected, "Offer")
 
 
+@pytest.mark.parametrize(
+    "sample, kwargs",
+    [
+        ("Offers.xml", {}),
+        ("Offers_with_discount.xml", {}),
+        ("Offers_with_offer_publication_list.xml",
+         {"offer_publication_list": offer_publication_list()}),
+        ("Offers_with_purge_and_replace.xml", {"purge_and_replace": True}),
+    ]
+)
+def test_generate_offer_package_with_streaming(valid_offer_package, sample, kwargs):
+    """
+    With streaming=True, Offers.generate_offer_package should accept a
+    generator and create the same Offers.xml without the directory of the
+    package
+    """
+    package_path = Path(gettempdir()) / "uploading_package"
+    zip_file = package_path.with_suffix(".zip")
+
+    if sample == "Offers_with_discount.xml":
+        valid_offer_package[0]["Offer"]["DiscountList"] = {
+            "DiscountComponent": [discount_component()]
+        }
+    Offers.generate_offer_package(
+        "A good package",
+        package_path,
+        (offer for offer in valid_offer_package),
+        streaming=True,
+        **kwargs
+    )
+
+    assert not package_path.exists()
+    assert_offer_package_is_valid(zip_file)
+
+    with open(SAMPLES_DIR.joinpath("offers", sample), "r") as f:
+        expected = f.read()
+
+    with zipfile.ZipFile(zip_file) as zf:
+        assert zf.getinfo("Content/Offers.xml").compress_type == zipfile.ZIP_DEFLATED
+        created = zf.read("Content/Offers.xml").decode()
+
+    assert_xml_files_equal(created, expected, "Offer")
+
+
 @pytest.mark.vcr()
 def test_submit_offer_package(api):
     response = api.offers.submit_offer_package(
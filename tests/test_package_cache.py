@@ -0,0 +1,178 @@
+# Python imports
+import os
+import zipfile
+from copy import deepcopy
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.helpers import generate_package
+from cdiscountapi.packages.cache import PackageCache, package_key
+
+
+def key_of(data):
+    return package_key("offer", data)
+
+
+def test_package_key_is_canonical(valid_offers_for_package):
+    """
+    The key shouldn't depend on the order of the offers, on the duplicates or
+    on the name of the package
+    """
+    data = {"OfferCollection": valid_offers_for_package, "Name": "Monday"}
+    key = key_of(data)
+    assert key == key_of(
+        {
+            "OfferCollection": valid_offers_for_package[::-1] + valid_offers_for_package,
+            "Name": "Tuesday",
+        }
+    )
+    assert key == key_of(dict(data, OfferPublicationList=[]))
+
+    assert key != key_of(dict(data, PurgeAndReplace=True))
+    assert key != key_of(dict(data, PackageType="StockAndPrice"))
+    assert key != key_of(dict(data, OfferPublicationList=[1]))
+    assert key_of(dict(data, OfferPublicationList=[1, 16])) == key_of(
+        dict(data, OfferPublicationList=[16, 1])
+    )
+
+    offers = deepcopy(valid_offers_for_package)
+    offers[0]["Offer"]["Price"] = 11
+    assert key != key_of(dict(data, OfferCollection=offers))
+
+
+def test_build(tmp_path, valid_offers_for_package, valid_products_for_package):
+    cache = PackageCache(tmp_path / "cache")
+    data = {"OfferCollection": valid_offers_for_package}
+
+    package = cache.build("offer", data)
+    assert not package.hit
+    assert package.changed
+    assert package.path == tmp_path / "cache" / "{}.zip".format(package.key)
+    with zipfile.ZipFile(str(package.path)) as zf:
+        assert zf.read("Content/Offers.xml").count(b"<Offer ") == 2
+
+    same_package = cache.build("offer", {"OfferCollection": valid_offers_for_package[::-1]})
+    assert same_package.hit
+    assert same_package.key == package.key
+    assert same_package.read_bytes() == package.read_bytes()
+
+    products = cache.build("product", {"Products": valid_products_for_package})
+    assert not products.hit
+    assert products.key != package.key
+
+
+def test_build_with_invalid_offers(tmp_path, valid_offer_for_package):
+    cache = PackageCache(tmp_path)
+    offer = dict(valid_offer_for_package, Stock="many")
+    with pytest.raises(ValidationError):
+        cache.build("offer", {"OfferCollection": [{"Offer": offer}]}, validate=True)
+    del offer["SellerProductId"]
+    with pytest.raises(ValidationError):
+        cache.build("offer", {"OfferCollection": [{"Offer": offer}]})
+    offer = dict(valid_offer_for_package, Colour="Blue")
+    with pytest.raises(ValidationError):
+        cache.build("offer", {"OfferCollection": [{"Offer": offer}]})
+    assert cache.entries() == []
+
+
+def test_build_validates_the_cached_packages(tmp_path, valid_offer_for_package):
+    cache = PackageCache(tmp_path)
+    offer = dict(valid_offer_for_package, Stock="many")
+    package = cache.build("offer", {"OfferCollection": [{"Offer": offer}]})
+    assert not package.hit
+
+    # The package is in the cache but it was never validated
+    with pytest.raises(ValidationError):
+        cache.build("offer", {"OfferCollection": [{"Offer": offer}]}, validate=True)
+
+    data = make_data(valid_offer_for_package, 1)
+    key = cache.build("offer", data, validate=True).key
+    assert (tmp_path / "{}.valid".format(key)).exists()
+    assert cache.build("offer", data, validate=True).hit
+
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_build_with_a_table_of_offers(tmp_path):
+    cache = PackageCache(tmp_path)
+    table = {"ProductEan": ["3600000000001"], "SellerProductId": ["SKU1"]}
+    with pytest.raises(ValidationError, match="OfferCollection"):
+        cache.build("offer", {"OfferTable": table})
+
+
+def test_build_keeps_the_first_name(tmp_path, valid_offers_for_package):
+    cache = PackageCache(tmp_path)
+    cache.build(
+        "offer", {"OfferCollection": valid_offers_for_package, "Name": "Monday"}
+    )
+    package = cache.build(
+        "offer", {"OfferCollection": valid_offers_for_package, "Name": "Tuesday"}
+    )
+    assert package.hit
+    with zipfile.ZipFile(str(package.path)) as zf:
+        assert b'Name="Monday"' in zf.read("Content/Offers.xml")
+
+
+def test_submitted_packages(tmp_path, valid_offers_for_package):
+    cache = PackageCache(tmp_path)
+    data = {"OfferCollection": valid_offers_for_package}
+    package = cache.build("offer", data)
+    assert cache.last_submitted() is None
+
+    cache.mark_submitted(package.key)
+    assert cache.last_submitted() == package.key
+    assert not cache.build("offer", data).changed
+    # The submissions are kept by channel and by cache
+    assert cache.build("offer", data, channel="stock").changed
+    assert not PackageCache(tmp_path).is_changed(package.key)
+
+    data["OfferCollection"][0]["Offer"]["Stock"] = 0
+    assert cache.build("offer", data).changed
+
+
+def make_data(valid_offer_for_package, i):
+    offer = dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))
+    return {"OfferCollection": [{"Offer": offer}]}
+
+
+def test_evict_the_least_recently_used(tmp_path, valid_offer_for_package):
+    cache = PackageCache(tmp_path, max_entries=2)
+    keys = []
+    for i in range(3):
+        keys.append(cache.build("offer", make_data(valid_offer_for_package, i)).key)
+        # The last use of the packages are 1 s apart
+        os.utime(str(cache.path_of(keys[-1])), (1000 + i, 1000 + i))
+        if i == 1:
+            assert cache.get(keys[0]) is not None
+
+    assert keys[0] in cache
+    assert keys[1] not in cache
+    assert keys[2] in cache
+
+
+def test_evict_by_size(tmp_path, valid_offer_for_package):
+    cache = PackageCache(tmp_path, max_size=1)
+    key = cache.build("offer", make_data(valid_offer_for_package, 0)).key
+    # The package just built is kept
+    assert key in cache
+    new_key = cache.build("offer", make_data(valid_offer_for_package, 1)).key
+    assert [path.name for path, _, _ in cache.entries()] == ["{}.zip".format(new_key)]
+
+
+def test_generate_package_with_cache(tmp_path, valid_offers_for_package):
+    cache = PackageCache(tmp_path / "cache")
+    data = {"OfferCollection": valid_offers_for_package}
+    path = generate_package("offer", tmp_path / "offers", data, cache=cache)
+    assert path == tmp_path / "offers.zip"
+    (cached_path, _, _), = cache.entries()
+    assert path.read_bytes() == cached_path.read_bytes()
+
+    # The copy stays when the package is removed from the cache
+    cache.clear()
+    assert path.exists()
+    generate_package("offer", tmp_path / "offers", data, cache=cache)
+    assert len(cache.entries()) == 1
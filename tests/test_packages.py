@@ -1,13 +1,27 @@
+# Python imports
+import io
+import socket
+import tracemalloc
+import uuid
+import zipfile
+from copy import deepcopy
+
 # Third-party imports
 import pytest
 
 # Project imports
-from cdiscountapi.packages import OfferPackage, ProductPackage
-from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages import OfferPackage, PackageData, ProductPackage, templates
+from cdiscountapi.packages import writer
+from cdiscountapi.packages.writer import (
+    PackageWriter,
+    write_offer_package,
+    write_offers_xml,
+)
+from cdiscountapi.exceptions import ConflictError, ValidationError
+from . import assert_xml_files_equal, discount_component
 
 
 # OfferPackage
-@pytest.mark.vcr()
 def test_OfferPackage_with_PackageType_Full(valid_offer_for_package):
     # The required keys must be ProductEan and SellerProductId
     package = OfferPackage(
@@ -18,7 +32,6 @@ def test_OfferPackage_with_PackageType_Full(valid_offer_for_package):
     assert offer_for_package == valid_offer_for_package
 
 
-@pytest.mark.vcr()
 def test_OfferPackage_with_PackageType_StockAndPrice(valid_offer_for_package):
     # The required keys must be ProductEan and SellerProductId
     offer = {
@@ -32,7 +45,6 @@ def test_OfferPackage_with_PackageType_StockAndPrice(valid_offer_for_package):
     assert offer_for_package == offer
 
 
-@pytest.mark.vcr()
 def test_OfferPackage_with_invalid_key(valid_offer_for_package):
     invalid_offer_for_package = valid_offer_for_package
     invalid_offer_for_package["InvalidKey"] = "Unknown"
@@ -46,7 +58,6 @@ def test_OfferPackage_with_invalid_key(valid_offer_for_package):
 
 
 @pytest.mark.parametrize("key", ["ProductEan", "SellerProductId"])
-@pytest.mark.vcr()
 def test_OfferPackage_with_missing_key(valid_offer_for_package, key):
     invalid_offer_for_package = valid_offer_for_package
     del invalid_offer_for_package[key]
@@ -58,8 +69,51 @@ def test_OfferPackage_with_missing_key(valid_offer_for_package, key):
     )
 
 
+@pytest.mark.parametrize(
+    "conflict, price", [("first", 10), ("last", 20)]
+)
+def test_OfferPackage_with_conflicting_offers(valid_offer_for_package, conflict, price):
+    """
+    Only one offer should be kept per SellerProductId and ProductEan
+    """
+    offer1 = dict(valid_offer_for_package, Price=20)
+    offer2 = dict(valid_offer_for_package, SellerProductId="MY_SKU2")
+    package = OfferPackage(
+        {"OfferCollection": [
+            {"Offer": valid_offer_for_package}, {"Offer": offer2}, {"Offer": offer1}
+        ]},
+        conflict=conflict,
+    )
+    assert [offer["SellerProductId"] for offer in package.data] == ["MY_SKU1", "MY_SKU2"]
+    assert package.data[0]["Price"] == price
+
+
+def test_OfferPackage_with_conflicting_offers_and_error(valid_offer_for_package):
+    offers = [
+        {"Offer": valid_offer_for_package},
+        {"Offer": valid_offer_for_package},
+        {"Offer": dict(valid_offer_for_package, Price=20)},
+    ]
+    with pytest.raises(ConflictError):
+        OfferPackage({"OfferCollection": offers}, conflict="error")
+
+
+def test_PackageData():
+    data = PackageData(lambda record: record["Id"])
+    assert data.add({"Id": 1, "Value": "a"})
+    assert not data.add({"Id": 1, "Value": "a"})
+    assert data.add({"Id": 2, "Value": "b"})
+    assert data.add({"Id": 1, "Value": "c"})
+
+    assert len(data) == 2
+    assert list(data) == [{"Id": 1, "Value": "c"}, {"Id": 2, "Value": "b"}]
+    assert 2 in data
+    assert data.get(2) == {"Id": 2, "Value": "b"}
+    assert data.get(3) is None
+    pytest.raises(ValueError, PackageData, lambda record: record, "unknown")
+
+
 # ProductPackage
-@pytest.mark.vcr()
 def test_ProductPackage(valid_product_for_package):
     package = ProductPackage({"Products": [{"Product": valid_product_for_package}]})
     assert len(package.data) == 1
@@ -67,7 +121,6 @@ def test_ProductPackage(valid_product_for_package):
     assert product_for_package == valid_product_for_package
 
 
-@pytest.mark.vcr()
 def test_ProductPackage_with_invalid_key(valid_product_for_package):
     invalid_product_for_package = valid_product_for_package
     invalid_product_for_package["InvalidKey"] = "Unknown"
@@ -76,3 +129,287 @@ def test_ProductPackage_with_invalid_key(valid_product_for_package):
     pytest.raises(
         ValidationError, ProductPackage, {"Products": [{"Product": invalid_product_for_package}]}
     )
+
+
+def test_packages_without_network(monkeypatch, valid_offer_for_package, valid_product_for_package):
+    """
+    The content of the packages should be generated without any network I/O
+    """
+    def connect(*args, **kwargs):
+        raise AssertionError("No connection should be opened.")
+
+    monkeypatch.setattr(socket.socket, "connect", connect)
+    offer_package = OfferPackage({"OfferCollection": [{"Offer": valid_offer_for_package}]})
+    assert "MY_SKU1" in offer_package.generate()
+
+    product_package = ProductPackage({"Products": [{"Product": valid_product_for_package}]})
+    assert "120905783" in product_package.generate()
+
+
+def test_generate_does_not_modify_the_data(valid_offers_for_package, valid_product_for_package):
+    """
+    generate() should be repeatable: the lists of the offers and the products
+    are read without being removed
+    """
+    valid_offers_for_package[0]["Offer"]["DiscountList"] = {
+        "DiscountComponent": [discount_component()]
+    }
+    offer_package = OfferPackage({"OfferCollection": valid_offers_for_package})
+    product_package = ProductPackage({"Products": [{"Product": valid_product_for_package}]})
+
+    for package in (offer_package, product_package):
+        data = deepcopy(list(package.data))
+        content = package.generate()
+        assert list(package.data) == data
+        assert package.generate() == content
+
+    assert offer_package.generate().count("<ShippingInformation ") == 4
+    assert offer_package.generate().count("<DiscountComponent ") == 1
+
+
+def test_generate_memory(valid_offer_for_package):
+    """
+    generate() shouldn't copy the offers: the memory allocated is about the
+    size of the content
+    """
+    package = OfferPackage({"OfferCollection": [
+        {"Offer": dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))}
+        for i in range(2000)
+    ]})
+    # The template is compiled before the measure
+    package.generate()
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        content = package.generate()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak - before < 3 * len(content)
+
+
+# Streaming writer
+def test_write_offers_xml_is_the_generated_content(valid_offers_for_package):
+    """
+    The streamed Offers.xml should be the same XML as the one rendered by
+    OfferPackage.generate
+    """
+    data = {"OfferCollection": valid_offers_for_package, "Name": "A good package"}
+    output = io.BytesIO()
+    assert write_offers_xml(output, data) == 2
+
+    expected = OfferPackage(data).generate()
+    assert_xml_files_equal(output.getvalue(), expected, "Offer")
+
+
+def test_write_offers_xml_with_invalid_offer(valid_offer_for_package):
+    offers = [{"Offer": valid_offer_for_package}, {"Offer": {"InvalidKey": 1}}]
+    with pytest.raises(ValidationError):
+        write_offers_xml(io.BytesIO(), {"OfferCollection": iter(offers)})
+
+
+def test_write_offer_package(valid_offer_for_package):
+    """
+    write_offer_package should consume a generator and write the package in a
+    file object
+    """
+    def offers():
+        for i in range(100):
+            offer = dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))
+            yield {"Offer": offer}
+
+    output = io.BytesIO()
+    assert write_offer_package(output, {"OfferCollection": offers()}) == 100
+
+    with zipfile.ZipFile(output) as zf:
+        assert set(zf.namelist()) == {
+            "[Content_Types].xml", "_rels/.rels", "Content/Offers.xml"
+        }
+        assert zf.read("Content/Offers.xml").count(b"<Offer ") == 100
+
+
+# Incremental writer
+def _offers(offer, number, price=10):
+    return [
+        {"Offer": dict(offer, SellerProductId="SKU{}".format(i), Price=price)}
+        for i in range(number)
+    ]
+
+
+def _read_offers_xml(path):
+    with zipfile.ZipFile(str(path)) as zf:
+        return zf.read("Content/Offers.xml")
+
+
+def test_PackageWriter(tmp_path, valid_offer_for_package):
+    """
+    PackageWriter should seal a package every max_records offers and the
+    last one when it's closed
+    """
+    sealed = []
+    data = {"Name": "A feed", "OfferPublicationList": [1, 16]}
+    with PackageWriter(tmp_path / "offers", data, max_records=2,
+                       on_seal=sealed.append) as package_writer:
+        assert package_writer.extend(_offers(valid_offer_for_package, 5)) == 5
+        assert len(sealed) == 2
+        assert package_writer.records == 1
+
+    assert package_writer.packages == sealed
+    assert [info.path.name for info in sealed] == [
+        "offers_001.zip", "offers_002.zip", "offers_003.zip"
+    ]
+    assert [info.records for info in sealed] == [2, 2, 1]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "offers_001.zip", "offers_002.zip", "offers_003.zip"
+    ]
+
+    expected = io.BytesIO()
+    write_offers_xml(
+        expected, dict(data, OfferCollection=_offers(valid_offer_for_package, 5)[:2])
+    )
+    content = _read_offers_xml(sealed[0].path)
+    assert_xml_files_equal(content, expected.getvalue(), "Offer")
+    assert sealed[0].uncompressed_size == len(content)
+    assert sealed[0].compressed_size == sealed[0].path.stat().st_size
+
+
+def test_PackageWriter_with_updated_offer(tmp_path, valid_offer_for_package):
+    """
+    The same offer should be written once and a new version should go in
+    the next package
+    """
+    with PackageWriter(tmp_path / "offers") as package_writer:
+        offers = _offers(valid_offer_for_package, 2)
+        assert package_writer.append(offers[0])
+        assert not package_writer.append(deepcopy(offers[0]))
+        # The order of the attributes doesn't matter
+        reordered = {"Offer": dict(reversed(list(offers[0]["Offer"].items())))}
+        assert not package_writer.append(reordered)
+        assert package_writer.append(offers[1])
+        assert package_writer.append(_offers(valid_offer_for_package, 1, price=20)[0])
+
+    assert [info.records for info in package_writer.packages] == [2, 1]
+    assert b'Price="20"' in _read_offers_xml(package_writer.packages[1].path)
+
+
+def test_PackageWriter_with_max_size(tmp_path, valid_offer_for_package):
+    with PackageWriter(tmp_path / "offers", max_size=2000) as package_writer:
+        package_writer.extend(_offers(valid_offer_for_package, 20))
+
+    assert len(package_writer.packages) > 1
+    assert sum(info.records for info in package_writer.packages) == 20
+    # A package is sealed by the offer which exceeds the size
+    offer_size = len(_read_offers_xml(package_writer.packages[0].path)) // 2
+    for info in package_writer.packages:
+        assert info.uncompressed_size < 2000 + offer_size + 200
+
+
+def test_PackageWriter_with_max_age(tmp_path, monkeypatch, valid_offer_for_package):
+    now = [1000.0]
+    monkeypatch.setattr(writer.time, "monotonic", lambda: now[0])
+    offers = _offers(valid_offer_for_package, 3)
+
+    package_writer = PackageWriter(tmp_path / "offers", max_age=60)
+    package_writer.append(offers[0])
+    now[0] += 30
+    package_writer.append(offers[1])
+    package_writer.flush()
+    assert package_writer.packages == []
+
+    now[0] += 30
+    package_writer.flush()
+    assert [info.records for info in package_writer.packages] == [2]
+    assert not package_writer.is_open
+
+    package_writer.append(offers[2])
+    now[0] += 60
+    package_writer.append(offers[0])
+    package_writer.close()
+    assert [info.records for info in package_writer.packages] == [2, 1, 1]
+
+
+def test_PackageWriter_writes_incrementally(tmp_path, valid_offer_for_package):
+    """
+    The offers should be written in the temporary file of the open package
+    and the numbers of the existing packages should be skipped
+    """
+    (tmp_path / "offers_001.zip").write_bytes(b"")
+    package_writer = PackageWriter(tmp_path / "offers", max_records=100000)
+    # Random SKUs so that the compressor can't keep them in its buffer
+    offers = (
+        {"Offer": dict(valid_offer_for_package, SellerProductId=uuid.uuid4().hex)}
+        for i in range(5000)
+    )
+    package_writer.extend(offers)
+    package_writer.flush()
+    (tmp_file,) = tmp_path.glob(".offers_002.zip.*.tmp")
+    assert tmp_file.stat().st_size > 10000
+
+    info = package_writer.seal()
+    assert info.path.name == "offers_002.zip"
+    assert not tmp_file.exists()
+    assert package_writer.seal() is None
+    assert _read_offers_xml(info.path).count(b"<Offer ") == 5000
+
+
+def test_PackageWriter_with_invalid_offer(tmp_path, valid_offer_for_package):
+    with pytest.raises(ValidationError):
+        with PackageWriter(tmp_path / "offers") as package_writer:
+            package_writer.append({"Offer": valid_offer_for_package})
+            package_writer.append({"Offer": {"InvalidKey": 1}})
+
+    # The valid offers are kept
+    assert [info.records for info in package_writer.packages] == [1]
+
+
+def test_PackageWriter_discards_the_package_on_error(tmp_path, valid_offer_for_package):
+    sealed = []
+    with pytest.raises(KeyboardInterrupt):
+        with PackageWriter(tmp_path / "offers", on_seal=sealed.append) as package_writer:
+            package_writer.append({"Offer": valid_offer_for_package})
+            raise KeyboardInterrupt
+
+    assert package_writer.packages == sealed == []
+    assert not package_writer.is_open
+    assert list(tmp_path.iterdir()) == []
+
+
+# Templates
+def test_environment_is_shared():
+    assert templates.get_environment() is templates.get_environment()
+    assert templates.get_template("Offers.xml") is templates.get_template("Offers.xml")
+
+
+def test_compiled_templates_are_up_to_date():
+    """
+    The bundled templates should be compiled again (make templates) when
+    the templates or the version of jinja2 change
+    """
+    assert templates.compiled_templates_are_valid()
+
+
+def test_compiled_templates(tmp_path, monkeypatch, valid_offer_for_package):
+    """
+    The compiled templates should render the same content and be ignored
+    when the templates changed
+    """
+    monkeypatch.setattr(templates, "COMPILED_TEMPLATES_DIR", tmp_path)
+    monkeypatch.setattr(templates, "MANIFEST", tmp_path / "manifest.json")
+    templates.compile_templates(tmp_path)
+    assert templates.compiled_templates_are_valid()
+
+    context = {
+        "offers": [{"attributes": 'SellerProductId="MY_SKU1"'}],
+        "offer_publication_list": [{"Id": 1}],
+        "purge_and_replace": False,
+        "package_type": "Full",
+        "name": "A package",
+    }
+    compiled = templates.create_environment().get_template("Offers.xml")
+    source = templates.create_environment(precompiled=False).get_template("Offers.xml")
+    assert compiled.render(**context) == source.render(**context)
+
+    manifest = (tmp_path / "manifest.json").read_text()
+    (tmp_path / "manifest.json").write_text(manifest.replace("Offers.xml", "Other.xml"))
+    assert not templates.compiled_templates_are_valid()
@@ -64,7 +64,6 @@ def test_get_brand_list(api):
 
 
 # @pytest.mark.skip(reason='Stand by')
-@pytest.mark.vcr()
 def test_generate_product_package(valid_product_package):
     # ---- BEFORE ----
     package_name = Path(gettempdir()) / "uploading_package"
@@ -94,7 +93,6 @@ def test_generate_product_package(valid_product_package):
     assert_xml_files_equal(created, expected, "Product")
 
 
-@pytest.mark.vcr()
 def test_generate_product_package_with_nonexistent_directory(valid_product_package):
     """
     When the parent of the package_name does not exist a FileNotFoundError
@@ -109,7 +107,6 @@ def test_generate_product_package_with_nonexistent_directory(valid_product_packa
     )
 
 
-@pytest.mark.vcr()
 def test_generate_product_package_with_existing_package_name_and_overwrite_false(
     valid_product_package
 ):
@@ -129,7 +126,6 @@ def test_generate_product_package_with_existing_package_name_and_overwrite_false
     )
 
 
-@pytest.mark.vcr()
 def test_generate_product_package_with_existing_package_name_and_overwrite_true(
     valid_product_package
 ):
@@ -0,0 +1,91 @@
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.schema import SchemaRegistry
+
+
+WSDL_URL = "https://wsvc.cdiscount.com/MarketplaceAPIService.svc?wsdl"
+WSDL_CONTENT = b"""<?xml version="1.0"?>
+<wsdl:definitions
+    xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    targetNamespace="http://www.cdiscount.com">
+  <wsdl:types>
+    <xsd:schema targetNamespace="http://www.cdiscount.com">
+      <xsd:element name="%s" type="xsd:string"/>
+    </xsd:schema>
+  </wsdl:types>
+</wsdl:definitions>
+"""
+
+
+class FakeTransport(object):
+    """
+    A transport returning the WSDL without any network I/O
+    """
+
+    def __init__(self, element_name="OfferFilter"):
+        self.content = WSDL_CONTENT % element_name.encode("utf8")
+        self.loaded = 0
+
+    def load(self, url):
+        self.loaded += 1
+        return self.content
+
+
+@pytest.fixture
+def registry():
+    return SchemaRegistry()
+
+
+def test_get_document_is_shared(registry):
+    """
+    The connections of the same domain should share the same parsed WSDL and
+    download it only once
+    """
+    transport = FakeTransport()
+    document = registry.get_document("cdiscount.com", WSDL_URL, transport)
+    assert registry.get_document("cdiscount.com", WSDL_URL, transport) is document
+    assert transport.loaded == 1
+    assert len(registry) == 1
+
+
+def test_get_document_with_different_domains(registry):
+    transport = FakeTransport()
+    document = registry.get_document("cdiscount.com", WSDL_URL, transport)
+    preprod_document = registry.get_document("preprod-cdiscount.com", WSDL_URL, transport)
+    assert document is not preprod_document
+    assert len(registry) == 2
+
+
+def test_get_document_revalidates_the_hash(registry):
+    """
+    When the WSDL is checked again and has the same hash, the parsed WSDL
+    should be reused
+    """
+    registry.revalidation_timeout = 0
+    transport = FakeTransport()
+    document = registry.get_document("cdiscount.com", WSDL_URL, transport)
+    assert registry.get_document("cdiscount.com", WSDL_URL, transport) is document
+    assert transport.loaded == 2
+
+
+def test_get_document_with_new_wsdl(registry):
+    """
+    When the WSDL changes, a new document should replace the obsolete one
+    """
+    registry.revalidation_timeout = 0
+    document = registry.get_document("cdiscount.com", WSDL_URL, FakeTransport())
+    new_document = registry.get_document(
+        "cdiscount.com", WSDL_URL, FakeTransport("OfferFilterPaginated")
+    )
+    assert new_document is not document
+    assert len(registry) == 1
+    assert new_document.types.get_element("{http://www.cdiscount.com}OfferFilterPaginated")
+
+
+def test_clear(registry):
+    registry.get_document("cdiscount.com", WSDL_URL, FakeTransport())
+    registry.clear()
+    assert len(registry) == 0
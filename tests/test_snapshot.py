@@ -0,0 +1,79 @@
+# Python imports
+import io
+
+# Third-party imports
+import zeep
+from zeep.transports import Transport
+from zeep.wsdl import Document
+
+# Project imports
+from cdiscountapi import snapshot
+from cdiscountapi.schema import SchemaRegistry
+from .test_schema import WSDL_URL, FakeTransport
+
+
+def parse(transport):
+    return Document(io.BytesIO(transport.content), transport, base=WSDL_URL)
+
+
+def test_dumps_and_loads():
+    """
+    The document loaded from a snapshot should have the same types as the
+    parsed document
+    """
+    transport = FakeTransport()
+    content = snapshot.dumps(parse(transport), transport.content)
+    assert snapshot.read_header(content)["digest"] == snapshot.digest_of(transport.content)
+
+    document = snapshot.loads(content, transport)
+    assert document.transport is transport
+    assert document.location == WSDL_URL
+    assert document.types.get_element("{http://www.cdiscount.com}OfferFilter")
+
+
+def test_read_header_with_invalid_snapshot():
+    assert snapshot.read_header(b"not a snapshot") is None
+
+
+def test_load_snapshot_with_different_digest():
+    assert snapshot.load_snapshot("cdiscount.com", "another digest", Transport()) is None
+
+
+def test_load_snapshot_with_another_version_of_zeep(monkeypatch, caplog):
+    content = snapshot._read_bundled("cdiscount.com")
+    digest = snapshot.read_header(content)["digest"]
+    monkeypatch.setattr(zeep, "__version__", "0.0.1")
+    with caplog.at_level("DEBUG", logger="cdiscountapi.snapshot"):
+        assert snapshot.load_snapshot("cdiscount.com", digest, Transport()) is None
+    assert "created with zeep" in caplog.text
+
+
+def test_load_snapshot_without_snapshot():
+    assert snapshot.load_snapshot("unknown-domain.com", "digest", Transport()) is None
+
+
+def test_bundled_snapshot():
+    """
+    The bundled snapshot of the production should contain the operations and
+    the types of the API
+    """
+    header = snapshot.read_header(snapshot.snapshot_path("cdiscount.com").read_bytes())
+    document = snapshot.load_snapshot("cdiscount.com", header["digest"], Transport())
+    assert document is not None
+
+    client = zeep.Client(document)
+    factory = client.type_factory("http://www.cdiscount.com")
+    offer_filter = factory.OfferFilterPaginated(PageNumber=1)
+    assert offer_filter.PageNumber == 1
+    assert client.service.GetOfferListPaginated is not None
+
+
+def test_registry_uses_the_snapshot(monkeypatch):
+    transport = FakeTransport()
+    content = snapshot.dumps(parse(transport), transport.content)
+    monkeypatch.setattr(snapshot, "_read_bundled", lambda domain: content)
+
+    registry = SchemaRegistry()
+    document = registry.get_document("cdiscount.com", WSDL_URL, transport)
+    assert document.types.get_element("{http://www.cdiscount.com}OfferFilter")
+    assert registry.get_document("cdiscount.com", WSDL_URL, transport) is document
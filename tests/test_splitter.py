@@ -0,0 +1,120 @@
+# Python imports
+import hashlib
+import zipfile
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.packages.splitter import PackageInfo, split_package
+
+
+def make_offers(valid_offer_for_package, number):
+    for i in range(number):
+        yield {"Offer": dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))}
+
+
+def read_skus(path):
+    with zipfile.ZipFile(str(path)) as zf:
+        content = zf.read("Content/Offers.xml").decode()
+    return content.count("<Offer ")
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+def test_split_package(tmp_path, valid_offer_for_package, max_workers):
+    """
+    The offers should be split into packages of max_records offers built in
+    order
+    """
+    manifest = split_package(
+        "offer",
+        tmp_path / "offers",
+        {"OfferCollection": make_offers(valid_offer_for_package, 25), "Name": "Offers"},
+        max_records=10,
+        max_workers=max_workers,
+    )
+
+    assert [package.path.name for package in manifest] == [
+        "offers_001.zip", "offers_002.zip", "offers_003.zip"
+    ]
+    assert [package.records for package in manifest] == [10, 10, 5]
+    for package in manifest:
+        content = package.path.read_bytes()
+        assert package.compressed_size == len(content)
+        assert package.sha256 == hashlib.sha256(content).hexdigest()
+        assert read_skus(package.path) == package.records
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "offers_001.zip", "offers_002.zip", "offers_003.zip"
+    ]
+
+
+def test_split_package_is_reproducible(tmp_path, valid_offer_for_package):
+    data = {"OfferCollection": list(make_offers(valid_offer_for_package, 5))}
+    manifest1 = split_package("offer", tmp_path / "a", data, max_workers=0)
+    manifest2 = split_package("offer", tmp_path / "b", data, max_workers=0)
+    assert manifest1[0].sha256 == manifest2[0].sha256
+
+
+def test_split_package_with_size_limits(tmp_path, valid_offer_for_package):
+    """
+    A package bigger than the limits should be split again
+    """
+    data = {"OfferCollection": make_offers(valid_offer_for_package, 20)}
+    manifest = split_package(
+        "offer", tmp_path / "offers", data, max_uncompressed_size=4000, max_workers=0
+    )
+    assert len(manifest) > 1
+    assert sum(package.records for package in manifest) == 20
+    assert all(package.uncompressed_size <= 4000 for package in manifest)
+
+    # A single offer is bigger than the limit
+    data = {"OfferCollection": make_offers(valid_offer_for_package, 2)}
+    with pytest.raises(ValueError):
+        split_package(
+            "offer", tmp_path / "offers", data, max_compressed_size=10, max_workers=0
+        )
+
+
+def test_split_package_with_products(tmp_path, valid_product_for_package):
+    products = [
+        {"Product": dict(valid_product_for_package, SellerProductId=str(i))}
+        for i in range(3)
+    ]
+    manifest = split_package(
+        "product", tmp_path / "products", {"Products": products}, max_records=2,
+        max_workers=0,
+    )
+    assert [package.records for package in manifest] == [2, 1]
+    assert manifest[0].as_dict()["path"] == str(tmp_path / "products_001.zip")
+
+
+def test_split_package_without_overwrite(tmp_path, valid_offer_for_package):
+    (tmp_path / "offers_002.zip").write_bytes(b"")
+    with pytest.raises(FileExistsError):
+        split_package(
+            "offer", tmp_path / "offers",
+            {"OfferCollection": make_offers(valid_offer_for_package, 3)},
+            max_records=1, overwrite=False, max_workers=0,
+        )
+    # Nothing is written when a package exists
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["offers_002.zip"]
+
+
+def test_split_package_removes_previous_packages(tmp_path, valid_offer_for_package):
+    def data():
+        return {"OfferCollection": make_offers(valid_offer_for_package, 3)}
+
+    split_package("offer", tmp_path / "offers", data(), max_records=1, max_workers=0)
+    (tmp_path / "offers_extra.zip").write_bytes(b"")
+    manifest = split_package(
+        "offer", tmp_path / "offers", data(), max_records=2, max_workers=0
+    )
+    assert len(manifest) == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "offers_001.zip", "offers_002.zip", "offers_extra.zip"
+    ]
+
+
+def test_package_info():
+    info = PackageInfo("offers_001.zip", 1, 10, 5, "0" * 64)
+    assert info.as_dict()["records"] == 1
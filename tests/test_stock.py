@@ -0,0 +1,109 @@
+# Python imports
+import io
+import zipfile
+from decimal import Decimal
+
+# Third-party imports
+import pytest
+
+# Project imports
+from . import assert_xml_files_equal
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.stock import (
+    is_rows,
+    write_stock_and_price_package,
+    write_stock_and_price_xml,
+)
+from cdiscountapi.packages.writer import write_offers_xml
+from cdiscountapi.packages.xsd import validate_xml
+from cdiscountapi.sections.offers import Offers
+
+
+ROWS = [
+    ("3600000000001", "SKU1", 10, 3),
+    ("3600000000002", 'SKU "2" & <3>', 12.5, 0),
+    ("3600000000003", "SKU3", Decimal("8.90"), 12),
+]
+
+
+def expected_xml(rows, data):
+    output = io.BytesIO()
+    offers = [
+        {"Offer": dict(zip(("ProductEan", "SellerProductId", "Price", "Stock"), row))}
+        for row in rows
+    ]
+    write_offers_xml(
+        output, dict(data, PackageType="StockAndPrice", OfferCollection=offers)
+    )
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_write_stock_and_price_xml(chunk_size):
+    """
+    The rows should be written like the offers of write_offers_xml
+    """
+    data = {"Name": "Stock & price", "OfferPublicationList": [1, 16]}
+    output = io.BytesIO()
+    assert write_stock_and_price_xml(output, iter(ROWS), data, chunk_size) == 3
+    assert_xml_files_equal(output.getvalue(), expected_xml(ROWS, data), "Offer")
+    validate_xml(output.getvalue(), "offer")
+
+
+def test_write_stock_and_price_xml_with_columns():
+    columns = dict(
+        zip(("ProductEan", "SellerProductId", "Price", "Stock"), map(list, zip(*ROWS)))
+    )
+    output = io.BytesIO()
+    assert write_stock_and_price_xml(output, columns, chunk_size=2) == 3
+    assert_xml_files_equal(output.getvalue(), expected_xml(ROWS, {}), "Offer")
+
+    with pytest.raises(ValidationError):
+        write_stock_and_price_xml(io.BytesIO(), dict(columns, Vat=[20, 20, 20]))
+
+
+@pytest.mark.parametrize(
+    "row, message",
+    [
+        (("3600000000004", "SKU4", 10), "Row 3 should be"),
+        (("3600000000004", "SKU4", "ten", 1), "Row 3, Price should be a number"),
+        (("3600000000004", "SKU4", float("nan"), 1), "Row 3, Price should be"),
+        (("3600000000004", "SKU4", 10, 1.5), "Row 3, Stock should be an integer"),
+        (("3600000000004", "SKU4", 10, True), "Row 3, Stock should be an integer"),
+        (("3600000000004", None, 10, 1), "Row 3, SellerProductId should be"),
+        (("", "SKU4", 10, 1), "Row 3, ProductEan is empty"),
+    ],
+)
+def test_write_stock_and_price_xml_with_invalid_row(row, message):
+    with pytest.raises(ValidationError, match=message):
+        write_stock_and_price_xml(io.BytesIO(), ROWS + [row], chunk_size=2)
+
+
+def test_write_stock_and_price_xml_with_integer_identifiers():
+    rows = [(3600000000001, 1, 10, 3)]
+    output = io.BytesIO()
+    assert write_stock_and_price_xml(output, rows) == 1
+    expected = expected_xml([("3600000000001", "1", 10, 3)], {})
+    assert_xml_files_equal(output.getvalue(), expected, "Offer")
+
+
+def test_write_stock_and_price_xml_in_full_package():
+    with pytest.raises(ValidationError):
+        write_stock_and_price_xml(io.BytesIO(), ROWS, {"PackageType": "Full"})
+
+
+def test_generate_offer_package_with_rows(tmp_path):
+    assert is_rows(ROWS)
+    assert not is_rows([{"Offer": {}}])
+
+    package = Offers.generate_offer_package(
+        "Stock", tmp_path / "stock", ROWS, package_type="StockAndPrice", validate=True
+    )
+    with zipfile.ZipFile(str(package)) as zf:
+        created = zf.read("Content/Offers.xml")
+    assert_xml_files_equal(created, expected_xml(ROWS, {"Name": "Stock"}), "Offer")
+
+    buffer = io.BytesIO()
+    assert write_stock_and_price_package(buffer, ROWS) == 3
+    with zipfile.ZipFile(buffer) as zf:
+        assert "Content/Offers.xml" in zf.namelist()
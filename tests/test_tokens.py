@@ -0,0 +1,230 @@
+# Python imports
+import multiprocessing
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from pathlib import Path
+
+# Third-party imports
+import pytest
+import vcr
+import zeep
+
+# Project imports
+from cdiscountapi import Connection
+from cdiscountapi.helpers import auto_refresh_token, is_token_fault
+from cdiscountapi.sections.base import BaseSection
+from cdiscountapi.tokens import (
+    FileTokenStore,
+    MemoryTokenStore,
+    Token,
+    get_token_store,
+    default_store,
+    token_key,
+)
+
+
+CASSETTE = (
+    Path(__file__).parent / "cassettes" / "test_connection" / "test_initialization.yaml"
+)
+
+HEADER_MESSAGE = {
+    "Context": {"SiteID": 100, "CatalogID": 1},
+    "Localization": {"Country": "Fr", "Currency": "Eur"},
+    "Security": {"UserName": ""},
+    "Version": "1.0",
+}
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    """
+    Return a function creating connections and the list of the tokens issued
+    by the STS
+    """
+    issued = []
+
+    def get_token(self):
+        issued.append("{:032x}".format(len(issued) + 1))
+        return issued[-1]
+
+    monkeypatch.setattr(Connection, "get_token", get_token)
+
+    def connect(password="password", **kwargs):
+        return Connection("login", password, header_message=deepcopy(HEADER_MESSAGE), **kwargs)
+
+    with vcr.use_cassette(str(CASSETTE), record_mode="none", allow_playback_repeats=True):
+        yield connect, issued
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryTokenStore()
+    return FileTokenStore(tmp_path / "tokens")
+
+
+def test_token_is_valid():
+    token = Token("abc", time.time() + 60)
+    assert token.is_valid()
+    assert not token.is_valid(margin=120)
+
+
+def test_store(store):
+    assert store.get("login@cdiscount.com") is None
+    store.set("login@cdiscount.com", ("abc", 1.5))
+    assert store.get("login@cdiscount.com") == Token("abc", 1.5)
+    store.delete("login@cdiscount.com")
+    assert store.get("login@cdiscount.com") is None
+
+
+def test_file_store_is_private(tmp_path):
+    store = FileTokenStore(tmp_path / "tokens")
+    store.set("login@cdiscount.com", ("abc", 1.5))
+    (path,) = (tmp_path / "tokens").glob("*.json")
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+
+
+def set_token(path, key, value):
+    store = FileTokenStore(path)
+    with store.lock(key):
+        if store.get(key) is None:
+            time.sleep(0.2)
+            store.set(key, (value, time.time() + 60))
+
+
+def test_file_store_lock_is_shared_by_processes(tmp_path):
+    """
+    Only the first process holding the lock should set the token
+    """
+    path = tmp_path / "tokens"
+    processes = [
+        multiprocessing.Process(target=set_token, args=(path, "key", str(i)))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert FileTokenStore(path).get("key").value in "0123"
+    assert len(list(path.glob("*.json"))) == 1
+
+
+def test_get_token_store(tmp_path):
+    store = MemoryTokenStore()
+    assert get_token_store(None) is default_store
+    assert get_token_store(store) is store
+    assert isinstance(get_token_store(tmp_path), FileTokenStore)
+
+
+def test_connections_share_the_token(connect, store):
+    """
+    The second connection should reuse the token of the store
+    """
+    connect, issued = connect
+    first = connect(token_store=store)
+    second = connect(token_store=store)
+    assert len(issued) == 1
+    assert first.token == second.token == second.header["Security"]["TokenId"]
+
+
+def test_connections_with_another_password_dont_share_the_token(connect, store):
+    """
+    A connection with a wrong password should not get the token of the store
+    """
+    connect, issued = connect
+    first = connect(token_store=store)
+    second = connect(token_store=store, password="wrong password")
+    assert len(issued) == 2
+    assert first.token_key != second.token_key
+    assert second.token == issued[1]
+
+
+def test_ensure_token_refreshes_before_expiry(connect, store):
+    connect, issued = connect
+    api = connect(token_store=store, refresh_margin=3600)
+    assert api.ensure_token() == issued[0]
+
+    # The token expires in less than refresh_margin
+    api.token_expires = time.time() + 60
+    store.set(api.token_key, (api.token, api.token_expires))
+    assert api.ensure_token() == issued[1]
+    assert api.header["Security"]["TokenId"] == issued[1]
+    assert store.get(api.token_key).value == issued[1]
+
+
+def test_refresh_token_reuses_the_token_refreshed_by_another_connection(connect, store):
+    connect, issued = connect
+    first = connect(token_store=store)
+    second = connect(token_store=store)
+
+    first.refresh_token()
+    assert len(issued) == 2
+
+    # The token of second was rejected but first already replaced it
+    second.refresh_token()
+    assert len(issued) == 2
+    assert second.token == first.token == issued[1]
+
+
+def test_file_store_is_shared_by_processes(connect, tmp_path):
+    """
+    A connection should reuse the token written by another process
+    """
+    connect, issued = connect
+    FileTokenStore(tmp_path).set(
+        token_key("login", "cdiscount.com", "password"), ("a" * 32, time.time() + 7200)
+    )
+
+    api = connect(token_store=str(tmp_path))
+    assert api.token == "a" * 32
+    assert issued == []
+
+
+def test_refresh_is_single_flight(stand_in):
+    """
+    When the token is rejected, the threads sharing a connection should wait
+    for one refresh and resend their request with the new token
+    """
+    api, server = stand_in
+    barrier = threading.Barrier(32)
+
+    def get_seller_info():
+        barrier.wait()
+        return api.seller.get_seller_info()
+
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        responses = list(executor.map(lambda _: get_seller_info(), range(32)))
+
+    assert all(r["OperationSuccess"] for r in responses)
+    assert server.sts_calls == 1
+    assert api.token == server.token == api.header["Security"]["TokenId"]
+    # Each thread sent its request with the rejected token then the new one
+    assert server.soap_calls == 64
+
+
+def test_refresh_only_on_token_fault(stand_in):
+    """
+    The other faults should be raised without refreshing the token
+    """
+    api, server = stand_in
+    calls = []
+
+    @auto_refresh_token
+    def operation(section):
+        calls.append(section.api.token)
+        raise zeep.exceptions.Fault("Invalid request", code="s:Client")
+
+    with pytest.raises(zeep.exceptions.Fault):
+        operation(BaseSection(api))
+    assert len(calls) == 1
+    assert server.sts_calls == 0
+
+
+def test_is_token_fault():
+    assert is_token_fault(zeep.exceptions.Fault("", code="s:RequestTokenValidationError"))
+    assert not is_token_fault(zeep.exceptions.Fault("", code="s:Client"))
+    assert not is_token_fault(zeep.exceptions.Fault(""))
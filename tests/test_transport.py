@@ -0,0 +1,90 @@
+# Python imports
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.transport import Transport, create_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connections alive
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<token>abc</token>"
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}".format(httpd.server_port)
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connection_stats_with_keep_alive(server):
+    """
+    The connection to a host should be reused by the following requests
+    """
+    transport = Transport()
+    for _ in range(3):
+        response = transport.session.get(server + "/token")
+        assert response.content == b"<token>abc</token>"
+
+    assert transport.connection_stats()[server] == {
+        "connections": 1,
+        "requests": 3,
+        "reused": 2,
+    }
+
+
+def test_connection_stats_without_keep_alive(server):
+    """
+    Each request should open a new connection when keep-alive is disabled
+    """
+    transport = Transport(keep_alive=False)
+    for _ in range(3):
+        transport.session.get(server + "/token")
+
+    assert transport.connection_stats()[server] == {
+        "connections": 3,
+        "requests": 3,
+        "reused": 0,
+    }
+
+
+def test_connection_stats_without_request():
+    assert Transport().connection_stats() == {}
+
+
+def test_create_session():
+    session = create_session(pool_size=32, gzip=False)
+    adapter = session.get_adapter("https://wsvc.cdiscount.com")
+    assert adapter._pool_maxsize == 32
+    assert session.headers["Accept-Encoding"] == "identity"
+
+
+def test_transport_with_session():
+    """
+    A session provided by the user should be used but not closed by the transport
+    """
+    session = create_session()
+    transport = Transport(session=session)
+    assert transport.session is session
+    assert transport._close_session is False
@@ -0,0 +1,198 @@
+# Python imports
+import json
+from copy import deepcopy
+from datetime import datetime
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.packages.validator import (
+    CHUNK_SIZE,
+    DiscountComponentValidator,
+    FieldError,
+    OfferValidator,
+    ProductValidator,
+)
+from . import SAMPLES_DIR, discount_component
+
+
+def test_validate_many_with_valid_offers(valid_offers_for_package):
+    report = OfferValidator.validate_many(valid_offers_for_package, key="Offer")
+    assert report.is_valid
+    assert report.number_of_records == 2
+    assert list(report) == []
+    report.raise_for_errors()
+
+
+def test_validate_many_with_valid_products(valid_products_for_package):
+    report = ProductValidator.validate_many(valid_products_for_package, key="Product")
+    assert report.is_valid
+
+
+def test_validate_many_reports_all_the_errors(valid_offer_for_package):
+    """
+    Every error of every record should be reported in one pass
+    """
+    missing_sku = deepcopy(valid_offer_for_package)
+    del missing_sku["SellerProductId"]
+    bad_types = dict(valid_offer_for_package, Price="ten", Stock=1.5, Vat=float("nan"))
+    unknown = dict(valid_offer_for_package, Colour="Blue")
+    offers = [valid_offer_for_package, missing_sku, bad_types, unknown, "not an offer"]
+
+    report = OfferValidator.validate_many(offers)
+
+    assert not report.is_valid
+    assert report.invalid_records == [1, 2, 3, 4]
+    assert set(report) == {
+        FieldError(1, "SellerProductId", "missing required attribute"),
+        FieldError(2, "Price", "should be a number, not 'ten'"),
+        FieldError(2, "Stock", "should be an integer, not 1.5"),
+        FieldError(2, "Vat", "should be a number, not nan"),
+        FieldError(3, "Colour", "unknown attribute"),
+        FieldError(4, "Offer", "should be a dictionary, not 'not an offer'"),
+    }
+    assert str(report) == "6 errors in 4 of the 5 Offer records"
+
+
+def test_validate_many_checks_the_nested_lists(valid_offer_for_package):
+    bad_discount = dict(discount_component(), StartDate="15/04/2019", Type="1.5")
+    good_discount = dict(discount_component(), EndDate=datetime(2019, 5, 15))
+    offer = dict(
+        valid_offer_for_package,
+        DiscountList={"DiscountComponent": [good_discount, bad_discount]},
+        ShippingInformationList={"ShippingInformation": [{"DeliveryMode": "Standard"}]},
+    )
+    offers = [{"Offer": offer}, {"Offer": dict(offer, DiscountList=[])}, {}]
+
+    errors = set(OfferValidator.validate_many(offers, key="Offer"))
+
+    prefix = "DiscountList.DiscountComponent[1]."
+    assert errors == {
+        FieldError(
+            0,
+            prefix + "StartDate",
+            "should be a date (datetime or ISO 8601 string), not '15/04/2019'",
+        ),
+        FieldError(0, prefix + "Type", "should be an integer, not '1.5'"),
+        FieldError(
+            0,
+            "ShippingInformationList.ShippingInformation[0].AdditionalShippingCharges",
+            "missing required attribute",
+        ),
+        FieldError(
+            0,
+            "ShippingInformationList.ShippingInformation[0].ShippingCharges",
+            "missing required attribute",
+        ),
+        FieldError(
+            1,
+            "DiscountList.DiscountComponent",
+            "should be a list of DiscountComponent in a dictionary",
+        ),
+        FieldError(
+            1,
+            "ShippingInformationList.ShippingInformation[0].AdditionalShippingCharges",
+            "missing required attribute",
+        ),
+        FieldError(
+            1,
+            "ShippingInformationList.ShippingInformation[0].ShippingCharges",
+            "missing required attribute",
+        ),
+        FieldError(2, "Offer", "missing record"),
+    }
+
+
+def test_validate_many_accepts_none_for_optional_attributes(valid_offer_for_package):
+    offer = dict(valid_offer_for_package, Comment=None)
+    assert OfferValidator.validate_many([offer]).is_valid
+    offer = dict(valid_offer_for_package, SellerProductId=None)
+    assert not OfferValidator.validate_many([offer]).is_valid
+
+
+def test_validate_many_accepts_numbers_as_strings():
+    with open(SAMPLES_DIR.joinpath("offers", "offers_to_submit.json")) as f:
+        offers = json.load(f)
+    assert OfferValidator.validate_many(offers).is_valid
+
+    invalid = [dict(offer, Stock="1.5", Price="15,98") for offer in offers]
+    assert [error.field for error in OfferValidator.validate_many(invalid)] == [
+        "Price",
+        "Stock",
+    ] * len(offers)
+
+
+def test_validate_many_accepts_integer_identifiers(valid_offer_for_package):
+    offer = dict(valid_offer_for_package, ProductEan=3700000000001, SellerProductId=1)
+    assert OfferValidator.validate_many([offer]).is_valid
+    offer = dict(valid_offer_for_package, ProductEan=True, SellerProductId=1.5)
+    assert [error.field for error in OfferValidator.validate_many([offer])] == [
+        "ProductEan",
+        "SellerProductId",
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, valid",
+    [
+        ("2019-04-15", True),
+        ("2019-04-15T10:30", True),
+        ("2019-04-15 10:30:00.123", True),
+        ("2019-04-15T10:30:00+02:00", True),
+        ("2019-04-15T10:30:00Z", True),
+        ("2019-02-30", False),
+        ("2019-04-15T25:00:00", False),
+        ("15/04/2019", False),
+    ],
+)
+def test_validate_many_checks_the_dates(value, valid):
+    discount = dict(discount_component(), StartDate=value)
+    assert DiscountComponentValidator.validate_many([discount]).is_valid is valid
+
+
+def test_validate_many_reports_the_index_of_each_chunk(valid_offer_for_package):
+    """
+    The records checked together should keep their own index
+    """
+    offers = [dict(valid_offer_for_package) for _ in range(2 * CHUNK_SIZE + 10)]
+    offers[5]["Price"] = float("nan")
+    offers[CHUNK_SIZE]["Colour"] = "Blue"
+    offers[-1]["ShippingInformationList"] = {
+        "ShippingInformation": [
+            {"DeliveryMode": "Standard", "ShippingCharges": 1,
+             "AdditionalShippingCharges": 1},
+            {"DeliveryMode": "Tracked", "ShippingCharges": "free",
+             "AdditionalShippingCharges": 1},
+        ]
+    }
+    del offers[-2]["SellerProductId"]
+
+    report = OfferValidator.validate_many(offers)
+    assert [(error.index, error.field) for error in report] == [
+        (5, "Price"),
+        (CHUNK_SIZE, "Colour"),
+        (len(offers) - 2, "SellerProductId"),
+        (
+            len(offers) - 1,
+            "ShippingInformationList.ShippingInformation[1].ShippingCharges",
+        ),
+    ]
+
+
+def test_raise_for_errors(valid_offer_for_package):
+    offers = [dict(valid_offer_for_package, Price="x") for _ in range(12)]
+    report = OfferValidator.validate_many(iter(offers))
+    with pytest.raises(ValidationError) as error:
+        report.raise_for_errors(limit=2)
+    assert str(error.value).splitlines() == [
+        "12 errors in 12 of the 12 Offer records:",
+        "Record 0, Price: should be a number, not 'x'",
+        "Record 1, Price: should be a number, not 'x'",
+        "...",
+    ]
+
+
+def test_validators_are_compiled_once():
+    assert OfferValidator.compile() is OfferValidator.compile()
@@ -0,0 +1,132 @@
+# Python imports
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Third-party imports
+import pytest
+
+# Project imports
+from cdiscountapi.exceptions import ValidationError
+from cdiscountapi.helpers import XmlGenerator, build_package, generate_package
+from cdiscountapi.packages.xsd import SchemaValidator, get_schema, validate_xml
+from . import SAMPLES_DIR
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        "offers/Offers.xml",
+        "offers/Offers_with_discount.xml",
+        "offers/Offers_with_offer_publication_list.xml",
+        "offers/Offers_with_purge_and_replace.xml",
+    ],
+)
+def test_validate_xml_with_samples(sample):
+    path = os.path.join(SAMPLES_DIR, sample)
+    validate_xml(path, "offer")
+    with open(path, "rb") as f:
+        validate_xml(f, "offer")
+
+
+def test_validate_xml_with_generated_packages(valid_offers_for_package, valid_products_for_package):
+    offers = XmlGenerator({"OfferCollection": valid_offers_for_package}).generate()
+    validate_xml(offers, "offer")
+    products = XmlGenerator({"Products": valid_products_for_package}).generate()
+    validate_xml(products, "product")
+
+
+def test_validate_xml_gives_the_invalid_record(valid_offers_for_package):
+    valid_offers_for_package[1]["Offer"]["Stock"] = "many"
+    content = XmlGenerator({"OfferCollection": valid_offers_for_package}).generate()
+    with pytest.raises(ValidationError) as error:
+        validate_xml(content, "offer")
+    assert str(error.value) == (
+        "Offers.xml is not valid (Offer 1):\n"
+        "Element 'Offer', attribute 'Stock': 'many' is not a valid value of the"
+        " atomic type 'xs:integer'."
+    )
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        (b"<OfferPackage", "Couldn't find end of Start Tag"),
+        (b"<Foo />", "The root element should be OfferPackage"),
+        (
+            b'<Offer xmlns="clr-namespace:Cdiscount.Service.OfferIntegration.Pivot;'
+            b'assembly=Cdiscount.Service.OfferIntegration" ProductEan="1"'
+            b' SellerProductId="SKU1" />',
+            "The root element should be OfferPackage",
+        ),
+    ],
+)
+def test_validate_xml_with_invalid_package(content, message):
+    with pytest.raises(ValidationError) as error:
+        validate_xml(content, "offer")
+    assert message in str(error.value)
+
+
+def test_validate_xml_with_invalid_package_attribute():
+    with open(os.path.join(SAMPLES_DIR, "offers/Offers.xml")) as f:
+        content = f.read().replace('PackageType="Full"', 'PackageType="Partial"')
+    with pytest.raises(ValidationError) as error:
+        validate_xml(content, "offer")
+    assert "{'Full', 'StockAndPrice'}" in str(error.value)
+
+
+def test_schema_is_compiled_once():
+    assert get_schema("offer") is get_schema("Offer")
+    assert get_schema("product") is not get_schema("offer")
+
+
+def test_schemas_of_the_threads(valid_offers_for_package):
+    """
+    Each thread should validate with its own schema
+    """
+    content = XmlGenerator(
+        {"OfferCollection": valid_offers_for_package}
+    ).generate().encode("utf8")
+
+    def validate(i):
+        validate_xml(content, "offer")
+        return get_schema("offer")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        schemas = list(executor.map(validate, range(4)))
+    assert all(schema is not get_schema("offer") for schema in schemas)
+
+
+def test_SchemaValidator_with_chunks(valid_offer_for_package):
+    offers = [
+        {"Offer": dict(valid_offer_for_package, SellerProductId="SKU{}".format(i))}
+        for i in range(100)
+    ]
+    content = XmlGenerator({"OfferCollection": offers}).generate().encode("utf8")
+    validator = SchemaValidator("offer")
+    middle = len(content) // 2
+    for start in range(0, len(content), 1000):
+        validator.feed(content[start:start + 1000])
+        if start <= middle < start + 1000:
+            # The records are validated as soon as they are parsed
+            assert 40 <= validator.records <= 60
+    validator.close()
+    assert validator.records == 100
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_build_package_with_validation(tmp_path, valid_offer_for_package, streaming):
+    data = {"OfferCollection": [{"Offer": valid_offer_for_package}]}
+    assert build_package("offer", data, streaming=streaming, validate=True)
+
+    data = {"OfferCollection": [{"Offer": dict(valid_offer_for_package, Price="free")}]}
+    # Without validation, the package is only rejected by Cdiscount
+    assert build_package("offer", data, streaming=streaming)
+    with pytest.raises(ValidationError):
+        build_package("offer", data, io.BytesIO(), streaming=streaming, validate=True)
+    with pytest.raises(ValidationError):
+        generate_package(
+            "offer", tmp_path / "offers", data, streaming=streaming, validate=True
+        )
+    # No package (or temporary file) is left
+    assert os.listdir(str(tmp_path)) == []